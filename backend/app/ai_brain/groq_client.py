@@ -5,17 +5,32 @@ import json
 import os
 import asyncio
 from pathlib import Path
-from groq import AsyncGroq
+from typing import AsyncIterator, Optional, Tuple
 from app.core.config import settings
+from app.core.telemetry import metrics, span
 from app.schemas.analysis_models import AnalysisComputations, AIInsights
+from app.ai_brain.insights_cache import SingleFlight, create_insights_cache, insights_cache_key
+from app.ai_brain.resilience import CircuitOpenError, QueueTimeoutError, ResilientCaller
+from app.ai_brain.prompt_builder import create_prompt_builder
+
+INSIGHTS_CACHE_LOOKUPS = metrics.counter("resume_insights_cache_lookups_total", "Insights cache lookups by result.")
 
 class AIProcessor:
     def __init__(self):
+        # Heavy import deferred until the AI Brain is first needed
+        from groq import AsyncGroq
+
         self.api_key = settings.GROQ_API_KEY
-        self.client = AsyncGroq(api_key=self.api_key)
+        # Retries are handled by the resilience layer, not the SDK
+        self.client = AsyncGroq(api_key=self.api_key, base_url=settings.GROQ_BASE_URL, max_retries=0)
         # TASK 3: Fix Groq Model (llama3-8b-8192 is deprecated)
         self.model = "llama-3.1-8b-instant" 
         self.prompts = self._load_prompts()
+        self.insights_cache = create_insights_cache()
+        self._single_flight = SingleFlight()
+        self.resilience = ResilientCaller()
+        self.prompt_builder = create_prompt_builder()
+        self.system_prompt_tokens = self.prompt_builder.counter.count(self.prompts["full_system"])
         
         # Initial Connection Log
         print(f"AI Brain Initialized. Model: {self.model}")
@@ -65,35 +80,181 @@ class AIProcessor:
         Sends the Rule Engine's output to Groq and retrieves structured insights.
         Includes Try/Except/Timeout for robustness.
         Returns None on failure (handled by API layer).
+        Successful results are cached, and identical concurrent requests share one Groq call.
+        The prompt (and any bullet encoding) is only built on a cache miss.
+        """
+        key = self._cache_key(analysis)
+
+        cached = await self._cache_get(key)
+        if cached is not None:
+            print("AI Insights served from cache.")
+            return AIInsights(**cached)
+
+        return await self._single_flight.do(key, lambda: self._generate_and_store(key, analysis))
+
+    def _cache_key(self, analysis: AnalysisComputations) -> str:
+        return insights_cache_key(self.prompt_builder.fingerprint(analysis), self.model, self.prompts["full_system"])
+
+    async def _cache_get(self, key: str) -> dict | None:
+        if self.insights_cache is None:
+            return None
+        try:
+            cached = await self.insights_cache.get(key)
+        except Exception as e:
+            # A broken shared cache must never block insights
+            print(f"Warning: Insights cache read failed: {e}")
+            INSIGHTS_CACHE_LOOKUPS.inc(result="error")
+            return None
+        INSIGHTS_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+        return cached
+
+    async def _generate_and_store(self, key: str, analysis: AnalysisComputations) -> AIInsights | None:
+        input_data = await self.prompt_builder.build(analysis, self.system_prompt_tokens)
+        insights = await self._request_insights(input_data)
+        if insights is not None and self.insights_cache is not None:
+            try:
+                await self.insights_cache.set(key, insights.model_dump())
+            except Exception as e:
+                print(f"Warning: Insights cache write failed: {e}")
+        return insights
+
+    def _messages(self, input_data: str) -> list:
+        return [
+            {
+                "role": "system",
+                "content": self.prompts["full_system"]
+            },
+            {
+                "role": "user",
+                "content": f"Here is the Analysis Data:\n{input_data}"
+            }
+        ]
+
+    @staticmethod
+    def _parse_insights(response_content: str) -> AIInsights:
+        content = response_content.strip()
+        # Streamed answers are not in JSON mode, so tolerate Markdown fences or stray prose
+        if not content.startswith("{"):
+            content = content[content.find("{"):content.rfind("}") + 1]
+        return AIInsights(**json.loads(content))
+
+    async def stream_insights(self, analysis: AnalysisComputations) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Streaming variant of generate_insights.
+        Yields ("token", text) as Groq produces output, then exactly one
+        ("insights", AIInsights | None). None means the caller should fall back.
+        The stream takes part in single-flight: identical requests arriving while it
+        runs (streamed or not) wait for its result instead of calling Groq again.
+        """
+        key = self._cache_key(analysis)
+
+        cached = await self._cache_get(key)
+        if cached is not None:
+            yield "insights", AIInsights(**cached)
+            return
+
+        shared = self._single_flight.claim(key)
+        if shared is None:
+            # An identical request is already running: wait for it instead of paying twice
+            yield "insights", await self._single_flight.do(key, lambda: self._generate_and_store(key, analysis))
+            return
+
+        insights = None
+        events = self._stream_and_store(key, analysis)
+        try:
+            async for kind, value in events:
+                if kind == "insights":
+                    insights = value
+                else:
+                    yield kind, value
+        finally:
+            # On a disconnect, close the Groq stream and its resilience slot now
+            await events.aclose()
+            # Callers that joined get the same result (None on failure or disconnect)
+            if not shared.done():
+                shared.set_result(insights)
+        yield "insights", insights
+
+    async def _stream_and_store(self, key: str, analysis: AnalysisComputations) -> AsyncIterator[Tuple[str, object]]:
+        input_data = await self.prompt_builder.build(analysis, self.system_prompt_tokens)
+        loop = asyncio.get_running_loop()
+        chunks = []
+        insights = None
+        try:
+            async with self.resilience.slot() as slot:
+                with span("groq_stream", model=self.model):
+                    deadline = loop.time() + min(slot.timeout, slot.remaining())
+                    started = loop.time()
+                    try:
+                        print(f"Streaming data to Groq AI (Model: {self.model})...")
+                        stream = await asyncio.wait_for(
+                            self.client.chat.completions.create(
+                                messages=self._messages(input_data),
+                                model=self.model,
+                                temperature=0.2,
+                                stream=True
+                            ),
+                            timeout=deadline - loop.time()
+                        )
+                        iterator = stream.__aiter__()
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(iterator.__anext__(), timeout=deadline - loop.time())
+                            except StopAsyncIteration:
+                                break
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                chunks.append(delta)
+                                yield "token", delta
+                    except asyncio.TimeoutError:
+                        slot.record_failure(timed_out=True)
+                        raise
+                    except Exception as e:
+                        slot.record_error(e)
+                        raise
+                    # A disconnect (GeneratorExit) records nothing; the slot releases the probe
+                    slot.record_success(loop.time() - started)
+
+            insights = self._parse_insights("".join(chunks))
+            if self.insights_cache is not None:
+                try:
+                    await self.insights_cache.set(key, insights.model_dump())
+                except Exception as e:
+                    print(f"Warning: Insights cache write failed: {e}")
+
+        except (CircuitOpenError, QueueTimeoutError) as e:
+            print(f"AI Skipped: {e}")
+        except asyncio.TimeoutError:
+            print("AI Error: Streaming Request Timed Out.")
+        except Exception as e:
+            print(f"AI Streaming Error: {e}")
+
+        yield "insights", insights
+
+    async def _request_insights(self, input_data: str) -> AIInsights | None:
+        """
+        One Groq round trip. Returns None on timeout or any error.
         """
-        input_data = analysis.model_dump_json()
-        
         try:
-            # 10 second timeout to prevent hanging
+            # Timeout adapts to observed Groq latency (capped at GROQ_TIMEOUT_MAX_SECONDS)
             print(f"Sending data to Groq AI (Model: {self.model})...")
-            chat_completion = await asyncio.wait_for(
-                self.client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": self.prompts["full_system"]
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Here is the Analysis Data:\n{input_data}"
-                        }
-                    ],
-                    model=self.model,
-                    temperature=0.2, 
-                    response_format={"type": "json_object"}
-                ),
-                timeout=10.0 
-            )
+            with span("groq", model=self.model):
+                chat_completion = await self.resilience.call(
+                    lambda: self.client.chat.completions.create(
+                        messages=self._messages(input_data),
+                        model=self.model,
+                        temperature=0.2, 
+                        response_format={"type": "json_object"}
+                    )
+                )
             
             response_content = chat_completion.choices[0].message.content
-            parsed_json = json.loads(response_content)
             
-            return AIInsights(**parsed_json)
+            return self._parse_insights(response_content)
+
+        except (CircuitOpenError, QueueTimeoutError) as e:
+            print(f"AI Skipped: {e}")
+            return None
 
         except asyncio.TimeoutError:
             print("AI Error: Request Timed Out.")
@@ -105,4 +266,14 @@ class AIProcessor:
             # TASK 4: Return None on failure
             return None
 
-ai_brain = AIProcessor()
+# Global instance, created on first use (or by the startup warmup)
+_ai_brain: Optional[AIProcessor] = None
+
+def get_ai_brain() -> AIProcessor:
+    global _ai_brain
+    if _ai_brain is None:
+        _ai_brain = AIProcessor()
+    return _ai_brain
+
+def is_ai_brain_loaded() -> bool:
+    return _ai_brain is not None
@@ -0,0 +1,137 @@
+# backend/app/ai_brain/insights_cache.py
+# Purpose: Cache Groq insights and coalesce identical in-flight requests.
+# Identical (resume, JD) analyses are common (re-opened candidates, frontend retries).
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+from app.core.config import settings
+
+
+def insights_cache_key(inputs: str, model: str, system_prompt: str) -> str:
+    """
+    Stable key over everything that shapes the answer: the analysis inputs (the
+    prompt builder's fingerprint), the model name and the prompt-file contents.
+    """
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, inputs):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f"insights:{digest.hexdigest()}"
+
+
+class InsightsCacheBackend:
+    """
+    Storage interface. Values are plain JSON-compatible dicts.
+    """
+
+    async def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: dict):
+        raise NotImplementedError
+
+
+class LocalInsightsCache(InsightsCacheBackend):
+    """
+    In-process cache with a TTL and an LRU size bound.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisInsightsCache(InsightsCacheBackend):
+    """
+    Shared cache so multiple workers reuse each other's results.
+    Size is bounded by the TTL and the Redis maxmemory policy.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float):
+        # Optional dependency, only needed for the shared backend
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl_seconds = int(ttl_seconds)
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict):
+        await self.client.set(key, json.dumps(value), ex=self.ttl_seconds)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share its result.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the shared call
+        return await asyncio.shield(future)
+
+    def claim(self, key: str) -> Optional[asyncio.Future]:
+        """
+        For work the caller runs itself (e.g. a stream it consumes): marks `key`
+        in flight and returns the future to resolve with the result, so that do()
+        callers share it. None when a call for `key` is already running.
+        """
+        if key in self._inflight:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+def create_insights_cache() -> Optional[InsightsCacheBackend]:
+    """
+    Builds the backend selected by INSIGHTS_CACHE_BACKEND ("local", "redis" or "none").
+    """
+    backend = settings.INSIGHTS_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "redis":
+        if not settings.INSIGHTS_CACHE_REDIS_URL:
+            raise ValueError("INSIGHTS_CACHE_REDIS_URL must be set for the redis insights cache.")
+        return RedisInsightsCache(settings.INSIGHTS_CACHE_REDIS_URL, settings.INSIGHTS_CACHE_TTL_SECONDS)
+    if backend == "local":
+        return LocalInsightsCache(settings.INSIGHTS_CACHE_SIZE, settings.INSIGHTS_CACHE_TTL_SECONDS)
+    raise ValueError(f"Unknown INSIGHTS_CACHE_BACKEND: {backend}. Use 'local', 'redis' or 'none'.")
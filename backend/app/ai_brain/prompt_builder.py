@@ -0,0 +1,170 @@
+# backend/app/ai_brain/prompt_builder.py
+# Purpose: Build the compact, token-budgeted analysis payload sent to Groq.
+# Instead of the whole AnalysisComputations (raw resume, raw JD and the segmented
+# copies of both), the model gets scores, the skill gap, the resume bullets most
+# relevant to the JD, and a truncated JD.
+
+import hashlib
+import json
+from typing import List, Optional
+import numpy as np
+from app.core.config import settings
+from app.core.telemetry import metrics, span
+from app.embeddings.embedder import get_embedding_service
+from app.schemas.analysis_models import AnalysisComputations
+
+PROMPT_TOKENS = metrics.histogram(
+    "resume_prompt_tokens", "Estimated tokens per Groq request (system + payload).",
+    (128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192)
+)
+
+
+class TokenCounter:
+    """
+    Local token estimates. Uses tiktoken when it is installed and its encoding
+    is available; otherwise assumes ~4 characters per token.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, encoding_name: str):
+        self._encoding = None
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            print(f"Warning: Token counting falls back to a character estimate: {e}")
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + self.CHARS_PER_TOKEN - 1) // self.CHARS_PER_TOKEN
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self._encoding.decode(tokens[:max_tokens])
+        max_chars = max_tokens * self.CHARS_PER_TOKEN
+        return text if len(text) <= max_chars else text[:max_chars]
+
+
+class PromptBuilder:
+    """
+    Fills a token budget in priority order: scores and skill gap (always),
+    then a truncated JD, then resume bullets ranked by similarity to the JD.
+    Bullets are only encoded and ranked when they do not all fit; their vectors
+    come from the embedding cache on repeat analyses of the same resume.
+    """
+
+    # JSON punctuation per bullet, on top of its own tokens
+    BULLET_OVERHEAD = 3
+
+    def __init__(self, token_budget: int, max_bullets: int, jd_max_tokens: int, bullet_max_tokens: int,
+                 counter: Optional[TokenCounter] = None):
+        self.token_budget = token_budget
+        self.max_bullets = max_bullets
+        self.jd_max_tokens = jd_max_tokens
+        self.bullet_max_tokens = bullet_max_tokens
+        self.counter = counter or TokenCounter(settings.PROMPT_TOKENIZER)
+
+    @staticmethod
+    def _bullets(analysis: AnalysisComputations) -> List[str]:
+        """
+        Experience and project lines, deduplicated (case and whitespace insensitive).
+        """
+        seen = set()
+        bullets = []
+        resume = analysis.resume_data
+        for line in resume.experience + resume.projects:
+            key = " ".join(line.lower().split())
+            if key and key not in seen:
+                seen.add(key)
+                bullets.append(" ".join(line.split()))
+        return bullets
+
+    async def _rank(self, bullets: List[str], jd_text: str) -> List[int]:
+        """
+        Bullet indices ordered by cosine similarity to the cleaned JD text (cached from scoring).
+        """
+        order = list(range(len(bullets)))
+        if len(bullets) < 2 or not jd_text:
+            return order
+        try:
+            vectors = await get_embedding_service().aembed_batch(bullets + [jd_text], normalize=True)
+        except Exception as e:
+            print(f"Warning: Could not rank resume bullets: {e}")
+            return order
+        relevance = vectors[:-1] @ vectors[-1]
+        return np.argsort(-relevance, kind="stable").tolist()
+
+    def fingerprint(self, analysis: AnalysisComputations) -> str:
+        """
+        Digest of everything build() reads (scores, skill gap, JD, bullets and the
+        budget settings), so callers can key caches without building, or encoding.
+        """
+        digest = hashlib.sha256()
+        parts = [
+            json.dumps([self.token_budget, self.max_bullets, self.jd_max_tokens, self.bullet_max_tokens]),
+            analysis.scores.model_dump_json(),
+            analysis.skill_gap.model_dump_json(),
+            analysis.jd_data.raw_text,
+            analysis.jd_data.document.text,
+            *self._bullets(analysis),
+        ]
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def build(self, analysis: AnalysisComputations, system_tokens: int = 0) -> str:
+        """
+        The compact JSON payload for the user message.
+        system_tokens (the system prompt's size) is only used for the logged total.
+        """
+        count = self.counter.count
+        with span("prompt_build"):
+            payload = {
+                "scores": analysis.scores.model_dump(),
+                "skill_gap": analysis.skill_gap.model_dump(),
+            }
+            remaining = self.token_budget - count(json.dumps(payload))
+
+            jd = " ".join(analysis.jd_data.raw_text.split())
+            jd = self.counter.truncate(jd, min(self.jd_max_tokens, remaining // 2))
+            remaining -= count(jd) + self.BULLET_OVERHEAD
+
+            bullets = self._bullets(analysis)
+            fitted = [self.counter.truncate(bullet, self.bullet_max_tokens) for bullet in bullets]
+            costs = [count(bullet) + self.BULLET_OVERHEAD for bullet in fitted]
+            order = range(len(bullets))
+            if len(bullets) > self.max_bullets or sum(costs) > remaining:
+                order = await self._rank(bullets, analysis.jd_data.document.text)
+
+            relevant = []
+            for i in order:
+                if len(relevant) >= self.max_bullets:
+                    break
+                if costs[i] <= remaining:
+                    relevant.append(fitted[i])
+                    remaining -= costs[i]
+
+            payload["relevant_resume_bullets"] = relevant
+            payload["job_description"] = jd
+            input_data = json.dumps(payload, ensure_ascii=False)
+
+        payload_tokens = count(input_data)
+        PROMPT_TOKENS.observe(payload_tokens + system_tokens)
+        print(f"Prompt built: {payload_tokens} payload + {system_tokens} system tokens "
+              f"({len(relevant)}/{len(bullets)} bullets, budget {self.token_budget}).")
+        return input_data
+
+
+def create_prompt_builder() -> PromptBuilder:
+    return PromptBuilder(
+        token_budget=settings.PROMPT_TOKEN_BUDGET,
+        max_bullets=settings.PROMPT_MAX_BULLETS,
+        jd_max_tokens=settings.PROMPT_JD_MAX_TOKENS,
+        bullet_max_tokens=settings.PROMPT_BULLET_MAX_TOKENS
+    )
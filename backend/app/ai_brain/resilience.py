@@ -0,0 +1,304 @@
+# backend/app/ai_brain/resilience.py
+# Purpose: Protect the app from a slow or failing Groq API.
+# Bounded concurrency with a queue-wait budget, a circuit breaker, latency-derived
+# timeouts, and jittered retries for transient failures only.
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+from app.core.config import settings
+
+
+class CircuitOpenError(Exception):
+    """Raised when the breaker is open and calls go straight to the fallback."""
+
+
+class QueueTimeoutError(Exception):
+    """Raised when no Groq slot frees up within the queue-wait budget."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half_open after `reset_seconds`; one probe call is let through.
+    half_open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        """
+        Gives back a half-open probe slot that was granted but never used.
+        """
+        if self.state == "half_open":
+            self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                print(f"AI circuit breaker OPEN after {self.consecutive_failures} consecutive failures.")
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies, used to derive the timeout.
+    """
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def timeout(self, pct: float, multiplier: float, minimum: float, maximum: float) -> float:
+        # Until there is enough history, allow the full budget
+        if len(self._samples) < self.MIN_SAMPLES:
+            return maximum
+        return min(maximum, max(minimum, self.percentile(pct) * multiplier))
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Only transient failures where re-sending is safe: connection errors,
+    rate limiting and 5xx responses. Timeouts and 4xx are not retried.
+    """
+    try:
+        import groq
+        if isinstance(error, (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)):
+            return not isinstance(error, groq.APITimeoutError)
+    except ImportError:
+        pass
+    status = getattr(error, "status_code", None)
+    return status in (429, 500, 502, 503, 504)
+
+
+def is_breaker_failure(error: BaseException) -> bool:
+    """
+    Whether an error says Groq is unhealthy: timeouts, connection errors and
+    the retryable statuses (429, 5xx). A request Groq answered with another 4xx
+    (bad request, auth, payload too large) is the caller's problem and must not
+    trip the breaker for everyone else.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    try:
+        import groq
+        if isinstance(error, groq.APIConnectionError):
+            return True
+    except ImportError:
+        pass
+    return is_retryable(error)
+
+
+class Slot:
+    """
+    One admitted Groq call. The caller reports the outcome through it. A slot
+    left without an outcome (cancelled, e.g. by a client disconnect) hands its
+    half-open probe back instead of leaving the breaker waiting on it forever.
+    """
+
+    def __init__(self, caller: "ResilientCaller", timeout: float, deadline: float, is_probe: bool):
+        self.caller = caller
+        self.timeout = timeout
+        self.deadline = deadline
+        self.is_probe = is_probe
+        self.recorded = False
+
+    def remaining(self) -> float:
+        """
+        Seconds left of the overall call deadline (retries and backoff included).
+        """
+        return self.deadline - time.monotonic()
+
+    def record_success(self, latency_seconds: float):
+        self.recorded = True
+        self.caller.record_success(latency_seconds)
+
+    def record_failure(self, timed_out: bool = False):
+        self.recorded = True
+        self.caller.record_failure(timed_out)
+
+    def record_error(self, error: BaseException):
+        """
+        Records a failed attempt: a breaker failure when Groq looks unhealthy,
+        otherwise (e.g. a 4xx) only counted, with a probe handed back unused.
+        """
+        if is_breaker_failure(error):
+            self.record_failure(timed_out=isinstance(error, asyncio.TimeoutError))
+            return
+        self.recorded = True
+        self.caller.counters["client_errors"] += 1
+        if self.is_probe:
+            self.caller.breaker.release_probe()
+
+
+class ResilientCaller:
+    """
+    Wraps calls to the Groq API. One instance per AIProcessor.
+    """
+
+    def __init__(self):
+        self.max_concurrency = settings.GROQ_MAX_CONCURRENCY
+        self.queue_wait_seconds = settings.GROQ_QUEUE_WAIT_SECONDS
+        self.max_retries = settings.GROQ_MAX_RETRIES
+        self.breaker = CircuitBreaker(settings.GROQ_BREAKER_FAILURES, settings.GROQ_BREAKER_RESET_SECONDS)
+        self.latency = LatencyTracker()
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "client_errors": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "short_circuited": 0,
+            "queue_rejections": 0,
+        }
+
+    def current_timeout(self) -> float:
+        return self.latency.timeout(
+            settings.GROQ_TIMEOUT_PERCENTILE,
+            settings.GROQ_TIMEOUT_MULTIPLIER,
+            settings.GROQ_TIMEOUT_MIN_SECONDS,
+            settings.GROQ_TIMEOUT_MAX_SECONDS
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Admits one call: checks the breaker, then waits (within budget) for a
+        concurrency slot. Yields a Slot with the per-attempt timeout and the
+        overall deadline. Callers report the outcome through the Slot; an
+        exception without an outcome is recorded with record_error(), and a
+        cancellation gives the half-open probe back.
+        """
+        self.counters["calls"] += 1
+        if not self.breaker.allow():
+            self.counters["short_circuited"] += 1
+            raise CircuitOpenError("Groq circuit breaker is open.")
+        is_probe = self.breaker.state == "half_open"
+
+        self.queue_depth += 1
+        acquired = False
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_wait_seconds)
+            acquired = True
+        except asyncio.TimeoutError:
+            self.counters["queue_rejections"] += 1
+            raise QueueTimeoutError("No Groq slot available within the queue-wait budget.")
+        finally:
+            self.queue_depth -= 1
+            # Rejected or cancelled while queued: the probe was never used
+            if not acquired and is_probe:
+                self.breaker.release_probe()
+
+        self.in_flight += 1
+        slot = Slot(self, self.current_timeout(), time.monotonic() + settings.GROQ_CALL_DEADLINE_SECONDS, is_probe)
+        try:
+            yield slot
+        except Exception as e:
+            if not slot.recorded:
+                slot.record_error(e)
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            if not slot.recorded and slot.is_probe:
+                self.breaker.release_probe()
+
+    def record_success(self, latency_seconds: float):
+        self.counters["successes"] += 1
+        self.latency.record(latency_seconds)
+        self.breaker.record_success()
+
+    def record_failure(self, timed_out: bool = False):
+        self.counters["failures"] += 1
+        if timed_out:
+            self.counters["timeouts"] += 1
+        self.breaker.record_failure()
+
+    async def call(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs factory() under the breaker, the concurrency limit and the adaptive
+        timeout, retrying transient failures with full-jitter backoff.
+        Attempts and backoff together never run past GROQ_CALL_DEADLINE_SECONDS.
+        """
+        async with self.slot() as slot:
+            attempt = 0
+            while True:
+                remaining = slot.remaining()
+                if remaining <= 0:
+                    slot.record_failure(timed_out=True)
+                    raise asyncio.TimeoutError("Groq call deadline exceeded.")
+                started = time.monotonic()
+                try:
+                    result = await asyncio.wait_for(factory(), timeout=min(slot.timeout, remaining))
+                    slot.record_success(time.monotonic() - started)
+                    return result
+                except asyncio.TimeoutError:
+                    slot.record_failure(timed_out=True)
+                    raise
+                except Exception as e:
+                    backoff = random.uniform(0, min(2.0, 0.25 * 2 ** (attempt + 1)))
+                    if (attempt >= self.max_retries or not is_retryable(e) or self.breaker.state != "closed"
+                            or backoff >= slot.remaining()):
+                        slot.record_error(e)
+                        raise
+                    attempt += 1
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": round(self.current_timeout(), 3),
+            "latency_p50_seconds": self.latency.percentile(50),
+            "latency_p95_seconds": self.latency.percentile(95),
+            "latency_p99_seconds": self.latency.percentile(99),
+            **self.counters,
+        }
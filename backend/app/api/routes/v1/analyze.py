@@ -1,56 +1,449 @@
 # backend/app/api/routes/v1/analyze.py
 # Purpose: Define the API endpoints for Resume Analysis.
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from app.schemas.analysis_models import FullAnalysisResponse, AIInsights
+import asyncio
+import heapq
+import io
+import json
+import zipfile
+from pathlib import PurePosixPath
+from typing import List, Optional, Tuple, Union
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.admission import AdmissionRejectedError, admission
+from app.core.config import settings
+from app.core.responses import json_response
+from app.core.telemetry import span
+from app.schemas.analysis_models import (
+    FullAnalysisResponse, CompactAnalysisResponse, AIInsights, ResumeContent, JobDescription
+)
 from app.resume_parser.parser import ResumeParser
-from app.rule_engine.engine import RuleEngine
-from app.ai_brain.groq_client import ai_brain
+from app.resume_parser.cache import ResumeNotFoundError
+from app.rule_engine.engine import RuleEngine, candidate_index_queue
+from app.rule_engine.jd_store import JobNotFoundError, PreparedJob
+from app.ai_brain.groq_client import get_ai_brain
 
 router = APIRouter()
 
-@router.post("/analyze", response_model=FullAnalysisResponse)
+def _fallback_insights() -> AIInsights:
+    """
+    Deterministic insights used whenever the AI Brain is unavailable.
+    """
+    return AIInsights(
+        summary_explanation="AI service temporarily unavailable. Scores are calculated deterministically and are accurate.",
+        ats_suggestions=["Ensure all keywords from the job description are present.", "Use standardized section headers."],
+        rewritten_bullets=["[AI Unavailable] Manual review recommended for bullet points."]
+    )
+
+def _index_candidates(resumes: List[ResumeContent], filenames: List[str]):
+    """
+    Queues analyzed resumes for /search; they are indexed in the background, so
+    indexing neither delays nor fails the analysis.
+    """
+    if settings.CANDIDATE_INDEX_ENABLED:
+        candidate_index_queue.submit(resumes, [{"filename": name} for name in filenames])
+
+async def _load_resume(resume_file: Optional[UploadFile], resume_id: Optional[str]) -> ResumeContent:
+    """
+    Either parses the upload or fetches an earlier parse by its resume_id.
+    """
+    if resume_id:
+        print(f"Loading Resume by id: {resume_id[:12]}")
+        return await ResumeParser.from_id(resume_id)
+    if resume_file is None:
+        raise ValueError("Provide either resume_file or resume_id.")
+    print(f"Parsing Resume: {resume_file.filename}")
+    with span("parse"):
+        return await ResumeParser.parse(resume_file)
+
+async def _load_jd(jd_text: Optional[str], jd_id: Optional[str]) -> Tuple[JobDescription, Optional[PreparedJob]]:
+    """
+    Either parses the pasted JD or fetches a registered one (with its vectors) by jd_id.
+    """
+    if jd_id:
+        job = await RuleEngine.load_job(jd_id)
+        return job.jd, job
+    if not jd_text:
+        raise ValueError("Provide either jd_text or jd_id.")
+    return RuleEngine.parse_jd(jd_text), None
+
+def _lane(request: Request) -> str:
+    """
+    Admission lane of a single-resume analysis. Scripted callers can send
+    X-Priority: bulk so they queue behind interactive users.
+    """
+    return "bulk" if request.headers.get("x-priority", "").lower() == "bulk" else "interactive"
+
+async def _admit(lane: str) -> float:
+    try:
+        return await admission.acquire(lane)
+    except AdmissionRejectedError as ar:
+        raise HTTPException(status_code=ar.status_code, detail=str(ar), headers={"Retry-After": str(ar.retry_after)})
+
+ANALYSIS_VIEWS = ("full", "compact", "scores")
+
+@router.post("/analyze", response_model=Union[FullAnalysisResponse, CompactAnalysisResponse])
 async def analyze_resume(
-    resume_file: UploadFile = File(...),
-    jd_text: str = Form(...)
+    request: Request,
+    resume_file: Optional[UploadFile] = File(None),
+    jd_text: Optional[str] = Form(None),
+    resume_id: Optional[str] = Form(None),
+    jd_id: Optional[str] = Form(None),
+    view: str = Query("full")
 ):
     """
     Main Endpoint: Upload Resume + Paste JD to get full AI analysis.
+    Instead of re-uploading, pass the resume_id returned by an earlier analysis,
+    and instead of jd_text, the jd_id of a registered job (POST /jobs).
+
+    view:
+    - "full": the complete computation, including the parsed resume and JD (default).
+    - "compact": scores, skill gap and AI insights only.
+    - "scores": scores and skill gap only; the AI Brain is not called.
+
+    Under load the request may be rejected (429/503 with Retry-After), or answered
+    with the deterministic fallback insights and an X-Degraded: true header.
     """
+    if view not in ANALYSIS_VIEWS:
+        raise HTTPException(status_code=400, detail="view must be one of: full, compact, scores.")
+
+    lane = _lane(request)
+    admitted_at = await _admit(lane)
     try:
         # 1. Parse Inputs
-        print(f"Parsing Resume: {resume_file.filename}")
-        resume_content = await ResumeParser.parse(resume_file)
+        resume_content = await _load_resume(resume_file, resume_id)
         
         # New: JD parsing now includes fallback logic automatically
         print("Parsing Job Description (with Fallback Logic)...")
-        jd_content = RuleEngine.parse_jd(jd_text)
+        jd_content, job = await _load_jd(jd_text, jd_id)
         
         # 2. Rule Engine (Deterministic Scoring)
         print("Running Rule Engine...")
-        analysis_computation = await RuleEngine.analyze(resume_content, jd_content)
+        analysis_computation = await RuleEngine.analyze(resume_content, jd_content, job)
+        if resume_file is not None:
+            # Resumes referenced by id were already indexed when first uploaded
+            _index_candidates([resume_content], [resume_file.filename])
         
         # 3. AI Brain (Insights Generation)
-        print("Querying AI Brain...")
-        ai_insights = await ai_brain.generate_insights(analysis_computation)
+        ai_insights = None
+        degraded = view != "scores" and admission.degrade()
+        if degraded:
+            # Shed the slowest stage up front instead of waiting for Groq timeouts
+            print("Server under load. Skipping AI Brain and using Fallback.")
+            ai_insights = _fallback_insights()
+        elif view != "scores":
+            print("Querying AI Brain...")
+            ai_insights = await get_ai_brain().generate_insights(analysis_computation)
         
-        # TASK 5: AI FALLBACK HANDLING
-        if ai_insights is None:
-            print("AI Service unavailable (returned None). Using Fallback.")
-            ai_insights = AIInsights(
-                summary_explanation="AI service temporarily unavailable. Scores are calculated deterministically and are accurate.",
-                ats_suggestions=["Ensure all keywords from the job description are present.", "Use standardized section headers."],
-                rewritten_bullets=["[AI Unavailable] Manual review recommended for bullet points."]
-            )
+            # TASK 5: AI FALLBACK HANDLING
+            if ai_insights is None:
+                print("AI Service unavailable (returned None). Using Fallback.")
+                ai_insights = _fallback_insights()
         
         # 4. Construct Response
-        return FullAnalysisResponse(
-            computation=analysis_computation,
-            ai_insights=ai_insights
-        )
+        # Serialized (and compressed) here, not by FastAPI, so the cost shows up as its own stage
+        with span("serialize", view=view):
+            if view == "full":
+                response = FullAnalysisResponse(
+                    computation=analysis_computation,
+                    ai_insights=ai_insights
+                )
+            else:
+                response = CompactAnalysisResponse(
+                    resume_id=resume_content.resume_id,
+                    scores=analysis_computation.scores,
+                    skill_gap=analysis_computation.skill_gap,
+                    ai_insights=ai_insights
+                )
+            rendered = json_response(response, request)
+            if degraded:
+                rendered.headers["X-Degraded"] = "true"
+            return rendered
         
+    except (ResumeNotFoundError, JobNotFoundError) as nf:
+        raise HTTPException(status_code=404, detail=str(nf))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        print(f"Server Error: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error during processing.")
+    finally:
+        admission.release(lane, admitted_at)
+
+def _sse(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@router.post("/analyze/stream")
+async def analyze_resume_stream(
+    request: Request,
+    resume_file: Optional[UploadFile] = File(None),
+    jd_text: Optional[str] = Form(None),
+    resume_id: Optional[str] = Form(None),
+    jd_id: Optional[str] = Form(None)
+):
+    """
+    Streaming variant of /analyze (Server-Sent Events).
+    Events, in order:
+    - "computation": the deterministic AnalysisComputations, as soon as it is ready.
+    - "token": raw Groq output chunks, as they arrive.
+    - "done": final {"ai_insights": ..., "fallback": bool, "degraded": bool}; fallback
+      insights if the LLM failed, or if the server is under load (degraded, no tokens).
+    """
+    lane = _lane(request)
+    # The slot is held until the stream ends; released here only if it never starts
+    release = admission.releaser(lane, await _admit(lane))
+    streaming = False
+    try:
+        resume_content = await _load_resume(resume_file, resume_id)
+        jd_content, job = await _load_jd(jd_text, jd_id)
+        analysis_computation = await RuleEngine.analyze(resume_content, jd_content, job)
+        if resume_file is not None:
+            # Resumes referenced by id were already indexed when first uploaded
+            _index_candidates([resume_content], [resume_file.filename])
+        streaming = True
+    except (ResumeNotFoundError, JobNotFoundError) as nf:
+        raise HTTPException(status_code=404, detail=str(nf))
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         print(f"Server Error: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error during processing.")
+    finally:
+        if not streaming:
+            release()
+
+    async def stream():
+        try:
+            yield _sse("computation", analysis_computation.model_dump())
+
+            ai_insights = None
+            degraded = admission.degrade()
+            if degraded:
+                print("Server under load. Skipping AI Brain and using Fallback.")
+            else:
+                try:
+                    async for event, value in get_ai_brain().stream_insights(analysis_computation):
+                        if event == "token":
+                            yield _sse("token", {"delta": value})
+                        else:
+                            ai_insights = value
+                except Exception as e:
+                    print(f"AI Streaming Error: {e}")
+
+            fallback = ai_insights is None
+            if fallback:
+                if not degraded:
+                    print("AI Service unavailable (returned None). Using Fallback.")
+                ai_insights = _fallback_insights()
+            yield _sse("done", {"ai_insights": ai_insights.model_dump(), "fallback": fallback, "degraded": degraded})
+        finally:
+            release()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release)
+    )
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, label: str, budget: int) -> bytes:
+    """
+    Decompresses one archive member, reading at most one byte past the limits:
+    the declared file_size is attacker-controlled and not trusted.
+    """
+    limit = min(settings.BATCH_MAX_FILE_BYTES, budget)
+    with archive.open(info) as member:
+        content = member.read(limit + 1)
+    if len(content) > limit:
+        if limit < settings.BATCH_MAX_FILE_BYTES:
+            raise ValueError(f"Archives exceed the total size limit of {settings.BATCH_MAX_ARCHIVE_BYTES} bytes.")
+        raise ValueError(f"{label} exceeds the per-file size limit.")
+    return content
+
+async def _collect_batch_files(resume_files: List[UploadFile]) -> List[Tuple[str, bytes]]:
+    """
+    Reads the uploads, expanding .zip archives into their PDF/DOCX members.
+    """
+    files = []
+    budget = settings.BATCH_MAX_ARCHIVE_BYTES
+    for upload in resume_files:
+        content = await upload.read()
+        name = upload.filename or "resume"
+
+        if name.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
+                raise ValueError(f"{name} is not a valid zip archive.")
+            with archive:
+                for info in archive.infolist():
+                    member = PurePosixPath(info.filename).name
+                    if info.is_dir() or not member.lower().endswith((".pdf", ".docx")):
+                        continue
+                    try:
+                        data = _read_member(archive, info, f"{name}/{member}", budget)
+                    except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+                        # Corrupt, encrypted or unsupported member
+                        raise ValueError(f"{name}/{member} could not be extracted: {e}")
+                    budget -= len(data)
+                    files.append((member, data))
+                    if len(files) > settings.BATCH_MAX_FILES:
+                        break
+        else:
+            if len(content) > settings.BATCH_MAX_FILE_BYTES:
+                raise ValueError(f"{name} exceeds the per-file size limit.")
+            files.append((name, content))
+
+        if len(files) > settings.BATCH_MAX_FILES:
+            raise ValueError(f"Too many resumes. The limit is {settings.BATCH_MAX_FILES} per request.")
+
+    if not files:
+        raise ValueError("No PDF or DOCX resumes found in the upload.")
+    return files
+
+def _ndjson(payload: dict) -> bytes:
+    return (json.dumps(payload) + "\n").encode("utf-8")
+
+@router.post("/analyze/batch")
+async def analyze_batch(
+    resume_files: List[UploadFile] = File(...),
+    jd_text: Optional[str] = Form(None),
+    ai_mode: str = Form("skip"),
+    ai_top_n: int = Form(10),
+    jd_id: Optional[str] = Form(None)
+):
+    """
+    Bulk Screening: one JD against many resumes (files and/or .zip archives).
+    Streams one NDJSON line per resume in completion order ("ok" or "error"),
+    then a final {"status": "summary", "total", "scored", "failed"} line.
+    The JD is jd_text, or the jd_id of a registered job (POST /jobs).
+
+    ai_mode:
+    - "skip": deterministic scores only (default).
+    - "all": AI insights for every resume.
+    - "top_n": after scoring, AI insights for the ai_top_n best candidates only.
+
+    Batches run in the bulk admission lane, behind interactive analyses. Under load
+    the AI step is skipped and fallback insights are returned.
+    """
+    if ai_mode not in ("skip", "all", "top_n"):
+        raise HTTPException(status_code=400, detail="ai_mode must be one of: skip, all, top_n.")
+
+    # One bulk slot for the whole batch, held until the stream ends. Taken before
+    # the uploads are read, so queued batches do not hold expanded archives in memory.
+    release = admission.releaser("bulk", await _admit("bulk"))
+    try:
+        # The JD is parsed once for the whole batch
+        jd_content, job = await _load_jd(jd_text, jd_id)
+        files = await _collect_batch_files(resume_files)
+    except JobNotFoundError as nf:
+        release()
+        raise HTTPException(status_code=404, detail=str(nf))
+    except ValueError as ve:
+        release()
+        raise HTTPException(status_code=400, detail=str(ve))
+    except BaseException:
+        release()
+        raise
+    print(f"Batch screening {len(files)} resumes (ai_mode={ai_mode}).")
+
+    async def stream():
+        semaphore = asyncio.Semaphore(settings.BATCH_PARSE_CONCURRENCY)
+
+        async def parse_one(index: int, name: str, content: bytes):
+            async with semaphore:
+                try:
+                    return index, name, await ResumeParser.parse_bytes(content, name), None
+                except Exception as e:
+                    return index, name, None, str(e) or "Could not parse resume."
+
+        async def score(batch) -> List[bytes]:
+            nonlocal failed, scored
+            try:
+                computations = await RuleEngine.analyze_many([resume for _, _, resume in batch], jd_content, job)
+            except Exception as e:
+                # One bad chunk must not end the stream for the rest of the batch
+                print(f"Batch scoring error: {e}")
+                failed += len(batch)
+                return [
+                    _ndjson({"index": index, "filename": name, "status": "error", "detail": "Could not score resume."})
+                    for index, name, _ in batch
+                ]
+            _index_candidates([resume for _, _, resume in batch], [name for _, name, _ in batch])
+            if ai_mode == "all" and not admission.degrade():
+                insights = await asyncio.gather(*(get_ai_brain().generate_insights(c) for c in computations))
+            else:
+                insights = [None] * len(computations)
+
+            lines = []
+            for (index, name, _), computation, ai_insights in zip(batch, computations, insights):
+                result = {
+                    "index": index,
+                    "filename": name,
+                    "resume_id": computation.resume_data.resume_id,
+                    "status": "ok",
+                    "scores": computation.scores.model_dump(),
+                    "skill_gap": computation.skill_gap.model_dump(),
+                }
+                if ai_mode == "all":
+                    result["ai_insights"] = (ai_insights or _fallback_insights()).model_dump()
+                scored += 1
+                if keep_top:
+                    # Bounded min-heap: only the current top ai_top_n computations stay in memory
+                    entry = (computation.scores.overall_score, -index, name, computation)
+                    if len(top) < ai_top_n:
+                        heapq.heappush(top, entry)
+                    else:
+                        heapq.heappushpop(top, entry)
+                lines.append(_ndjson(result))
+            return lines
+
+        scored = 0
+        failed = 0
+        keep_top = ai_mode == "top_n" and ai_top_n > 0
+        top = []
+        tasks = [asyncio.create_task(parse_one(i, name, content)) for i, (name, content) in enumerate(files)]
+        try:
+            pending = []
+            for next_done in asyncio.as_completed(tasks):
+                index, name, resume, error = await next_done
+                if error is not None:
+                    failed += 1
+                    yield _ndjson({"index": index, "filename": name, "status": "error", "detail": error})
+                    continue
+
+                pending.append((index, name, resume))
+                if len(pending) >= settings.BATCH_ENCODE_SIZE:
+                    for line in await score(pending):
+                        yield line
+                    pending = []
+
+            if pending:
+                for line in await score(pending):
+                    yield line
+
+            # Deferred AI step: only the best candidates go to the LLM
+            if top:
+                # Best score first; equal scores in upload order
+                top.sort(reverse=True)
+                if admission.degrade():
+                    insights = [None] * len(top)
+                else:
+                    insights = await asyncio.gather(*(get_ai_brain().generate_insights(c) for _, _, _, c in top))
+                for rank, ((_, negative_index, name, _), ai_insights) in enumerate(zip(top, insights), start=1):
+                    yield _ndjson({
+                        "index": -negative_index,
+                        "filename": name,
+                        "status": "insights",
+                        "rank": rank,
+                        "ai_insights": (ai_insights or _fallback_insights()).model_dump(),
+                    })
+
+            yield _ndjson({"status": "summary", "total": len(files), "scored": scored, "failed": failed})
+        finally:
+            for task in tasks:
+                task.cancel()
+            release()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", background=BackgroundTask(release))
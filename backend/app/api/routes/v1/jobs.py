@@ -0,0 +1,35 @@
+# backend/app/api/routes/v1/jobs.py
+# Purpose: Define the API endpoints for pre-registering job descriptions.
+
+from fastapi import APIRouter, HTTPException
+from app.schemas.analysis_models import JobRegistrationRequest, JobRegistrationResponse
+from app.rule_engine.engine import RuleEngine
+from app.rule_engine.jd_store import JobNotFoundError
+
+router = APIRouter()
+
+@router.post("/jobs", response_model=JobRegistrationResponse)
+async def register_job(request: JobRegistrationRequest):
+    """
+    Parses and embeds a JD once. Pass the returned jd_id instead of jd_text to
+    /analyze, /analyze/stream, /analyze/batch and /search.
+    Registering the same text again returns the same jd_id.
+    """
+    try:
+        job = await RuleEngine.register_job(request.jd_text)
+        return JobRegistrationResponse(jd_id=job.jd_id, required_skills=job.jd.required_skills)
+
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        print(f"Server Error: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error during job registration.")
+
+@router.get("/jobs/{jd_id}", response_model=JobRegistrationResponse)
+async def get_job(jd_id: str):
+    try:
+        job = await RuleEngine.load_job(jd_id)
+        return JobRegistrationResponse(jd_id=job.jd_id, required_skills=job.jd.required_skills)
+
+    except JobNotFoundError as nf:
+        raise HTTPException(status_code=404, detail=str(nf))
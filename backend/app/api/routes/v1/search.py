@@ -0,0 +1,43 @@
+# backend/app/api/routes/v1/search.py
+# Purpose: Define the API endpoints for retrieving stored candidates for a JD.
+
+from fastapi import APIRouter, HTTPException
+from app.schemas.analysis_models import CandidateSearchRequest, CandidateSearchResponse, CandidateMatch
+from app.rule_engine.engine import RuleEngine
+from app.rule_engine.jd_store import JobNotFoundError
+from app.embeddings.vector_index import get_candidate_index
+
+router = APIRouter()
+
+@router.post("/search", response_model=CandidateSearchResponse)
+async def search_candidates(request: CandidateSearchRequest):
+    """
+    Top-k previously analyzed candidates for a JD, without re-running full analysis.
+    Scores use the same 45/35/20 weighting as /analyze.
+    A registered job (jd_id) is searched with its stored vectors, without re-encoding.
+    """
+    try:
+        if request.jd_id:
+            job = await RuleEngine.load_job(request.jd_id)
+            matches = await RuleEngine.search_candidates(job.jd, request.top_k, job)
+        elif request.jd_text:
+            jd_content = RuleEngine.parse_jd(request.jd_text)
+            matches = await RuleEngine.search_candidates(jd_content, request.top_k)
+        else:
+            raise ValueError("Provide either jd_text or jd_id.")
+
+        return CandidateSearchResponse(
+            total_candidates=len(get_candidate_index()),
+            results=[
+                CandidateMatch(candidate_id=candidate_id, score=round(score * 100, 2), metadata=metadata)
+                for candidate_id, score, metadata in matches
+            ]
+        )
+
+    except JobNotFoundError as nf:
+        raise HTTPException(status_code=404, detail=str(nf))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        print(f"Server Error: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error during search.")
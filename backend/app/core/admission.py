@@ -0,0 +1,240 @@
+# backend/app/core/admission.py
+# Purpose: Admission control for the analysis routes.
+# A bounded number of analyses run at once; a short, prioritized wait queue holds
+# the overflow and anything beyond it is rejected fast. Under load (deep queue or
+# high p95 latency) analyses skip Groq and return the deterministic fallback,
+# instead of waiting for the Groq timeout one request at a time.
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.telemetry import logger, metrics
+
+LANES = ("interactive", "bulk")
+
+ADMISSION_DECISIONS = metrics.counter("resume_admission_total", "Admission decisions by lane and outcome.")
+ADMISSION_DEGRADED = metrics.counter("resume_admission_degraded_total", "Analyses answered without Groq because of load.")
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an analysis is turned away: 429 (queue full) or 503 (wait expired)."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    At most `max_in_flight` admitted analyses, of which at most `bulk_max_in_flight`
+    from the bulk lane. Waiters are served interactive lane first, then bulk, each
+    in arrival order, and give up after `queue_timeout` seconds.
+    """
+
+    def __init__(self, enabled: bool, max_in_flight: int, bulk_max_in_flight: int, max_queue: int,
+                 bulk_max_queue: int, queue_timeout: float, degrade_queue_depth: int,
+                 degrade_p95_seconds: float, degrade_hold_seconds: float, latency_window_seconds: float):
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.bulk_max_in_flight = bulk_max_in_flight
+        self.max_queue = max_queue
+        self.bulk_max_queue = bulk_max_queue
+        self.queue_timeout = queue_timeout
+        self.degrade_queue_depth = degrade_queue_depth
+        self.degrade_p95_seconds = degrade_p95_seconds
+        self.degrade_hold_seconds = degrade_hold_seconds
+        self.latency_window_seconds = latency_window_seconds
+
+        self.in_flight: Dict[str, int] = {lane: 0 for lane in LANES}
+        self.waiting: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        # (finished at, seconds) of recent interactive analyses. Guarded by a lock:
+        # the sync /ready and /metrics routes read stats from threadpool threads.
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=1000)
+        self._latency_lock = threading.Lock()
+        self._p95: Tuple[float, Optional[float]] = (0.0, None)
+        self._degraded_until = 0.0
+        self._degraded_logged = False
+
+    def _has_slot(self, lane: str) -> bool:
+        if sum(self.in_flight.values()) >= self.max_in_flight:
+            return False
+        return lane != "bulk" or self.in_flight["bulk"] < self.bulk_max_in_flight
+
+    def _wake(self):
+        """
+        Hands free slots to waiters, interactive lane first.
+        """
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self._has_slot(lane):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.in_flight[lane] += 1
+                    waiter.set_result(None)
+
+    async def acquire(self, lane: str) -> float:
+        """
+        Waits (within budget) for a slot in `lane`. Returns the admission time, to
+        pass to release(). Raises AdmissionRejectedError when turned away.
+        """
+        if not self.enabled:
+            return time.perf_counter()
+
+        # Nobody may overtake waiters of the same or a higher-priority lane
+        ahead = self.waiting["interactive"] + (self.waiting["bulk"] if lane == "bulk" else 0)
+        if not ahead and self._has_slot(lane):
+            self.in_flight[lane] += 1
+            ADMISSION_DECISIONS.inc(lane=lane, outcome="admitted")
+            return time.perf_counter()
+
+        queue_limit = self.bulk_max_queue if lane == "bulk" else self.max_queue
+        if self.waiting[lane] >= queue_limit or sum(self.waiting.values()) >= self.max_queue:
+            ADMISSION_DECISIONS.inc(lane=lane, outcome="rejected_full")
+            raise AdmissionRejectedError("Server is busy. Retry shortly.", 429)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        self.waiting[lane] += 1
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(lane)
+            ADMISSION_DECISIONS.inc(lane=lane, outcome="rejected_timeout")
+            raise AdmissionRejectedError("Server is overloaded. Retry later.", 503, retry_after=5)
+        except asyncio.CancelledError:
+            # Client went away: give back a slot granted just before
+            if waiter.done() and not waiter.cancelled():
+                self.release(lane)
+            raise
+        finally:
+            self.waiting[lane] -= 1
+        ADMISSION_DECISIONS.inc(lane=lane, outcome="queued")
+        return time.perf_counter()
+
+    def release(self, lane: str, admitted_at: Optional[float] = None):
+        """
+        Frees the slot. With admitted_at, an interactive analysis also feeds the p95 window.
+        """
+        if not self.enabled:
+            return
+        self.in_flight[lane] -= 1
+        if admitted_at is not None and lane == "interactive":
+            now = time.perf_counter()
+            with self._latency_lock:
+                self._latencies.append((now, now - admitted_at))
+        self._wake()
+
+    def releaser(self, lane: str, admitted_at: Optional[float] = None) -> Callable[[], None]:
+        """
+        Idempotent release for slots held by streaming responses. It is called from
+        both the stream's finally and the response's background task, as a client
+        that disconnects early can skip either one.
+        """
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.release(lane, admitted_at)
+
+        return release
+
+    @asynccontextmanager
+    async def admit(self, lane: str):
+        admitted_at = await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane, admitted_at)
+
+    def latency_p95(self) -> Optional[float]:
+        """
+        p95 of interactive analyses finished within the latency window (recomputed at most once a second).
+        """
+        now = time.perf_counter()
+        computed_at, p95 = self._p95
+        if now - computed_at < 1.0:
+            return p95
+        with self._latency_lock:
+            while self._latencies and now - self._latencies[0][0] > self.latency_window_seconds:
+                self._latencies.popleft()
+            ordered = sorted(seconds for _, seconds in self._latencies)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] if ordered else None
+        self._p95 = (now, p95)
+        return p95
+
+    @property
+    def degraded(self) -> bool:
+        """
+        Current mode, without evaluating the load (for stats and probes).
+        """
+        return self.enabled and time.perf_counter() < self._degraded_until
+
+    def is_degraded(self) -> bool:
+        """
+        Evaluates the load: True while the queue or p95 latency is over its threshold,
+        and for degrade_hold_seconds after, so the mode does not flap.
+        Only the admission path calls this; read `degraded` elsewhere.
+        """
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        p95 = self.latency_p95()
+        overloaded = (
+            sum(self.waiting.values()) >= self.degrade_queue_depth
+            or (p95 is not None and p95 >= self.degrade_p95_seconds)
+        )
+        if overloaded:
+            if not self._degraded_logged:
+                logger.warning(f"Admission: degraded mode ON (queued {sum(self.waiting.values())}, p95 {p95}). Skipping AI Brain.")
+                self._degraded_logged = True
+            self._degraded_until = now + self.degrade_hold_seconds
+        elif self._degraded_logged and now >= self._degraded_until:
+            logger.warning("Admission: degraded mode OFF.")
+            self._degraded_logged = False
+        return now < self._degraded_until
+
+    def degrade(self) -> bool:
+        """
+        Whether this analysis should skip Groq. Counted in the degraded metric.
+        """
+        degraded = self.is_degraded()
+        if degraded:
+            ADMISSION_DEGRADED.inc()
+        return degraded
+
+    def stats(self) -> Dict:
+        """
+        Read-only snapshot, safe from any thread: the p95 is the value last
+        computed on the admission path, never recomputed here.
+        """
+        return {
+            "enabled": self.enabled,
+            "in_flight": {lane: self.in_flight[lane] for lane in LANES},
+            "waiting": {lane: self.waiting[lane] for lane in LANES},
+            "degraded": self.degraded,
+            "latency_p95_seconds": self._p95[1],
+        }
+
+
+# Global instance
+admission = AdmissionController(
+    enabled=settings.ADMISSION_ENABLED,
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    bulk_max_in_flight=settings.ADMISSION_BULK_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    bulk_max_queue=settings.ADMISSION_BULK_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    degrade_queue_depth=settings.ADMISSION_DEGRADE_QUEUE_DEPTH,
+    degrade_p95_seconds=settings.ADMISSION_DEGRADE_P95_SECONDS,
+    degrade_hold_seconds=settings.ADMISSION_DEGRADE_HOLD_SECONDS,
+    latency_window_seconds=settings.ADMISSION_LATENCY_WINDOW_SECONDS
+)
@@ -4,6 +4,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import List, Optional
 
 class Settings(BaseSettings):
     """
@@ -19,6 +20,168 @@ class Settings(BaseSettings):
     # Embeddings model config
     EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"
 
+    # Encoder backend: "torch" (sentence-transformers), "onnx" (ONNX Runtime, CPU)
+    # or "remote" (the shared embedding server, see app/embeddings/server.py).
+    # ONNX_MODEL_PATH defaults to the onnx/model.onnx published with the model.
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_MAX_SEQ_LENGTH: int = 512
+    ONNX_MODEL_PATH: Optional[str] = None
+    ONNX_QUANTIZE: bool = False
+    ONNX_INTRA_OP_THREADS: Optional[int] = None
+    ONNX_POOLING: str = "cls"  # BGE models use the [CLS] token
+
+    # Shared embedding server: one process owns the model (EMBEDDING_SERVER_BACKEND)
+    # and multi-worker deployments with EMBEDDING_BACKEND=remote encode through it.
+    # The socket's directory is created owner/group-only (0o770) and the socket
+    # itself 0o660; keep it out of world-writable directories such as /tmp.
+    # Messages longer than EMBEDDING_SERVER_MAX_MESSAGE_BYTES are refused.
+    EMBEDDING_SERVER_SOCKET: str = "data/run/embeddings.sock"
+    EMBEDDING_SERVER_BACKEND: str = "torch"
+    EMBEDDING_SERVER_CONNECT_TIMEOUT: float = 30.0
+    EMBEDDING_SERVER_MAX_MESSAGE_BYTES: int = 64 * 1024 * 1024
+
+    # Load the embedding model, ontology and AI client in the background at
+    # startup. /ready reports 503 until this warmup has finished.
+    WARMUP_ON_STARTUP: bool = True
+
+    # Embedding cache: in-process LRU entries, plus an optional persistent
+    # memory-mapped tier. Set EMBEDDING_CACHE_DIR to enable the disk tier.
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_DIR: Optional[str] = None
+    EMBEDDING_CACHE_READ_ONLY: bool = False
+
+    # Micro-batching: encoder calls from concurrent requests are coalesced for up
+    # to EMBEDDING_BATCH_MAX_DELAY_MS or EMBEDDING_BATCH_MAX_SIZE texts, with at
+    # most EMBEDDING_BATCH_MAX_IN_FLIGHT batches running at once.
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_DELAY_MS: float = 2.0
+    EMBEDDING_BATCH_MAX_IN_FLIGHT: int = 1
+
+    # Skill gap: a JD skill whose best cosine similarity to the resume's skills and
+    # phrases reaches STRONG is a strong match, WEAK a weak match, else missing.
+    # BGE models compress cosines into roughly [0.6, 1] (see the model card), so
+    # unrelated short skill names often score 0.7-0.8; the cut-offs sit near the
+    # top of that range. Re-measure with benchmarks/skill_match_calibration.py
+    # (labelled pairs in benchmarks/fixtures/skill_pairs.json) when the model changes.
+    SKILL_MATCH_STRONG_THRESHOLD: float = 0.90
+    SKILL_MATCH_WEAK_THRESHOLD: float = 0.83
+
+    # Execution pools for CPU-bound work. Encoding runs in ENCODE_THREAD_WORKERS
+    # threads (torch releases the GIL), each encoder call using cpu_count //
+    # ENCODE_THREAD_WORKERS intra-op threads, so keep it small. PDF/DOCX extraction
+    # runs in processes (None = one per core); set PARSE_PROCESS_WORKERS=0 to
+    # extract in threads instead.
+    ENCODE_THREAD_WORKERS: int = 2
+    PARSE_PROCESS_WORKERS: Optional[int] = None
+
+    # Resume extraction: PDF extractors are tried in order until one returns text.
+    # PDFs with at least PDF_PARALLEL_MIN_PAGES pages (and PDF_PARALLEL_MIN_BYTES
+    # bytes) are split into page ranges extracted in parallel.
+    PDF_EXTRACTORS: List[str] = ["pymupdf", "pdfplumber"]
+    PDF_MAX_PAGES: int = 50
+    PDF_PARALLEL_MIN_BYTES: int = 512 * 1024
+    PDF_PARALLEL_MIN_PAGES: int = 8
+    PDF_PARALLEL_PAGES_PER_TASK: int = 4
+    RESUME_MAX_BYTES: int = 10 * 1024 * 1024
+
+    # Parsed-resume cache keyed by file hash. RESUME_CACHE_DIR enables the disk tier.
+    RESUME_CACHE_SIZE: int = 1000
+    RESUME_CACHE_DIR: Optional[str] = None
+    RESUME_CACHE_DISK_MAX_FILES: int = 50000
+
+    # Registered job descriptions (POST /jobs): parsed and embedded once, kept in an
+    # in-process LRU plus, if JOB_STORE_DIR is set (e.g. "data/jobs"), one JSON file
+    # per job there, so registrations survive restarts. None = memory only.
+    JOB_STORE_SIZE: int = 500
+    JOB_STORE_DIR: Optional[str] = None
+    JOB_STORE_DISK_MAX_FILES: int = 10000
+
+    # Bulk screening (POST /analyze/batch)
+    BATCH_MAX_FILES: int = 2000
+    BATCH_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    # Total decompressed bytes accepted from one request's .zip archives
+    BATCH_MAX_ARCHIVE_BYTES: int = 200 * 1024 * 1024
+    BATCH_PARSE_CONCURRENCY: int = 8
+    BATCH_ENCODE_SIZE: int = 32
+
+    # Candidate vector index (POST /search). Switches from exact search to an
+    # IVF index once the corpus passes CANDIDATE_INDEX_ANN_THRESHOLD resumes, and
+    # retrains it each time the corpus grows CANDIDATE_INDEX_RETRAIN_FACTOR times
+    # past its last training (<= 1 never retrains).
+    # In memory only unless CANDIDATE_INDEX_DIR (e.g. "data/candidate_index") is set.
+    CANDIDATE_INDEX_ENABLED: bool = True
+    CANDIDATE_INDEX_DIR: Optional[str] = None
+    CANDIDATE_INDEX_ANN_THRESHOLD: int = 20000
+    CANDIDATE_INDEX_NPROBE: int = 16
+    CANDIDATE_INDEX_SAVE_EVERY: int = 100
+    CANDIDATE_INDEX_RETRAIN_FACTOR: float = 2.0
+
+    # Groq resilience: concurrency limit with a queue-wait budget, circuit breaker,
+    # timeout derived from observed latency (percentile x multiplier, clamped),
+    # and jittered retries for transient (connection / 429 / 5xx) failures.
+    GROQ_MAX_CONCURRENCY: int = 16
+    GROQ_QUEUE_WAIT_SECONDS: float = 2.0
+    GROQ_BREAKER_FAILURES: int = 5
+    GROQ_BREAKER_RESET_SECONDS: float = 30.0
+    GROQ_TIMEOUT_PERCENTILE: float = 99.0
+    GROQ_TIMEOUT_MULTIPLIER: float = 1.5
+    GROQ_TIMEOUT_MIN_SECONDS: float = 2.0
+    GROQ_TIMEOUT_MAX_SECONDS: float = 10.0
+    GROQ_MAX_RETRIES: int = 2
+    # Overall budget of one Groq call: attempts and retry backoff never exceed it
+    GROQ_CALL_DEADLINE_SECONDS: float = 15.0
+
+    # Alternative Groq endpoint, e.g. the load-test stub (benchmarks/groq_server.py).
+    # None uses the SDK default.
+    GROQ_BASE_URL: Optional[str] = None
+
+    # Groq prompt: compact payload of scores, skill gap, the PROMPT_MAX_BULLETS resume
+    # bullets most relevant to the JD and a truncated JD, within PROMPT_TOKEN_BUDGET
+    # tokens (counted with tiktoken's PROMPT_TOKENIZER when installed).
+    PROMPT_TOKEN_BUDGET: int = 1200
+    PROMPT_MAX_BULLETS: int = 8
+    PROMPT_JD_MAX_TOKENS: int = 400
+    PROMPT_BULLET_MAX_TOKENS: int = 80
+    PROMPT_TOKENIZER: str = "cl100k_base"
+
+    # Admission control for the analysis routes. At most ADMISSION_MAX_IN_FLIGHT
+    # analyses run at once (bulk callers: ADMISSION_BULK_MAX_IN_FLIGHT of them).
+    # Up to ADMISSION_MAX_QUEUE more wait, interactive first, for at most
+    # ADMISSION_QUEUE_TIMEOUT_SECONDS; the rest get 429 (queue full) or 503 (wait expired).
+    # Once ADMISSION_DEGRADE_QUEUE_DEPTH requests are queued or the p95 analysis latency
+    # reaches ADMISSION_DEGRADE_P95_SECONDS, Groq is skipped (fallback insights) for at
+    # least ADMISSION_DEGRADE_HOLD_SECONDS.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 32
+    ADMISSION_BULK_MAX_IN_FLIGHT: int = 8
+    ADMISSION_MAX_QUEUE: int = 64
+    ADMISSION_BULK_MAX_QUEUE: int = 16
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_DEGRADE_QUEUE_DEPTH: int = 8
+    ADMISSION_DEGRADE_P95_SECONDS: float = 8.0
+    ADMISSION_DEGRADE_HOLD_SECONDS: float = 15.0
+    ADMISSION_LATENCY_WINDOW_SECONDS: float = 60.0
+
+    # Groq insights cache: "local" (per process), "redis" (shared) or "none"
+    INSIGHTS_CACHE_BACKEND: str = "local"
+    INSIGHTS_CACHE_SIZE: int = 2000
+    INSIGHTS_CACHE_TTL_SECONDS: int = 24 * 3600
+    INSIGHTS_CACHE_REDIS_URL: Optional[str] = None
+
+    # Responses: JSON bodies of at least RESPONSE_COMPRESS_MIN_BYTES are compressed
+    # (brotli when installed and accepted, else gzip).
+    RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4
+
+    # Tracing: per-stage spans are logged as JSON lines at INFO (set WARNING to
+    # silence them) and always aggregated into the /metrics endpoint.
+    TRACE_LOG_LEVEL: str = "INFO"
+
+    # Event-loop lag is sampled every EVENT_LOOP_MONITOR_INTERVAL seconds and
+    # exported on /metrics (0 disables the monitor).
+    EVENT_LOOP_MONITOR_INTERVAL: float = 0.25
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,105 @@
+# backend/app/core/executors.py
+# Purpose: Run CPU-bound work (text extraction, embedding) off the asyncio event loop.
+# Pools are sized from Settings and managed by the application lifespan.
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+
+class ExecutionPools:
+    """
+    Holds a thread pool for encoder calls and a process pool for document extraction.
+    Pools are created on first use (or by start()) and closed by shutdown().
+    """
+
+    def __init__(self):
+        self._encode_pool: Optional[ThreadPoolExecutor] = None
+        self._parse_pool: Optional[Executor] = None
+        # start() runs from the loop and from worker threads (first use); pools are created once
+        self._start_lock = threading.Lock()
+
+    @staticmethod
+    def _size(configured: Optional[int]) -> int:
+        return configured if configured is not None else (os.cpu_count() or 1)
+
+    @staticmethod
+    def encode_workers() -> int:
+        return max(settings.ENCODE_THREAD_WORKERS or 1, 1)
+
+    @classmethod
+    def encoder_threads(cls) -> int:
+        """
+        Intra-op threads for each encoder call: the cores shared out between the
+        encode workers, so concurrent calls do not oversubscribe the CPU.
+        """
+        return max((os.cpu_count() or 1) // cls.encode_workers(), 1)
+
+    def start(self, parse: bool = True):
+        """
+        Creates the encode pool and, unless parse=False (e.g. the embedding
+        server, which never extracts documents), the parse pool.
+        """
+        if self._encode_pool is not None and (self._parse_pool is not None or not parse):
+            return
+        with self._start_lock:
+            self._start_locked(parse)
+
+    def _start_locked(self, parse: bool):
+        if self._encode_pool is None:
+            workers = self.encode_workers()
+            self._encode_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode")
+            print(f"Encode thread pool started with {workers} workers ({self.encoder_threads()} threads each).")
+
+        if parse and self._parse_pool is None:
+            workers = self._size(settings.PARSE_PROCESS_WORKERS)
+            if workers > 0:
+                # spawn: forking a process that already holds torch threads is unsafe
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                print(f"Parse process pool started with {workers} workers.")
+            else:
+                self._parse_pool = self._encode_pool
+                print("Parse process pool disabled. Extracting in the encode thread pool.")
+
+    def shutdown(self):
+        with self._start_lock:
+            self._shutdown_locked()
+
+    def _shutdown_locked(self):
+        if self._parse_pool is not None and self._parse_pool is not self._encode_pool:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+        if self._encode_pool is not None:
+            self._encode_pool.shutdown(wait=True, cancel_futures=True)
+        self._parse_pool = None
+        self._encode_pool = None
+
+    async def run_encode(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run an encoder-bound callable in the thread pool.
+        The caller's context (e.g. the request id used by tracing spans) is carried over.
+        """
+        self.start(parse=False)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._encode_pool, partial(context.run, fn, *args, **kwargs))
+
+    async def run_parse(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a picklable extraction callable in the process pool.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._parse_pool, partial(fn, *args, **kwargs))
+
+
+# Global instance
+executors = ExecutionPools()
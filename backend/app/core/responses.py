@@ -0,0 +1,76 @@
+# backend/app/core/responses.py
+# Purpose: Fast JSON rendering and response compression for large API payloads.
+
+import gzip
+import json
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Pydantic models go through their compiled serializer; everything else through orjson.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class: same output as JSONResponse, rendered with render_json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return accepted
+
+
+def json_response(content: Any, request: Optional[Request] = None, status_code: int = 200) -> Response:
+    """
+    Renders content once and compresses it (br if available, else gzip) when the
+    body reaches RESPONSE_COMPRESS_MIN_BYTES and the client accepts it.
+    """
+    body = render_json(content)
+    headers = {}
+    if request is not None and len(body) >= settings.RESPONSE_COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        headers["Vary"] = "Accept-Encoding"
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
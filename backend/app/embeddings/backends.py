@@ -0,0 +1,217 @@
+# backend/app/embeddings/backends.py
+# Purpose: Encoder backends behind EmbeddingService.
+# "torch" runs sentence-transformers; "onnx" runs ONNX Runtime on CPU, optionally int8 quantized;
+# "remote" forwards to the shared embedding server (app/embeddings/server.py).
+
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from app.core.config import settings
+from app.core.executors import executors
+from app.embeddings.ipc import recv_message, send_message
+
+
+class EncoderBackend:
+    """
+    Base class: turns a list of texts into raw (un-normalized) float32 embeddings.
+    """
+
+    name = "base"
+    dimension: int
+    # Model the vectors come from, for the embedding cache namespace (None = EMBEDDING_MODEL)
+    model_name: Optional[str] = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TorchBackend(EncoderBackend):
+    """
+    The original PyTorch SentenceTransformer encoder.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str, max_seq_length: int):
+        # Heavy import (torch) deferred until the backend is built
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        # Each encode worker gets its share of the cores, not all of them
+        torch.set_num_threads(executors.encoder_threads())
+
+        self.model = SentenceTransformer(model_name)
+        self.model.max_seq_length = max_seq_length
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, convert_to_numpy=True).astype('float32', copy=False)
+
+
+class OnnxBackend(EncoderBackend):
+    """
+    ONNX Runtime encoder for CPU-only nodes.
+    Uses the ONNX export published with the model on the Hugging Face Hub (or a local
+    file), with optional dynamic int8 quantization cached next to the source model.
+    Texts are sorted by length before batching so padding stays small.
+    """
+
+    BATCH_SIZE = 32
+
+    def __init__(self, model_name: str, max_seq_length: int, model_path: Optional[str] = None,
+                 quantize: bool = False, intra_op_threads: Optional[int] = None, pooling: str = "cls"):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        if pooling not in ("cls", "mean"):
+            raise ValueError("ONNX_POOLING must be 'cls' or 'mean'.")
+        self.pooling = pooling
+        self.name = "onnx-int8" if quantize else "onnx"
+
+        onnx_path = Path(model_path) if model_path else Path(self._download(model_name, "onnx/model.onnx"))
+        if quantize:
+            onnx_path = self._quantized(onnx_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads or executors.encoder_threads()
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(onnx_path), sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(self._download(model_name, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        self.dimension = int(self.encode(["dimension probe"]).shape[1])
+
+    @staticmethod
+    def _download(model_name: str, filename: str) -> str:
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(repo_id=model_name, filename=filename)
+
+    @staticmethod
+    def _quantized(onnx_path: Path) -> Path:
+        """
+        Dynamic int8 quantization of the weights, done once and cached on disk.
+        """
+        quantized_path = onnx_path.with_name(onnx_path.stem + ".int8.onnx")
+        if not quantized_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print(f"Quantizing {onnx_path.name} to int8...")
+            tmp_path = quantized_path.with_suffix(".tmp")
+            quantize_dynamic(str(onnx_path), str(tmp_path), weight_type=QuantType.QInt8)
+            os.replace(tmp_path, quantized_path)
+        return quantized_path
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = np.empty((len(texts), 0), dtype='float32')
+
+        for start in range(0, len(order), self.BATCH_SIZE):
+            chunk = order[start:start + self.BATCH_SIZE]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in chunk])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype='int64')
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype='int64'),
+                "attention_mask": attention_mask,
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype='int64'),
+            }
+            feeds = {k: v for k, v in feeds.items() if k in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+
+            if self.pooling == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = attention_mask[:, :, None].astype('float32')
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+            if output.shape[1] == 0:
+                output = np.empty((len(texts), pooled.shape[1]), dtype='float32')
+            output[chunk] = pooled
+        return output
+
+
+class RemoteBackend(EncoderBackend):
+    """
+    Client of the shared embedding server over a Unix socket.
+    API workers using it hold no model weights. Each encode thread keeps its
+    own connection, and vectors are read straight into the array's buffer.
+    """
+
+    def __init__(self, socket_path: str, connect_timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+
+        info = self._request({"op": "info"})[0]
+        # Report the server's model and backend so the embedding cache namespace matches them
+        self.model_name = info["model"]
+        self.name = info["backend"]
+        self.dimension = int(info["dimension"])
+        print(f"Connected to embedding server at {socket_path} ({info['model']}, backend: {self.name}).")
+
+    def _connect(self) -> socket.socket:
+        # The server may still be loading the model when workers start
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f"Embedding server not reachable at {self.socket_path}.")
+                time.sleep(0.5)
+
+    def _request(self, header: dict):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = self._local.sock = self._connect()
+        try:
+            send_message(sock, header)
+            response, payload = recv_message(sock, settings.EMBEDDING_SERVER_MAX_MESSAGE_BYTES)
+        except (OSError, ConnectionError):
+            # Drop the broken connection; the next call reconnects
+            sock.close()
+            self._local.sock = None
+            raise
+        if "error" in response:
+            raise RuntimeError(f"Embedding server error: {response['error']}")
+        return response, payload
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype='float32')
+        response, payload = self._request({"op": "encode", "texts": texts})
+        return np.frombuffer(payload, dtype='float32').reshape(response["rows"], response["dim"])
+
+
+def create_backend(name: Optional[str] = None) -> EncoderBackend:
+    """
+    Builds the encoder backend selected by EMBEDDING_BACKEND (or `name`).
+    """
+    name = (name or settings.EMBEDDING_BACKEND).lower()
+    if name == "remote":
+        return RemoteBackend(settings.EMBEDDING_SERVER_SOCKET, settings.EMBEDDING_SERVER_CONNECT_TIMEOUT)
+
+    print(f"Loading Embedding Model: {settings.EMBEDDING_MODEL} (backend: {name})...")
+
+    if name == "torch":
+        return TorchBackend(settings.EMBEDDING_MODEL, settings.EMBEDDING_MAX_SEQ_LENGTH)
+    if name in ("onnx", "onnx-int8"):
+        return OnnxBackend(
+            settings.EMBEDDING_MODEL,
+            settings.EMBEDDING_MAX_SEQ_LENGTH,
+            model_path=settings.ONNX_MODEL_PATH,
+            quantize=settings.ONNX_QUANTIZE or name == "onnx-int8",
+            intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+            pooling=settings.ONNX_POOLING
+        )
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {name}. Use 'torch', 'onnx' or 'remote'.")
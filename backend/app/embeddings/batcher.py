@@ -0,0 +1,120 @@
+# backend/app/embeddings/batcher.py
+# Purpose: Coalesce encoder calls from concurrent requests into shared forward passes.
+# Callers await their vectors; texts arriving within a few milliseconds of each
+# other are deduplicated and encoded together in the encode thread pool.
+
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.core.executors import executors
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching in front of a synchronous encode function.
+
+    A batch is flushed when it holds max_batch_size texts or when its oldest
+    request has waited max_delay seconds. At most max_in_flight batches run at
+    once; while the encoder is busy, new requests keep accumulating into the
+    next batch, so batches grow with load instead of queueing tiny passes.
+    Length bucketing and padding are left to the backend encode, which sorts
+    its input by length before batching.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int = 64,
+                 max_delay: float = 0.002, max_in_flight: int = 1):
+        self._encode = encode
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_delay = max_delay
+        self.max_in_flight = max(max_in_flight, 1)
+
+        self._pending: Deque[Tuple[List[str], asyncio.Future]] = deque()
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+        # The loop keeps only weak references to tasks; hold running batches here
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Raw embeddings for `texts`, in order, computed as part of a shared batch.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_texts += len(texts)
+
+        if self._pending_texts >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Encoder busy: the batch keeps growing and is started when a slot frees up
+        if not self._pending or self._in_flight >= self.max_in_flight:
+            return
+
+        batch, size = [], 0
+        while self._pending and size < self.max_batch_size:
+            texts, future = self._pending.popleft()
+            batch.append((texts, future))
+            size += len(texts)
+        self._pending_texts -= size
+
+        self._in_flight += 1
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        if self._pending and self._timer is None and self._in_flight < self.max_in_flight:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+
+    async def _run(self, batch: List[Tuple[List[str], asyncio.Future]]):
+        # Identical texts from different requests are encoded once
+        positions: Dict[str, int] = {}
+        for texts, _ in batch:
+            for text in texts:
+                positions.setdefault(text, len(positions))
+
+        try:
+            vectors = await executors.run_encode(self._encode, list(positions))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        except BaseException:
+            # Batch task cancelled (e.g. loop shutdown): do not leave its callers waiting
+            for _, future in batch:
+                future.cancel()
+            raise
+        else:
+            for texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[[positions[text] for text in texts]])
+        finally:
+            self.batches += 1
+            self.requests += len(batch)
+            self.texts += len(positions)
+            self._in_flight -= 1
+            # Whatever queued up while this batch ran goes next, without waiting
+            if self._pending:
+                self._flush()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "mean_batch_texts": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "pending_requests": len(self._pending),
+            "in_flight": self._in_flight,
+        }
@@ -2,18 +2,326 @@
 # Purpose: Handle vector embedding generation and similarity search.
 # Uses local models (No API calls) for zero-latency scoring.
 
-from sentence_transformers import SentenceTransformer
-import faiss
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
 import numpy as np
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.core.config import settings
+from app.core.telemetry import ENCODER_BATCH_SIZE, span
+from app.embeddings.backends import EncoderBackend, create_backend
+from app.embeddings.batcher import MicroBatcher
+
+try:
+    import fcntl
+except ImportError:  # Windows: the disk tier then supports a single writer only
+    fcntl = None
+
+
+class _DiskTier:
+    """
+    Persistent cache tier: one append-only float32 file memory-mapped for reads,
+    plus an append-only index log of "key<TAB>row" lines after a JSON header
+    line holding the dimension.
+    Several writer processes may share a directory: appends take an exclusive
+    lock on `.lock`, rows come from the real file offset, and index records are
+    only ever appended, so a flush writes just its own new records and every
+    instance catches up by reading the log from where it last stopped.
+    Read-only instances never lock.
+    """
+
+    FLUSH_EVERY = 64
+
+    def __init__(self, directory: str, dimension: int, read_only: bool = False):
+        self.directory = Path(directory)
+        self.dimension = dimension
+        self.read_only = read_only
+        self.row_bytes = dimension * 4
+        self.vectors_path = self.directory / "vectors.f32"
+        self.index_path = self.directory / "index.log"
+        self.lock_path = self.directory / ".lock"
+
+        self.offsets: Dict[str, int] = {}
+        self._log_offset = 0  # bytes of the index log already applied
+        self._foreign = False  # log written for another dimension (read-only instances)
+        self._mmap: Optional[np.memmap] = None
+        self._unlogged: List[Tuple[str, int]] = []
+        # In-process state (offsets, memmap, log position); the file lock covers other processes
+        self._lock = threading.Lock()
+
+        if not read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self._locked():
+                self._repair()
+        self._read_log()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive inter-process lock (no-op where fcntl is unavailable: single writer only).
+        """
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _header(self) -> bytes:
+        return (json.dumps({"dimension": self.dimension}) + "\n").encode("utf-8")
+
+    def _repair(self):
+        """
+        Called under the lock on open: drops a store written with another
+        dimension, and truncates a partial trailing row or index line left by a
+        crashed writer.
+        """
+        dimension = None
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "rb") as f:
+                    dimension = json.loads(f.readline()).get("dimension")
+            except Exception:
+                dimension = None
+        if dimension != self.dimension:
+            if self.index_path.exists():
+                print(f"Warning: Embedding cache at {self.directory} has a different dimension or a bad index. Resetting it.")
+            self.vectors_path.unlink(missing_ok=True)
+            (self.directory / "index.json").unlink(missing_ok=True)  # index format of older versions
+            self.index_path.write_bytes(self._header())
+            return
+
+        if self.vectors_path.exists():
+            size = self.vectors_path.stat().st_size
+            if size % self.row_bytes:
+                with open(self.vectors_path, "r+b") as f:
+                    f.truncate(size - size % self.row_bytes)
+        with open(self.index_path, "r+b") as f:
+            data = f.read()
+            if not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _row_count(self) -> int:
+        if not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // self.row_bytes
+
+    def _read_log(self):
+        """
+        Applies index records appended since the last read (complete lines only).
+        Callers hold self._lock, except during __init__.
+        """
+        if self._foreign:
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Warning: Could not read embedding cache index {self.index_path}: {e}")
+            return
+        complete = data.rfind(b"\n") + 1
+        if not complete:
+            return
+        lines = data[:complete].decode("utf-8").splitlines()
+        if self._log_offset == 0:
+            try:
+                dimension = json.loads(lines[0]).get("dimension")
+            except Exception:
+                dimension = None
+            if dimension != self.dimension:
+                print(f"Warning: Embedding cache at {self.directory} has a different dimension. Ignoring it.")
+                self._foreign = True
+                return
+            lines = lines[1:]
+        for line in lines:
+            key, _, row = line.rpartition("\t")
+            if key:
+                self.offsets[key] = int(row)
+        self._log_offset += complete
+
+    def _maybe_reload_index(self):
+        # Other processes may have appended records since we last looked
+        try:
+            size = self.index_path.stat().st_size
+        except OSError:
+            return
+        if size > self._log_offset:
+            self._read_log()
+
+    def _mapping(self, row: int) -> Optional[np.memmap]:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            rows = self._row_count()
+            if row >= rows:
+                return None
+            self._mmap = np.memmap(self.vectors_path, dtype='float32', mode='r', shape=(rows, self.dimension))
+        return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self.offsets.get(key)
+            if row is None and self.read_only:
+                self._maybe_reload_index()
+                row = self.offsets.get(key)
+            mapping = self._mapping(row) if row is not None else None
+        if mapping is None:
+            return None
+        # Copying the row may fault pages in from disk; done outside the lock
+        return np.array(mapping[row])
+
+    def put(self, key: str, vector: np.ndarray):
+        with self._lock:
+            if self.read_only or key in self.offsets:
+                return
+            with self._locked():
+                with open(self.vectors_path, "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(np.asarray(vector, dtype='float32').tobytes())
+            row = offset // self.row_bytes
+            self.offsets[key] = row
+            self._unlogged.append((key, row))
+            if len(self._unlogged) >= self.FLUSH_EVERY:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.read_only or not self._unlogged:
+            return
+        records = "".join(f"{key}\t{row}\n" for key, row in self._unlogged).encode("utf-8")
+        with self._locked():
+            # Pick up other writers' records first, so our log position stays at the end
+            self._read_log()
+            with open(self.index_path, "ab") as f:
+                f.write(records)
+        self._log_offset += len(records)
+        self._unlogged = []
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+    Keys are (model name, sha256 of whitespace-normalized text).
+    Tier 1 is a bounded in-process LRU; tier 2 is an optional memory-mapped disk store.
+    """
+
+    def __init__(self, model_name: str, dimension: int, max_entries: int = 10000,
+                 directory: Optional[str] = None, read_only: bool = False):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(directory, dimension, read_only) if directory else None
+        if self._disk is not None:
+            atexit.register(self.flush)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, text: str) -> str:
+        normalized = " ".join(text.split())
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{digest}"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+
+        # The disk tier has its own lock; memory hits never wait on disk reads
+        if self._disk is not None:
+            vector = self._disk.get(key)
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, vector)
+                return vector
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, vector: np.ndarray):
+        key = self.key(text)
+        # Copy so a cached row does not pin the whole encoded batch in memory
+        vector = np.array(vector, dtype='float32')
+        with self._lock:
+            self._remember(key, vector)
+        if self._disk is not None:
+            self._disk.put(key, vector)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def flush(self):
+        if self._disk is not None:
+            self._disk.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for sizing the cache.
+        """
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_entries": len(self._disk.offsets) if self._disk is not None else 0,
+        }
+
 
 class EmbeddingService:
-    def __init__(self):
-        # Load model once
-        print(f"Loading Embedding Model: {settings.EMBEDDING_MODEL}...")
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
-        self.dimension = self.model.get_sentence_embedding_dimension()
+    def __init__(self, backend: Optional[EncoderBackend] = None):
+        # Load model once (backend selected by EMBEDDING_BACKEND)
+        self.backend = backend or create_backend()
+        self.dimension = self.backend.dimension
+
+        # Different backends/quantization give slightly different vectors,
+        # so non-default backends get their own cache namespace. A remote backend
+        # reports the model the server actually loaded.
+        model_name = self.backend.model_name or settings.EMBEDDING_MODEL
+        cache_namespace = model_name
+        if self.backend.name != "torch":
+            cache_namespace = f"{model_name}@{self.backend.name}"
+
+        self.cache = EmbeddingCache(
+            cache_namespace,
+            self.dimension,
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            directory=settings.EMBEDDING_CACHE_DIR,
+            read_only=settings.EMBEDDING_CACHE_READ_ONLY
+        )
+
+        # Shared forward passes for concurrent async callers (aembed_batch / aembed_unique)
+        self.batcher = MicroBatcher(
+            self._encode,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_delay=settings.EMBEDDING_BATCH_MAX_DELAY_MS / 1000,
+            max_in_flight=settings.EMBEDDING_BATCH_MAX_IN_FLIGHT
+        )
 
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -21,36 +329,130 @@ class EmbeddingService:
         """
         if not text:
             return np.zeros(self.dimension, dtype='float32')
-        return self.model.encode([text])[0]
+        return self.embed_batch([text])[0]
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        ENCODER_BATCH_SIZE.observe(len(texts))
+        with span("embed", texts=len(texts), backend=self.backend.name):
+            return self.backend.encode(texts)
+
+    def _lookup(self, texts: List[str]) -> Tuple[np.ndarray, Dict[str, List[int]]]:
+        """
+        Fills cached rows; returns the matrix and the positions of each cache miss.
+        """
+        embeddings = np.empty((len(texts), self.dimension), dtype='float32')
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text)
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+        return embeddings, missing
+
+    def _fill(self, embeddings: np.ndarray, missing: Dict[str, List[int]], encoded: np.ndarray,
+              normalize: bool) -> np.ndarray:
+        for text, vector in zip(missing, encoded):
+            self.cache.put(text, vector)
+            embeddings[missing[text]] = vector
 
-    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+        return embeddings
+
+    def embed_batch(self, texts: List[str], normalize: bool = False) -> np.ndarray:
         """
         Generate embeddings for a list of strings.
+        With normalize=True the rows are unit length, so dot products are cosines.
+        Cached vectors are reused; only the misses go through the model, in one batch.
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype='float32')
+
+        embeddings, missing = self._lookup(texts)
+        encoded = self._encode(list(missing)) if missing else []
+        return self._fill(embeddings, missing, encoded, normalize)
+
+    async def aembed_batch(self, texts: List[str], normalize: bool = False) -> np.ndarray:
+        """
+        Async embed_batch for the event loop. Cache misses go through the
+        micro-batcher, so concurrent requests share encoder forward passes.
         """
         if not texts:
             return np.empty((0, self.dimension), dtype='float32')
-        return self.model.encode(texts)
+
+        embeddings, missing = self._lookup(texts)
+        encoded = await self.batcher.encode(list(missing)) if missing else []
+        return self._fill(embeddings, missing, encoded, normalize)
+
+    @staticmethod
+    def _unique(texts: Iterable[str]) -> Dict[str, int]:
+        positions: Dict[str, int] = {}
+        for text in texts:
+            if text and text not in positions:
+                positions[text] = len(positions)
+        return positions
+
+    def embed_unique(self, texts: Iterable[str]) -> Tuple[Dict[str, int], np.ndarray]:
+        """
+        Deduplicates the non-empty texts (keeping order) and encodes them as one
+        normalized batch. Returns the row of each text, and the matrix.
+        """
+        positions = self._unique(texts)
+        return positions, self.embed_batch(list(positions), normalize=True)
+
+    async def aembed_unique(self, texts: Iterable[str]) -> Tuple[Dict[str, int], np.ndarray]:
+        """
+        Async embed_unique, micro-batched with other concurrent callers.
+        """
+        positions = self._unique(texts)
+        return positions, await self.aembed_batch(list(positions), normalize=True)
+
+    @staticmethod
+    def pair_similarities(positions: Dict[str, int], embeddings: np.ndarray,
+                          pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Cosine similarity of each (source, target) pair, read from an embed_unique() result.
+        Pairs with an empty side score 0.0.
+        """
+        scores = np.zeros(len(pairs), dtype='float32')
+        valid = [i for i, (source, target) in enumerate(pairs) if source and target]
+        if valid:
+            sources = embeddings[[positions[pairs[i][0]] for i in valid]]
+            targets = embeddings[[positions[pairs[i][1]] for i in valid]]
+            scores[valid] = np.einsum('ij,ij->i', sources, targets)
+        return [float(score) for score in scores]
+
+    def compute_similarity_scores(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Compute cosine similarity for many (source, target) text pairs at once.
+        Every unique non-empty text is encoded exactly once in a single batch.
+        Pairs with an empty side score 0.0.
+        """
+        if not pairs:
+            return []
+        positions, embeddings = self.embed_unique(text for pair in pairs for text in pair)
+        return self.pair_similarities(positions, embeddings, pairs)
 
     def compute_similarity_score(self, source_text: str, target_text: str) -> float:
         """
         Compute cosine similarity between two text blocks.
         Returns a float between 0.0 and 1.0 (normalized).
         """
-        if not source_text or not target_text:
-            return 0.0
-
-        emb1 = self.embed_text(source_text).reshape(1, -1)
-        emb2 = self.embed_text(target_text).reshape(1, -1)
-        
-        # FAISS implementation for similarity
-        index = faiss.IndexFlatIP(self.dimension)
-        faiss.normalize_L2(emb1)
-        faiss.normalize_L2(emb2)
-        
-        index.add(emb1)
-        D, I = index.search(emb2, 1) # search emb2 in index of emb1
-        
-        return float(D[0][0])
-
-# Global instance
-embedding_service = EmbeddingService()
+        return self.compute_similarity_scores([(source_text, target_text)])[0]
+
+# Global instance, created on first use (or by the startup warmup)
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
+
+def get_embedding_service() -> EmbeddingService:
+    global _embedding_service
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService()
+    return _embedding_service
+
+def is_embedding_service_loaded() -> bool:
+    return _embedding_service is not None
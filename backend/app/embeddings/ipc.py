@@ -0,0 +1,79 @@
+# backend/app/embeddings/ipc.py
+# Purpose: Wire protocol between API workers and the shared embedding server.
+# Every message is a 4-byte big-endian header length, a JSON header, and an
+# optional raw payload of header["nbytes"] bytes (float32 vectors, row-major).
+# Readers refuse lengths over their max_bytes before allocating anything.
+
+import asyncio
+import json
+import socket
+import struct
+from typing import Optional, Tuple
+
+_LENGTH = struct.Struct(">I")
+
+
+class MessageTooLargeError(ValueError):
+    """Raised when a length prefix exceeds the reader's limit."""
+
+
+def _check_size(size: int, max_bytes: Optional[int], what: str):
+    if max_bytes is not None and size > max_bytes:
+        raise MessageTooLargeError(f"Embedding {what} of {size} bytes exceeds the {max_bytes}-byte limit.")
+
+
+def _pack_header(header: dict) -> bytes:
+    body = json.dumps(header).encode("utf-8")
+    return _LENGTH.pack(len(body)) + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """
+    Reads exactly `size` bytes straight into one buffer (no intermediate chunks).
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Embedding server closed the connection.")
+        received += count
+    return buffer
+
+
+def send_message(sock: socket.socket, header: dict, payload: Optional[memoryview] = None):
+    if payload is not None:
+        header = dict(header, nbytes=payload.nbytes)
+        sock.sendall(_pack_header(header))
+        sock.sendall(payload)
+    else:
+        sock.sendall(_pack_header(header))
+
+
+def recv_message(sock: socket.socket, max_bytes: Optional[int] = None) -> Tuple[dict, Optional[bytearray]]:
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    _check_size(length, max_bytes, "header")
+    header = json.loads(_recv_exact(sock, length))
+    nbytes = header.get("nbytes")
+    if nbytes:
+        _check_size(nbytes, max_bytes, "payload")
+    return header, (_recv_exact(sock, nbytes) if nbytes else None)
+
+
+async def read_message(reader: asyncio.StreamReader, max_bytes: Optional[int] = None) -> dict:
+    """
+    Server side: requests are header-only.
+    """
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    _check_size(length, max_bytes, "request")
+    return json.loads(await reader.readexactly(length))
+
+
+async def write_message(writer: asyncio.StreamWriter, header: dict, payload: Optional[memoryview] = None):
+    if payload is not None:
+        header = dict(header, nbytes=payload.nbytes)
+    writer.write(_pack_header(header))
+    if payload is not None and payload.nbytes:
+        writer.write(payload)
+    await writer.drain()
@@ -0,0 +1,115 @@
+# backend/app/embeddings/server.py
+# Purpose: Shared embedding server for multi-worker deployments.
+# One process owns the model; API workers started with EMBEDDING_BACKEND=remote
+# send encode requests over a Unix socket, so adding workers adds CPU capacity
+# without adding a copy of the model and torch runtime to each one.
+#
+# Run from the backend directory, before (or alongside) the API workers:
+#   python -m app.embeddings.server
+#   EMBEDDING_BACKEND=remote uvicorn app.main:app --workers 4
+
+import asyncio
+import os
+import numpy as np
+from app.core.config import settings
+from app.core.executors import executors
+from app.embeddings.backends import EncoderBackend, create_backend
+from app.embeddings.batcher import MicroBatcher
+from app.embeddings.ipc import MessageTooLargeError, read_message, write_message
+
+
+class EmbeddingServer:
+    """
+    Serves encode requests from many connections. Requests from all workers go
+    through one micro-batcher, so concurrent traffic shares forward passes.
+    """
+
+    def __init__(self, backend: EncoderBackend):
+        self.backend = backend
+        self.batcher = MicroBatcher(
+            backend.encode,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_delay=settings.EMBEDDING_BATCH_MAX_DELAY_MS / 1000,
+            max_in_flight=settings.EMBEDDING_BATCH_MAX_IN_FLIGHT
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await read_message(reader, settings.EMBEDDING_SERVER_MAX_MESSAGE_BYTES)
+                except asyncio.IncompleteReadError:
+                    break  # worker closed the connection
+                except MessageTooLargeError as e:
+                    # The oversized body is still unread, so the stream cannot be resynced
+                    print(f"Embedding server: {e} Closing the connection.")
+                    await write_message(writer, {"error": str(e)})
+                    break
+
+                try:
+                    if request.get("op") == "info":
+                        await write_message(writer, {
+                            "model": settings.EMBEDDING_MODEL,
+                            "backend": self.backend.name,
+                            "dimension": self.backend.dimension,
+                        })
+                    elif request.get("op") == "encode":
+                        vectors = np.ascontiguousarray(await self.batcher.encode(request["texts"]), dtype='float32')
+                        await write_message(
+                            writer,
+                            {"rows": vectors.shape[0], "dim": vectors.shape[1]},
+                            memoryview(vectors).cast("B")
+                        )
+                    else:
+                        await write_message(writer, {"error": f"Unknown op: {request.get('op')}"})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    print(f"Embedding server error: {e}")
+                    await write_message(writer, {"error": str(e)})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(socket_path: str):
+    if settings.EMBEDDING_SERVER_BACKEND.lower() == "remote":
+        raise ValueError("EMBEDDING_SERVER_BACKEND must be a local backend ('torch' or 'onnx').")
+    backend = create_backend(settings.EMBEDDING_SERVER_BACKEND)
+    # Encoding only: the server never extracts documents, so no parse pool
+    executors.start(parse=False)
+    server = EmbeddingServer(backend)
+
+    # A socket file left by a previous run would make bind() fail
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # The umask applies at creation, so neither the directory nor the socket is
+    # ever reachable by other users, not even between bind() and a chmod
+    previous_umask = os.umask(0o007)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o770, exist_ok=True)
+        os.umask(0o117)
+        unix_server = await asyncio.start_unix_server(server.handle, path=socket_path)
+    finally:
+        os.umask(previous_umask)
+    print(f"Embedding server listening on {socket_path} (backend: {backend.name}).")
+
+    try:
+        async with unix_server:
+            await unix_server.serve_forever()
+    finally:
+        executors.shutdown()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    try:
+        asyncio.run(serve(settings.EMBEDDING_SERVER_SOCKET))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
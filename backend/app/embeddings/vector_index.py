@@ -0,0 +1,357 @@
+# backend/app/embeddings/vector_index.py
+# Purpose: Persistent index of analyzed resumes for fast top-k retrieval against a JD.
+# Each candidate is stored as its three section embeddings laid end to end, so one
+# inner product with a weighted JD query reproduces the Rule Engine's weighted score.
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.embeddings.embedder import get_embedding_service
+from app.utils.constants import WEIGHT_SKILLS, WEIGHT_EXPERIENCE, WEIGHT_projects
+
+
+class CandidateIndex:
+    """
+    Candidate store backed by FAISS.
+    Exact inner-product search (IndexFlatIP) for small corpora, migrated to
+    IndexIVFFlat when the corpus passes the configured threshold, and retrained
+    (with more lists) whenever it grows retrain_factor times past its last training.
+    Supports add/upsert/delete and save/load to a directory.
+    Slow work never holds the index lock: IVF training runs on a copy of the
+    corpus in a background thread, and saves write an in-memory copy to disk.
+    """
+
+    INDEX_FILE = "index.faiss"
+    META_FILE = "candidates.json"
+
+    def __init__(self, dimension: int, directory: Optional[str] = None,
+                 ann_threshold: int = 20000, nprobe: int = 16, save_every: int = 100,
+                 retrain_factor: float = 2.0):
+        self.section_dimension = dimension
+        self.dimension = dimension * 3
+        self.directory = Path(directory) if directory else None
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.save_every = save_every
+        self.retrain_factor = retrain_factor
+
+        self._lock = threading.Lock()
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._metadata: Dict[str, dict] = {}
+        self._next_label = 0
+        self._unsaved = 0
+        self.index = self._flat_index()
+
+        # IVF migration: (label, vector or None for a removal) written while training
+        self._journal: Optional[List[Tuple[int, Optional[np.ndarray]]]] = None
+        self._migration_failed = False
+        # Corpus size the IVF index was last trained on (0 while exact)
+        self._trained_size = 0
+        # Saves: one writer at a time, and an older snapshot never overwrites a newer one
+        self._save_lock = threading.Lock()
+        self._saving = False
+        self._snapshot_seq = 0
+        self._written_seq = 0
+
+        if self.directory is not None:
+            self.load()
+
+    def _flat_index(self):
+        import faiss
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+
+    @property
+    def is_ann(self) -> bool:
+        import faiss
+        return isinstance(self.index, faiss.IndexIVF)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @staticmethod
+    def candidate_vector(section_vectors: np.ndarray) -> np.ndarray:
+        """
+        (3, d) normalized skills/experience/projects vectors -> one (3d,) vector.
+        """
+        return np.ascontiguousarray(section_vectors, dtype='float32').reshape(-1)
+
+    @staticmethod
+    def query_vector(jd_text_vector: np.ndarray, jd_skills_vector: np.ndarray) -> np.ndarray:
+        """
+        Weighted JD query; its inner product with a candidate vector equals the
+        Rule Engine's weighted total (skills vs JD skills, experience/projects vs JD text).
+        """
+        return np.concatenate([
+            jd_skills_vector * WEIGHT_SKILLS,
+            jd_text_vector * WEIGHT_EXPERIENCE,
+            jd_text_vector * WEIGHT_projects,
+        ]).astype('float32')
+
+    def upsert(self, candidate_id: str, section_vectors: np.ndarray, metadata: Optional[dict] = None):
+        """
+        Add a candidate, replacing any previous entry with the same id.
+        """
+        vector = self.candidate_vector(section_vectors).reshape(1, -1)
+        with self._lock:
+            label = self._labels.get(candidate_id)
+            if label is not None:
+                self.index.remove_ids(np.array([label], dtype='int64'))
+                if self._journal is not None:
+                    self._journal.append((label, None))
+            else:
+                label = self._next_label
+                self._next_label += 1
+                self._labels[candidate_id] = label
+                self._ids[label] = candidate_id
+
+            self.index.add_with_ids(vector, np.array([label], dtype='int64'))
+            if self._journal is not None:
+                self._journal.append((label, vector))
+            self._metadata[candidate_id] = dict(metadata or {}, indexed_at=time.time())
+            self._after_write()
+
+    def delete(self, candidate_id: str) -> bool:
+        with self._lock:
+            label = self._labels.pop(candidate_id, None)
+            if label is None:
+                return False
+            del self._ids[label]
+            self._metadata.pop(candidate_id, None)
+            self.index.remove_ids(np.array([label], dtype='int64'))
+            if self._journal is not None:
+                self._journal.append((label, None))
+            self._after_write()
+            return True
+
+    def search(self, query: np.ndarray, top_k: int = 10) -> List[Tuple[str, float, dict]]:
+        """
+        Returns (candidate_id, weighted score in 0..1, metadata), best first.
+        """
+        if top_k <= 0:
+            return []
+        with self._lock:
+            if not self._labels:
+                return []
+            scores, labels = self.index.search(query.reshape(1, -1).astype('float32'), min(top_k, len(self._labels)))
+
+            results = []
+            for score, label in zip(scores[0], labels[0]):
+                candidate_id = self._ids.get(int(label))
+                if candidate_id is not None:
+                    results.append((candidate_id, float(score), self._metadata.get(candidate_id, {})))
+            return results
+
+    def _after_write(self):
+        # Called under the index lock
+        self._unsaved += 1
+        if self._journal is None and not self._migration_failed:
+            if self.is_ann:
+                # IVF lists trained on a much smaller corpus get long and unbalanced
+                if self.retrain_factor > 1 and len(self._labels) >= self._trained_size * self.retrain_factor:
+                    self._start_migration()
+            elif len(self._labels) >= self.ann_threshold:
+                self._start_migration()
+        if self.directory is not None and self._unsaved >= self.save_every and not self._saving:
+            self._saving = True
+            threading.Thread(
+                target=self._save_in_background, args=self._snapshot_locked(),
+                name="candidate-index-save", daemon=True
+            ).start()
+
+    def _corpus_locked(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of every stored (vector, label), read from the flat index or from the
+        IVF inverted lists (IVFFlat codes are the raw float32 vectors).
+        """
+        import faiss
+
+        if not self.is_ann:
+            vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+            return vectors, faiss.vector_to_array(self.index.id_map).astype('int64')
+
+        invlists = self.index.invlists
+        vectors, labels = [], []
+        for list_no in range(self.index.nlist):
+            size = invlists.list_size(list_no)
+            if size:
+                labels.append(faiss.rev_swig_ptr(invlists.get_ids(list_no), size).copy())
+                codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size)
+                vectors.append(codes.view('float32').reshape(size, self.dimension).copy())
+        if not labels:
+            return np.empty((0, self.dimension), dtype='float32'), np.empty(0, dtype='int64')
+        return np.concatenate(vectors), np.concatenate(labels).astype('int64')
+
+    def _start_migration(self):
+        """
+        Copies the corpus and trains a new IVF index on a background thread. The
+        current index keeps serving meanwhile; its writes are journaled and replayed
+        at the swap.
+        """
+        vectors, labels = self._corpus_locked()
+        self._journal = []
+        threading.Thread(
+            target=self._migrate_to_ivf, args=(vectors, labels), name="candidate-index-ivf", daemon=True
+        ).start()
+
+    def _migrate_to_ivf(self, vectors: np.ndarray, labels: np.ndarray):
+        """
+        Rebuild as IVF (from the flat index, or a retrain of the IVF one), trained on
+        a copy of the corpus.
+        """
+        import faiss
+
+        retrain = self.is_ann
+        count = len(labels)
+        nlist = max(1, int(4 * math.sqrt(count)))
+        try:
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            ivf = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            ivf.train(vectors)
+            ivf.add_with_ids(vectors, labels)
+            ivf.nprobe = self.nprobe
+        except Exception as e:
+            print(f"Warning: Candidate index IVF training failed, keeping the current index: {e}")
+            with self._lock:
+                self._journal = None
+                self._migration_failed = True
+            return
+
+        with self._lock:
+            for label, vector in self._journal:
+                ivf.remove_ids(np.array([label], dtype='int64'))
+                if vector is not None:
+                    ivf.add_with_ids(vector, np.array([label], dtype='int64'))
+            replayed = len(self._journal)
+            self.index = ivf
+            self._trained_size = count
+            self._journal = None
+        action = "retrained" if retrain else "migrated to IVF"
+        print(f"Candidate index {action} ({count} candidates, nlist={nlist}, {replayed} writes replayed).")
+
+    def wait_for_migration(self, timeout: float = 60.0) -> bool:
+        """
+        Blocks until a running IVF migration has swapped in (tests and benchmarks).
+        """
+        deadline = time.monotonic() + timeout
+        while self._journal is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._journal is None
+
+    def save(self):
+        """
+        Writes the index and metadata now (e.g. at shutdown).
+        """
+        if self.directory is None:
+            return
+        with self._lock:
+            snapshot = self._snapshot_locked()
+        self._write_snapshot(*snapshot)
+
+    def _snapshot_locked(self) -> Tuple[int, np.ndarray, dict]:
+        """
+        In-memory copy of the index and metadata, taken under the index lock.
+        """
+        import faiss
+
+        self._snapshot_seq += 1
+        self._unsaved = 0
+        meta = {
+            "dimension": self.dimension,
+            "next_label": self._next_label,
+            "trained_size": self._trained_size,
+            "candidates": {
+                candidate_id: {"label": label, "metadata": self._metadata.get(candidate_id, {})}
+                for candidate_id, label in self._labels.items()
+            }
+        }
+        return self._snapshot_seq, faiss.serialize_index(self.index), meta
+
+    def _save_in_background(self, seq: int, data: np.ndarray, meta: dict):
+        try:
+            self._write_snapshot(seq, data, meta)
+        except Exception as e:
+            print(f"Warning: Could not save candidate index to {self.directory}: {e}")
+        finally:
+            self._saving = False
+
+    def _write_snapshot(self, seq: int, data: np.ndarray, meta: dict):
+        with self._save_lock:
+            if seq <= self._written_seq:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            index_tmp = self.directory / (self.INDEX_FILE + ".tmp")
+            with open(index_tmp, "wb") as f:
+                f.write(memoryview(data))
+            os.replace(index_tmp, self.directory / self.INDEX_FILE)
+
+            meta_tmp = self.directory / (self.META_FILE + ".tmp")
+            meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(meta_tmp, self.directory / self.META_FILE)
+            self._written_seq = seq
+
+    def load(self):
+        import faiss
+
+        index_path = self.directory / self.INDEX_FILE
+        meta_path = self.directory / self.META_FILE
+        if not index_path.exists() or not meta_path.exists():
+            return
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("dimension") != self.dimension:
+                print(f"Warning: Candidate index at {self.directory} has a different dimension. Starting empty.")
+                return
+            index = faiss.read_index(str(index_path))
+        except Exception as e:
+            print(f"Warning: Could not load candidate index from {self.directory}: {e}")
+            return
+
+        with self._lock:
+            self.index = index
+            if self.is_ann:
+                self.index.nprobe = self.nprobe
+                self._trained_size = meta.get("trained_size") or self.index.ntotal
+            self._next_label = meta.get("next_label", 0)
+            self._labels = {cid: entry["label"] for cid, entry in meta.get("candidates", {}).items()}
+            self._ids = {label: cid for cid, label in self._labels.items()}
+            self._metadata = {cid: entry.get("metadata", {}) for cid, entry in meta.get("candidates", {}).items()}
+        print(f"Candidate index loaded: {len(self._labels)} candidates.")
+
+
+
+# Global instance (in-memory only when CANDIDATE_INDEX_DIR is unset), created on first use
+_candidate_index: Optional[CandidateIndex] = None
+_candidate_index_lock = threading.Lock()
+
+def get_candidate_index() -> CandidateIndex:
+    global _candidate_index
+    if _candidate_index is None:
+        with _candidate_index_lock:
+            if _candidate_index is None:
+                _candidate_index = CandidateIndex(
+                    get_embedding_service().dimension,
+                    directory=settings.CANDIDATE_INDEX_DIR,
+                    ann_threshold=settings.CANDIDATE_INDEX_ANN_THRESHOLD,
+                    nprobe=settings.CANDIDATE_INDEX_NPROBE,
+                    save_every=settings.CANDIDATE_INDEX_SAVE_EVERY,
+                    retrain_factor=settings.CANDIDATE_INDEX_RETRAIN_FACTOR
+                )
+    return _candidate_index
+
+def is_candidate_index_loaded() -> bool:
+    return _candidate_index is not None
+
+def save_candidate_index():
+    """
+    Persists the index if it was ever loaded in this process.
+    """
+    if _candidate_index is not None:
+        _candidate_index.save()
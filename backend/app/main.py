@@ -1,14 +1,127 @@
 # backend/app/main.py
 # Purpose: Application Entry Point.
 
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.admission import admission
 from app.core.config import settings
+from app.core.executors import executors
+from app.core.responses import FastJSONResponse
+from app.core.telemetry import (
+    HTTP_IN_FLIGHT, HTTP_SECONDS, configure_logging, metrics, monitor_event_loop, new_request_id,
+    request_id_var, resident_memory_bytes
+)
 from app.api.routes.v1 import analyze # New path
+from app.api.routes.v1 import search
+from app.api.routes.v1 import jobs
+from app.embeddings.embedder import get_embedding_service, is_embedding_service_loaded
+from app.embeddings.vector_index import get_candidate_index, is_candidate_index_loaded, save_candidate_index
+from app.ai_brain.groq_client import get_ai_brain, is_ai_brain_loaded
+from app.resume_parser.parser import resume_cache
+from app.rule_engine.engine import candidate_index_queue
+from app.rule_engine.skill_ontology import skill_ontology
+from app.rule_engine.skill_gap import ontology_embeddings
+
+# Readiness state, filled in by the startup warmup
+readiness = {"ready": False, "warmup_seconds": None, "error": None}
+
+def _warm_models():
+    # Load the model and run one encode so the first real request pays nothing extra
+    get_embedding_service().embed_batch(["warmup"])
+    skill_ontology.extract_skills("python")
+    ontology_embeddings.get()
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+def _runtime_metrics():
+    """
+    Scrape-time gauges for memory, admission control, caches, the Groq resilience
+    layer and the candidate index.
+    """
+    yield "resume_process_resident_memory_bytes", "Resident memory of this worker.", {}, resident_memory_bytes()
+
+    stats = admission.stats()
+    for lane, count in stats["in_flight"].items():
+        yield "resume_admission_in_flight", "Admitted analyses by lane.", {"lane": lane}, count
+    for lane, count in stats["waiting"].items():
+        yield "resume_admission_waiting", "Analyses waiting for admission by lane.", {"lane": lane}, count
+    yield "resume_admission_degraded", "1 while analyses skip Groq because of load.", {}, int(stats["degraded"])
+
+    caches = [("resume", resume_cache.stats())]
+    if is_embedding_service_loaded():
+        caches.append(("embedding", get_embedding_service().cache.stats()))
+    for name, stats in caches:
+        for field in ("entries", "hits", "disk_hits", "misses", "evictions"):
+            yield f"resume_cache_{field}", f"Cache {field.replace('_', ' ')}.", {"cache": name}, stats[field]
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        ratio = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        yield "resume_cache_hit_ratio", "Cache hits over lookups.", {"cache": name}, ratio
+
+    if is_embedding_service_loaded():
+        stats = get_embedding_service().batcher.stats()
+        yield "resume_embedding_batches", "Encoder batches run by the micro-batcher.", {}, stats["batches"]
+        yield "resume_embedding_batch_mean_texts", "Mean texts per micro-batch.", {}, stats["mean_batch_texts"]
+        yield "resume_embedding_batch_pending", "Requests waiting for the next micro-batch.", {}, stats["pending_requests"]
+
+    if is_ai_brain_loaded():
+        stats = get_ai_brain().resilience.stats()
+        yield "resume_groq_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", {}, BREAKER_STATES[stats["breaker_state"]]
+        for field in ("queue_depth", "in_flight", "timeout_seconds"):
+            yield f"resume_groq_{field}", f"Groq {field.replace('_', ' ')}.", {}, stats[field]
+
+    if is_candidate_index_loaded():
+        yield "resume_candidate_index_size", "Candidates in the vector index.", {}, len(get_candidate_index())
+    yield "resume_candidate_index_queue", "Analyzed resumes waiting to be indexed.", {}, len(candidate_index_queue)
+
+configure_logging(settings.TRACE_LOG_LEVEL)
+metrics.register_collector(_runtime_metrics)
+
+async def warmup():
+    start = time.perf_counter()
+    try:
+        await executors.run_encode(_warm_models)
+        get_ai_brain()
+        readiness["ready"] = True
+    except Exception as e:
+        readiness["error"] = str(e)
+        print(f"CRITICAL: Warmup failed: {e}")
+    readiness["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    print(f"Warmup finished in {readiness['warmup_seconds']}s.")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the CPU worker pools with the app and close them cleanly on shutdown
+    executors.start()
+    monitor_task = None
+    if settings.EVENT_LOOP_MONITOR_INTERVAL > 0:
+        monitor_task = asyncio.create_task(monitor_event_loop(settings.EVENT_LOOP_MONITOR_INTERVAL))
+    warmup_task = None
+    if settings.WARMUP_ON_STARTUP:
+        # Runs in the background so the liveness route answers immediately
+        warmup_task = asyncio.create_task(warmup())
+    else:
+        readiness["ready"] = True
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    if monitor_task is not None:
+        monitor_task.cancel()
+    if settings.CANDIDATE_INDEX_ENABLED:
+        # Index what analyses queued before the encode pool goes away
+        await candidate_index_queue.join()
+    executors.shutdown()
+    if settings.CANDIDATE_INDEX_ENABLED:
+        save_candidate_index()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -20,14 +133,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # One request id per call (or the caller's X-Request-ID), visible in every span log line
+    token = request_id_var.set(request.headers.get("x-request-id") or new_request_id())
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id_var.get()
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        # Route templates, not raw paths, keep label cardinality bounded
+        route = request.scope.get("route")
+        HTTP_SECONDS.observe(
+            time.perf_counter() - start,
+            route=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=str(status)
+        )
+        request_id_var.reset(token)
+
 # Include Routers
 # Note: Prefix is configurable, but generally it would match API_V1_STR
 app.include_router(analyze.router, prefix=settings.API_V1_STR, tags=["analysis"])
+app.include_router(search.router, prefix=settings.API_V1_STR, tags=["search"])
+app.include_router(jobs.router, prefix=settings.API_V1_STR, tags=["jobs"])
 
 @app.get("/")
 def root():
     return {"message": "AI Resume Intelligence Engine is Running"}
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 once the models are loaded, 503 while warming up.
+    """
+    status_code = 200 if readiness["ready"] else 503
+    content = dict(readiness)
+    if is_ai_brain_loaded():
+        # Breaker state and queue depth of the Groq resilience layer
+        content["ai_brain"] = get_ai_brain().resilience.stats()
+    # Load shedding state of the analysis routes
+    content["admission"] = admission.stats()
+    return JSONResponse(status_code=status_code, content=content)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Prometheus text exposition of stage latencies, HTTP latencies and cache / breaker gauges.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("backend.app.main:app", host="0.0.0.0", port=8000, reload=True)
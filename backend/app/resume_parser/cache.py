@@ -0,0 +1,180 @@
+# backend/app/resume_parser/cache.py
+# Purpose: Content-addressed cache of parsed resumes.
+# Repeat uploads of the same file skip extraction and segmentation entirely.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.schemas.analysis_models import ResumeContent
+
+
+class ResumeNotFoundError(LookupError):
+    """Raised when a resume_id is not (or no longer) in the cache."""
+
+
+def resume_id_for(content: bytes) -> str:
+    """
+    Public id of an uploaded file: the SHA-256 of its bytes.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def is_resume_id(value: str) -> bool:
+    """
+    Whether value looks like a resume_id_for() result. Ids become file names,
+    so nothing else ever reaches the disk tier.
+    """
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+class ResumeCache:
+    """
+    Bounded LRU of ResumeContent keyed by (parser version, file hash), with an
+    optional on-disk tier of one JSON file per resume.
+    The lock covers only the memory tier: disk reads, writes and eviction sweeps
+    run outside it, and a sweep runs in a background thread at most once per
+    SWEEP_INTERVAL seconds.
+    """
+
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(self, parser_version: str, max_entries: int = 1000,
+                 directory: Optional[str] = None, disk_max_files: int = 50000):
+        self.parser_version = parser_version
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self.disk_max_files = disk_max_files
+        self._memory: "OrderedDict[str, ResumeContent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_files = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self._last_sweep = float("-inf")
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_files = sum(1 for _ in self.directory.glob("*.json"))
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, resume_id: str) -> str:
+        return f"{self.parser_version}-{resume_id}"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, resume_id: str) -> Optional[ResumeContent]:
+        """
+        A deep copy of the cached parse, or None. Callers may mutate the result.
+        May read from disk: use aget() on the event loop.
+        """
+        if not is_resume_id(resume_id):
+            return None
+        key = self._key(resume_id)
+        with self._lock:
+            resume = self._memory.get(key)
+            if resume is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return resume.model_copy(deep=True)
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                resume = ResumeContent.model_validate_json(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                resume = None
+            except Exception as e:
+                print(f"Warning: Corrupt resume cache entry {path}: {e}")
+                resume = None
+            if resume is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, resume)
+                return resume.model_copy(deep=True)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, resume_id: str, resume: ResumeContent):
+        key = self._key(resume_id)
+        with self._lock:
+            self._remember(key, resume.model_copy(deep=True))
+        if self.directory is not None:
+            self._write(key, resume)
+
+    async def aget(self, resume_id: str) -> Optional[ResumeContent]:
+        """
+        get() for async callers; with a disk tier the lookup runs in the thread pool.
+        """
+        if self.directory is None:
+            return self.get(resume_id)
+        return await run_in_threadpool(self.get, resume_id)
+
+    async def aput(self, resume_id: str, resume: ResumeContent):
+        """
+        put() for async callers; with a disk tier the write runs in the thread pool.
+        """
+        if self.directory is None:
+            self.put(resume_id, resume)
+        else:
+            await run_in_threadpool(self.put, resume_id, resume)
+
+    def _remember(self, key: str, resume: ResumeContent):
+        self._memory[key] = resume
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _write(self, key: str, resume: ResumeContent):
+        path = self._path(key)
+        if path.exists():
+            return
+        # Per-thread temporary name: concurrent puts of one resume must not share it
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(resume.model_dump_json(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_files += 1
+            now = time.monotonic()
+            if (self._disk_files <= self.disk_max_files or now - self._last_sweep < self.SWEEP_INTERVAL
+                    or (self._sweeper is not None and self._sweeper.is_alive())):
+                return
+            self._last_sweep = now
+            self._sweeper = threading.Thread(target=self._sweep, name="resume-cache-sweep", daemon=True)
+        self._sweeper.start()
+
+    def _sweep(self):
+        # Drop the oldest tenth in one sweep so the directory scan is rare
+        try:
+            files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+            for old in files[:max(1, len(files) // 10)]:
+                old.unlink(missing_ok=True)
+            remaining = sum(1 for _ in self.directory.glob("*.json"))
+        except OSError as e:
+            print(f"Warning: Resume cache sweep failed: {e}")
+            return
+        with self._lock:
+            self._disk_files = remaining
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_entries": self._disk_files,
+        }
@@ -2,48 +2,184 @@
 # Purpose: Handle file ingestion and text extraction from PDF/DOCX.
 # It uses heuristics to segment the text into Skills, Experience, and Projects.
 
+import asyncio
 import io
 import re
-import pdfplumber
-import docx
+import time
+from typing import Callable, Dict, Optional, Tuple
 from fastapi import UploadFile
-from app.schemas.analysis_models import ResumeContent
+from app.core.config import settings
+from app.core.executors import executors
+from app.core.telemetry import span
+from app.schemas.analysis_models import ResumeContent, ExtractionInfo
+from app.resume_parser.cache import ResumeCache, ResumeNotFoundError, resume_id_for
 from app.utils.text_cleaning import clean_text
 
+def _pdf_page_count(content: bytes) -> int:
+    try:
+        import fitz
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            return doc.page_count
+    except ImportError:
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(content)) as pdf:
+            return len(pdf.pages)
+
+def _extract_pdf_pymupdf(content: bytes, first_page: int, last_page: int) -> str:
+    import fitz
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        return "\n".join(doc[i].get_text("text") for i in range(first_page, min(last_page, doc.page_count)))
+
+def _extract_pdf_pdfplumber(content: bytes, first_page: int, last_page: int) -> str:
+    import pdfplumber
+
+    text = []
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        for page in pdf.pages[first_page:last_page]:
+            extracted = page.extract_text()
+            if extracted:
+                text.append(extracted)
+    return "\n".join(text)
+
+# Registered PDF extractors, tried in the order given by settings.PDF_EXTRACTORS
+PDF_EXTRACTORS: Dict[str, Callable[[bytes, int, int], str]] = {
+    "pymupdf": _extract_pdf_pymupdf,
+    "pdfplumber": _extract_pdf_pdfplumber,
+}
+
+# Bump whenever extraction or segmentation output changes, to invalidate cached parses
+PARSER_VERSION = "2"
+
+resume_cache = ResumeCache(
+    PARSER_VERSION,
+    max_entries=settings.RESUME_CACHE_SIZE,
+    directory=settings.RESUME_CACHE_DIR,
+    disk_max_files=settings.RESUME_CACHE_DISK_MAX_FILES
+)
+
 class ResumeParser:
     """
     Parser for Resume files.
     """
     
+    @staticmethod
+    async def from_id(resume_id: str) -> ResumeContent:
+        """
+        A previously parsed resume, referenced by the resume_id returned with its analysis.
+        Malformed ids are reported as not found.
+        """
+        resume = await resume_cache.aget(resume_id)
+        if resume is None:
+            raise ResumeNotFoundError("Unknown or expired resume_id. Upload the file again.")
+        return resume
+
     @staticmethod
     async def parse(file: UploadFile) -> ResumeContent:
-        filename = file.filename.lower()
         content = await file.read()
-        file_stream = io.BytesIO(content)
-        
-        raw_text = ""
-        
+        return await ResumeParser.parse_bytes(content, file.filename)
+
+    @staticmethod
+    async def parse_bytes(content: bytes, filename: str) -> ResumeContent:
+        """
+        Parse an already-read resume file (e.g. a member of an uploaded archive).
+        """
+        filename = filename.lower()
+        if not filename.endswith((".pdf", ".docx")):
+            raise ValueError("Unsupported file format. Use PDF or DOCX.")
+        if len(content) > settings.RESUME_MAX_BYTES:
+            raise ValueError("Resume file is too large.")
+
+        resume_id = resume_id_for(content)
+        cached = await resume_cache.aget(resume_id)
+        if cached is not None:
+            print(f"Resume {resume_id[:12]} served from parse cache.")
+            return cached
+
+        # Extraction is CPU-bound, so it runs in the parse process pool.
+        # Large PDFs are split into page ranges extracted in parallel.
+        page_ranges = [None]
+        if filename.endswith(".pdf") and len(content) >= settings.PDF_PARALLEL_MIN_BYTES:
+            page_count = await executors.run_parse(_pdf_page_count, content)
+            ResumeParser._check_page_count(page_count)
+            if page_count >= settings.PDF_PARALLEL_MIN_PAGES:
+                step = settings.PDF_PARALLEL_PAGES_PER_TASK
+                page_ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+        with span("extract", tasks=len(page_ranges)):
+            parts = await asyncio.gather(*(
+                executors.run_parse(ResumeParser.extract, content, filename, page_range)
+                for page_range in page_ranges
+            ))
+        raw_text = "\n".join(text for text, _ in parts)
+        infos = [info for _, info in parts]
+        extraction = ExtractionInfo(
+            extractor="+".join(sorted({info.extractor for info in infos})),
+            seconds=round(sum(info.seconds for info in infos), 4),
+            pages=sum(info.pages for info in infos)
+        )
+        print(f"Extracted {extraction.pages} page(s) with {extraction.extractor} in {extraction.seconds}s.")
+
+        with span("structure"):
+            resume = ResumeParser._structure_text(raw_text)
+        resume.resume_id = resume_id
+        resume.extraction = extraction
+        await resume_cache.aput(resume_id, resume)
+        return resume
+
+    @staticmethod
+    def _check_page_count(page_count: int):
+        if page_count > settings.PDF_MAX_PAGES:
+            raise ValueError(f"PDF has {page_count} pages. The limit is {settings.PDF_MAX_PAGES}.")
+
+    @staticmethod
+    def extract(content: bytes, filename: str, page_range: Optional[Tuple[int, int]] = None) -> Tuple[str, ExtractionInfo]:
+        """
+        Synchronous extraction entry point. Takes plain bytes so it can run in a worker process.
+        Returns the text and which extractor produced it.
+        """
+        started = time.perf_counter()
+
         if filename.endswith(".pdf"):
-            raw_text = ResumeParser._extract_pdf(file_stream)
+            if page_range is None:
+                page_count = _pdf_page_count(content)
+                ResumeParser._check_page_count(page_count)
+                page_range = (0, page_count)
+            text, extractor = ResumeParser._extract_pdf(content, *page_range)
+            pages = page_range[1] - page_range[0]
         elif filename.endswith(".docx"):
-            raw_text = ResumeParser._extract_docx(file_stream)
+            text, extractor, pages = ResumeParser._extract_docx(io.BytesIO(content)), "python-docx", 1
         else:
             raise ValueError("Unsupported file format. Use PDF or DOCX.")
-            
-        return ResumeParser._structure_text(raw_text)
+
+        return text, ExtractionInfo(extractor=extractor, seconds=round(time.perf_counter() - started, 4), pages=pages)
 
     @staticmethod
-    def _extract_pdf(stream) -> str:
+    def _extract_pdf(content: bytes, first_page: int, last_page: int) -> Tuple[str, str]:
+        """
+        Tries each configured extractor in order. Falls through to the next one when
+        an extractor is missing, fails, or returns no text (e.g. PyMuPDF on odd encodings).
+        """
         text = ""
-        with pdfplumber.open(stream) as pdf:
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-        return text
+        for name in settings.PDF_EXTRACTORS:
+            extractor = PDF_EXTRACTORS.get(name)
+            if extractor is None:
+                continue
+            try:
+                text = extractor(content, first_page, last_page)
+            except ImportError:
+                continue
+            except Exception as e:
+                print(f"Warning: PDF extractor {name} failed: {e}")
+                continue
+            if text.strip():
+                return text, name
+        return text, "none"
 
     @staticmethod
     def _extract_docx(stream) -> str:
+        import docx
+
         doc = docx.Document(stream)
         text = []
         for para in doc.paragraphs:
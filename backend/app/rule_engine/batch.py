@@ -0,0 +1,369 @@
+# backend/app/rule_engine/batch.py
+# Purpose: Offline batch scoring of archived resumes against many job descriptions.
+# Bypasses HTTP and Groq. Resumes are parsed in a process pool, every section of a
+# chunk of resumes is encoded in one batch, and the chunk's resume x JD score
+# matrix is computed with matrix products. Rows stream to JSONL or a Parquet
+# dataset; a checkpoint lets an interrupted run resume without redoing files.
+#
+# Run from the backend directory:
+#   python -m app.rule_engine.batch --resumes archive/ --jds jds/ --output scores.jsonl
+#   python -m app.rule_engine.batch --resumes archive/ --jd-id <jd_id> --output scores.parquet --skill-gap
+#
+# --jd-id reads jobs from the on-disk job store, so it needs JOB_STORE_DIR set to
+# the directory the API server registers jobs in (POST /jobs).
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.embeddings.embedder import get_embedding_service
+from app.resume_parser.cache import resume_id_for
+from app.resume_parser.parser import ResumeParser
+from app.rule_engine.engine import RuleEngine
+from app.rule_engine.jd_store import JobNotFoundError, PreparedJob, job_store
+from app.rule_engine.skill_gap import analyze_skill_gap, resume_phrases
+from app.schemas.analysis_models import ResumeContent
+from app.utils.constants import WEIGHT_SKILLS, WEIGHT_EXPERIENCE, WEIGHT_projects
+
+RESUME_SUFFIXES = (".pdf", ".docx")
+JD_SUFFIXES = (".txt", ".md")
+
+
+def find_resumes(root: Path) -> List[str]:
+    """
+    PDF/DOCX files under root, as sorted POSIX paths relative to it.
+    """
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob("*")
+        if path.is_file() and path.suffix.lower() in RESUME_SUFFIXES
+    )
+
+
+def parse_file(root: str, relative: str) -> Tuple[str, Optional[ResumeContent], Optional[str]]:
+    """
+    Process-pool worker: (relative path, parsed resume or None, error or None).
+    Applies the same size and page limits as uploads.
+    """
+    try:
+        content = (Path(root) / relative).read_bytes()
+        if len(content) > settings.RESUME_MAX_BYTES:
+            raise ValueError("Resume file is too large.")
+        text, extraction = ResumeParser.extract(content, relative.lower())
+        resume = ResumeParser._structure_text(text)
+        resume.resume_id = resume_id_for(content)
+        resume.extraction = extraction
+        return relative, resume, None
+    except Exception as e:
+        return relative, None, f"{type(e).__name__}: {e}"
+
+
+def load_jobs(jd_paths: List[str], jd_ids: List[str]) -> List[Tuple[str, PreparedJob]]:
+    """
+    (name, PreparedJob) for every JD, deduplicated by jd_id.
+    jd_paths are .txt/.md files (one JD each), directories of them, or .jsonl
+    files with one {"text": ..., "name": ...} object per line. jd_ids are
+    jobs registered through POST /jobs, read from the JOB_STORE_DIR directory.
+    """
+    if jd_ids and job_store.directory is None:
+        raise SystemExit("--jd-id needs JOB_STORE_DIR set to the job store directory of the API server.")
+    texts: List[Tuple[str, str]] = []
+    for raw_path in jd_paths:
+        path = Path(raw_path)
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in JD_SUFFIXES)
+            texts.extend((p.stem, p.read_text(encoding="utf-8")) for p in files)
+        elif path.suffix.lower() == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if line.strip():
+                        item = json.loads(line)
+                        texts.append((item.get("name") or f"{path.stem}:{number}", item["text"]))
+        else:
+            texts.append((path.stem, path.read_text(encoding="utf-8")))
+
+    jobs: Dict[str, Tuple[str, PreparedJob]] = {}
+    model = get_embedding_service().cache.model_name
+    for jd_id in jd_ids:
+        try:
+            job = job_store.get(jd_id)
+        except JobNotFoundError:
+            raise SystemExit(f"Job {jd_id} is not in the job store at {job_store.directory}. "
+                             "Register it through POST /jobs on a server with the same JOB_STORE_DIR.")
+        if job.model != model:
+            job = RuleEngine._prepare_job(job.jd)
+        jobs.setdefault(job.jd_id, (jd_id[:12], job))
+    for name, text in texts:
+        if text.strip():
+            job = RuleEngine._prepare_job(RuleEngine.parse_jd(text))
+            jobs.setdefault(job.jd_id, (name, job))
+    return list(jobs.values())
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines log of finished chunks. The first line pins the run
+    (JDs, model, options); each later line lists the files a chunk covered and
+    where its rows ended in the output (None when it produced no rows).
+    Lines are fsynced after the output is.
+    """
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.done: set = set()
+        self.failed: Dict[str, str] = {}
+        self.records: List[dict] = []
+
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines and lines[0].get("fingerprint") != fingerprint:
+                raise SystemExit(
+                    f"Checkpoint {self.path} was written for different JDs, model or options. "
+                    "Pass --restart to start over."
+                )
+            for record in lines[1:]:
+                self.records.append(record)
+                self._apply(record)
+        else:
+            self._append({"fingerprint": fingerprint, "started": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+    def _append(self, record: dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, done: List[str], failed: Dict[str, str], output):
+        record = {"done": done, "failed": failed, "output": output}
+        self._append(record)
+        self.records.append(record)
+        self._apply(record)
+
+    def _apply(self, record: dict):
+        self.done.update(record["done"])
+        self.failed.update(record["failed"])
+        # A file that failed earlier and succeeded on --retry-failed is no longer failed
+        for path in record["done"]:
+            self.failed.pop(path, None)
+
+
+class JsonlWriter:
+    """
+    Appends rows to a JSONL file. On resume the file is cut back to the offset of
+    the last checkpointed chunk, so rows of an unfinished chunk are never duplicated.
+    """
+
+    def __init__(self, path: Path, records: List[dict]):
+        self.path = path
+        offsets = [record["output"] for record in records if record["output"] is not None]
+        offset = offsets[-1] if offsets else 0
+        with open(self.path, "ab") as f:
+            f.truncate(offset)
+
+    def write(self, rows: List[dict]) -> int:
+        with open(self.path, "ab") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+
+class ParquetWriter:
+    """
+    Writes each chunk as one part file of a Parquet dataset directory.
+    On resume, parts not named in the checkpoint are removed.
+    """
+
+    def __init__(self, path: Path, records: List[dict]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow), or use a .jsonl output.") from e
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        kept = {record["output"] for record in records if record["output"] is not None}
+        for part in self.path.glob("part-*.parquet"):
+            if part.name not in kept:
+                part.unlink()
+        self.next_part = len(kept)
+
+    def write(self, rows: List[dict]) -> str:
+        name = f"part-{self.next_part:05d}.parquet"
+        tmp_path = self.path / f".{name}.tmp"
+        self.pq.write_table(self.pa.Table.from_pylist(rows), tmp_path)
+        os.replace(tmp_path, self.path / name)
+        self.next_part += 1
+        return name
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_chunk(resumes: List[Tuple[str, ResumeContent]], jobs: List[Tuple[str, PreparedJob]],
+                with_skill_gap: bool) -> List[dict]:
+    """
+    Rows for every (resume, JD) pair of a chunk. All section texts (and, for the
+    skill gap, resume phrases) are encoded in one batch; the three component
+    score matrices are (resumes x JDs) products of normalized vectors.
+    """
+    service = get_embedding_service()
+    sections = [RuleEngine.section_texts(resume) for _, resume in resumes]
+    phrases = [resume_phrases(resume.skills, resume.experience) for _, resume in resumes] if with_skill_gap else []
+    positions, embeddings = service.embed_unique(
+        [text for texts in sections for text in texts]
+        + [phrase for resume_phrase_list in phrases for phrase in resume_phrase_list]
+    )
+
+    # (resumes, 3, d); empty sections stay zero and score 0.0, as in analyze()
+    section_vectors = np.zeros((len(resumes), 3, service.dimension), dtype='float32')
+    for i, texts in enumerate(sections):
+        for k, text in enumerate(texts):
+            if text:
+                section_vectors[i, k] = embeddings[positions[text]]
+    jd_text_vectors = np.stack([job.text_vector for _, job in jobs])
+    jd_skills_vectors = np.stack([job.skills_vector for _, job in jobs])
+
+    skills = section_vectors[:, 0] @ jd_skills_vectors.T
+    experience = section_vectors[:, 1] @ jd_text_vectors.T
+    projects = section_vectors[:, 2] @ jd_text_vectors.T
+    overall = skills * WEIGHT_SKILLS + experience * WEIGHT_EXPERIENCE + projects * WEIGHT_projects
+
+    rows = []
+    for i, (path, resume) in enumerate(resumes):
+        phrase_vectors = embeddings[[positions[p] for p in phrases[i]]] if with_skill_gap else None
+        for j, (name, job) in enumerate(jobs):
+            row = {
+                "resume_path": path,
+                "resume_id": resume.resume_id,
+                "jd_id": job.jd_id,
+                "jd_name": name,
+                "overall_score": round(float(overall[i, j]) * 100, 2),
+                "skills_score": round(float(skills[i, j]) * 100, 2),
+                "experience_score": round(float(experience[i, j]) * 100, 2),
+                "project_score": round(float(projects[i, j]) * 100, 2),
+            }
+            if with_skill_gap:
+                gap = analyze_skill_gap(job.jd.required_skills, job.skill_vectors, resume.document, phrase_vectors)
+                row.update(gap.model_dump())
+            rows.append(row)
+    return rows
+
+
+def run(args) -> dict:
+    root = Path(args.resumes)
+    output = Path(args.output)
+    fmt = "parquet" if output.suffix.lower() == ".parquet" else "jsonl"
+    checkpoint_path = Path(args.checkpoint or f"{output}.checkpoint")
+
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+        if output.is_dir():
+            for part in output.glob("part-*.parquet"):
+                part.unlink()
+        else:
+            output.unlink(missing_ok=True)
+
+    jobs = load_jobs(args.jds, args.jd_id)
+    if not jobs:
+        raise SystemExit("No job descriptions given. Use --jds and/or --jd-id.")
+    print(f"Loaded {len(jobs)} job description(s).")
+
+    fingerprint = hashlib.sha256(json.dumps({
+        "jd_ids": sorted(job.jd_id for _, job in jobs),
+        "model": get_embedding_service().cache.model_name,
+        "skill_gap": args.skill_gap,
+        "format": fmt,
+    }).encode("utf-8")).hexdigest()
+    checkpoint = Checkpoint(checkpoint_path, fingerprint)
+    writer = ParquetWriter(output, checkpoint.records) if fmt == "parquet" else JsonlWriter(output, checkpoint.records)
+
+    skip = set(checkpoint.done)
+    if not args.retry_failed:
+        skip.update(checkpoint.failed)
+    paths = [path for path in find_resumes(root) if path not in skip]
+    print(f"{len(paths)} resume(s) to score ({len(checkpoint.done)} already done).")
+
+    workers = os.cpu_count() if args.workers is None else args.workers
+    started = time.perf_counter()
+    scored = failed = 0
+    pool = None
+    try:
+        if workers > 0:
+            # spawn: forking a process that already holds torch threads is unsafe
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            # map() submits everything up front, so workers keep parsing ahead while chunks are encoded
+            parsed = pool.map(partial(parse_file, str(root)), paths, chunksize=4)
+        else:
+            parsed = map(partial(parse_file, str(root)), paths)
+
+        for chunk in _chunks(parsed, args.chunk_size):
+            resumes = [(path, resume) for path, resume, _ in chunk if resume is not None]
+            errors = {path: error for path, _, error in chunk if error is not None}
+            for path, error in errors.items():
+                print(f"Warning: Could not parse {path}: {error}")
+
+            rows = score_chunk(resumes, jobs, args.skill_gap) if resumes else []
+            position = writer.write(rows) if rows else None
+            checkpoint.record([path for path, _ in resumes], errors, position)
+
+            scored += len(resumes)
+            failed += len(errors)
+            elapsed = time.perf_counter() - started
+            print(f"Scored {scored + failed}/{len(paths)} resumes ({failed} failed), "
+                  f"{(scored + failed) / elapsed:.1f} resumes/s.")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    summary = {
+        "resumes_scored": scored,
+        "resumes_failed": failed,
+        "resumes_failed_total": len(checkpoint.failed),
+        "job_descriptions": len(jobs),
+        "rows": scored * len(jobs),
+        "seconds": round(time.perf_counter() - started, 3),
+        "output": str(output),
+        "checkpoint": str(checkpoint_path),
+    }
+    print(json.dumps(summary))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory of resumes against many job descriptions.")
+    parser.add_argument("--resumes", required=True, help="Directory searched recursively for PDF/DOCX files.")
+    parser.add_argument("--jds", nargs="*", default=[], help="JD .txt/.md files, directories of them, or .jsonl files.")
+    parser.add_argument("--jd-id", nargs="*", default=[], help="jd_ids registered through POST /jobs (needs JOB_STORE_DIR).")
+    parser.add_argument("--output", required=True, help="A .jsonl file, or a .parquet dataset directory.")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint).")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint and output first.")
+    parser.add_argument("--retry-failed", action="store_true", help="Parse files that failed in earlier runs again.")
+    parser.add_argument("--workers", type=int, help="Parse processes (default: CPU count, 0 parses inline).")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Resumes per encode batch and checkpoint.")
+    parser.add_argument("--skill-gap", action="store_true", help="Add strong/weak/missing skills to every row.")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,69 +2,50 @@
 # Purpose: Core business logic for Resume vs JD scoring.
 # STRICTLY NO AI HERE. Uses deterministic math and embeddings.
 
-import json
-from typing import List
-from pathlib import Path
+import asyncio
+import hashlib
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
 from app.schemas.analysis_models import ResumeContent, JobDescription, ScoringResult, SkillAnalysis, AnalysisComputations
-from app.embeddings.embedder import embedding_service
-from app.utils.text_cleaning import clean_text
+from app.core.executors import executors
+from app.core.telemetry import logger, span
+from app.embeddings.embedder import EmbeddingService, get_embedding_service
+from app.embeddings.vector_index import CandidateIndex, get_candidate_index
+from app.rule_engine.skill_ontology import skill_ontology
+from app.rule_engine.skill_gap import (
+    OntologySnapshot, analyze_skill_gap, ontology_embeddings, resume_phrases, skill_vectors
+)
+from app.rule_engine.jd_store import PreparedJob, jd_id_for, job_store
+from app.utils.text_cleaning import NormalizedDocument
 
 class RuleEngine:
     
     @staticmethod
-    def _load_ontology(filename: str) -> any:
+    def extract_skills_from_text(doc: NormalizedDocument) -> List[str]:
         """
-        Generic loader for JSON ontology files using absolute paths.
-        TASK 2: FIX ONTOLOGY JSON PATHS
+        Extracts skills with a single pass of the compiled ontology matcher.
+        Matches respect token boundaries, so punctuation around a skill is fine.
         """
-        BASE_DIR = Path(__file__).resolve().parent
-        ONTOLOGY_DIR = BASE_DIR / "ontology"
-        path = ONTOLOGY_DIR / filename
-
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Warning: Could not load ontology from {path}: {e}")
-            return [] if "skills.json" in filename else {}
-
-    @staticmethod
-    def extract_skills_from_text(text: str) -> List[str]:
-        """
-        Extracts skills using simple keyword matching against the ontology.
-        """
-        if not text:
-            return []
-            
-        skills_ontology = RuleEngine._load_ontology("skills.json")
-        found_skills = []
-        text_lower = text.lower()
-        
-        for skill in skills_ontology:
-            # Check for word boundary mostly to avoid partial matches
-            if f" {skill} " in f" {text_lower} ":
-                found_skills.append(skill)
-        
-        return found_skills
+        return skill_ontology.match(doc.text)
 
     @staticmethod
-    def detect_role_from_jd(text: str) -> str:
+    def detect_role_from_jd(doc: NormalizedDocument) -> str:
         """
         Infers the role based on keywords in the JD.
+        Keywords match whole tokens only ("ai" does not fire inside "maintain").
         """
-        text_lower = text.lower()
-        
-        if any(w in text_lower for w in ["ai", "llm", "automation", "machine learning", "rag"]):
+        if doc.contains_any(["ai", "llm", "automation", "machine learning", "rag"]):
             return "ai_automation_engineer"
-        elif any(w in text_lower for w in ["backend", "fastapi", "api", "django", "server"]):
+        elif doc.contains_any(["backend", "fastapi", "api", "apis", "django", "server"]):
             return "python_backend_developer"
-        elif any(w in text_lower for w in ["frontend", "react", "javascript", "ui/ux"]):
+        elif doc.contains_any(["frontend", "react", "javascript", "ui/ux"]):
             return "frontend_developer"
         
         return "generic_software_engineer"
 
     @staticmethod
-    def get_jd_skills(text: str) -> List[str]:
+    def get_jd_skills(doc: NormalizedDocument) -> List[str]:
         """
         Orchestrator for JD Skill Extraction.
         Strategy:
@@ -72,18 +53,17 @@ class RuleEngine:
         2. If empty, infer role and load defaults.
         """
         # 1. Explicit Extraction
-        extracted_skills = RuleEngine.extract_skills_from_text(text)
+        extracted_skills = RuleEngine.extract_skills_from_text(doc)
         
         if extracted_skills:
-            print(f"DEBUG: Found {len(extracted_skills)} explicit skills in JD.")
+            logger.debug(f"Found {len(extracted_skills)} explicit skills in JD.")
             return extracted_skills
         
         # 2. Fallback: Role Inference
-        role = RuleEngine.detect_role_from_jd(text)
-        print(f"DEBUG: No explicit skills found. Inferred Role: {role}")
+        role = RuleEngine.detect_role_from_jd(doc)
+        logger.debug(f"No explicit skills found in JD. Inferred role: {role}")
         
-        roles_ontology = RuleEngine._load_ontology("roles.json")
-        default_skills = roles_ontology.get(role, [])
+        default_skills = list(skill_ontology.roles.get(role, []))
         
         return default_skills
 
@@ -96,48 +76,251 @@ class RuleEngine:
         if not text:
             raise ValueError("Job Description cannot be empty.")
         
-        # intelligently get skills
-        final_skills = RuleEngine.get_jd_skills(text)
+        jd = JobDescription(raw_text=text)
 
-        return JobDescription(
-            raw_text=text,
-            required_skills=final_skills
-        )
+        # intelligently get skills (the normalized JD is reused by scoring)
+        with span("jd_parse"):
+            jd.required_skills = RuleEngine.get_jd_skills(jd.document)
+
+        return jd
 
     @staticmethod
-    async def analyze(resume: ResumeContent, jd: JobDescription) -> AnalysisComputations:
+    async def analyze(resume: ResumeContent, jd: JobDescription, job: Optional[PreparedJob] = None) -> AnalysisComputations:
         """
         Orchestrates the scoring and gap analysis.
         """
-        
+        results = await RuleEngine.analyze_many([resume], jd, job)
+        return results[0]
+
+    @staticmethod
+    async def analyze_many(resumes: List[ResumeContent], jd: JobDescription,
+                           job: Optional[PreparedJob] = None) -> List[AnalysisComputations]:
+        """
+        Scores many resumes against one JD.
+        The JD is cleaned once, and every resume section, resume skill phrase and
+        JD text is encoded together in a single batched pass.
+        With a registered job (job.jd is jd) the JD texts and skills are not
+        cleaned or encoded at all: their precomputed vectors are used.
+        """
+        if not resumes:
+            return []
+
         # 1. Clean Texts
-        clean_resume_text = clean_text(resume.raw_text)
-        clean_jd_text = clean_text(jd.raw_text)
-        
-        clean_resume_skills_text = " ".join(resume.skills)
-        clean_jd_skills_text = " ".join(jd.required_skills) if jd.required_skills else clean_jd_text
-        
+        if job is not None:
+            clean_jd_text, clean_jd_skills_text = job.clean_text, job.skills_text
+        else:
+            clean_jd_text, clean_jd_skills_text = RuleEngine.jd_texts(jd)
+
+        # 2. Build (resume section, JD) pairs, three per resume
+        pairs = []
+        for resume in resumes:
+            pairs.extend(RuleEngine._score_pairs(resume, clean_jd_text, clean_jd_skills_text))
+        phrases = [resume_phrases(resume.skills, resume.experience) for resume in resumes]
+
         # 3. Calculate Component Scores
-        # A. Skills Score (45%)
-        skills_score = embedding_service.compute_similarity_score(
-            clean_resume_skills_text if clean_resume_skills_text else clean_resume_text, 
-            clean_jd_skills_text
-        )
-        
-        # B. Experience Score (35%)
+        # The encode runs in the thread pool so the event loop stays free.
+        with span("score", resumes=len(resumes)):
+            # The ontology snapshot is taken off the loop (the first call after a
+            # skills.json reload rebuilds the matrix) and used for the whole analysis.
+            # The encode itself is micro-batched with concurrent requests.
+            ontology = await executors.run_encode(ontology_embeddings.get)
+            texts = RuleEngine._batch_texts(pairs, phrases, jd.required_skills, job, ontology)
+            positions, embeddings = await get_embedding_service().aembed_unique(texts)
+            if job is not None:
+                positions, embeddings = job.with_jd_rows(positions, embeddings)
+            similarities = EmbeddingService.pair_similarities(positions, embeddings, pairs)
+
+        # Skill matching and the similarity matrices are CPU work: off the loop too
+        with span("gap_analysis", resumes=len(resumes)):
+            return await executors.run_encode(
+                RuleEngine._gap_analyses, resumes, jd, job, phrases, positions, embeddings, similarities, ontology
+            )
+
+    @staticmethod
+    def _gap_analyses(resumes: List[ResumeContent], jd: JobDescription, job: Optional[PreparedJob],
+                      phrases: List[List[str]], positions: Dict[str, int], embeddings: np.ndarray,
+                      similarities: List[float], ontology: OntologySnapshot) -> List[AnalysisComputations]:
+        if job is not None:
+            jd_vectors = job.skill_vectors
+        else:
+            jd_vectors = skill_vectors(jd.required_skills, positions, embeddings, ontology)
+        results = []
+        for i, resume in enumerate(resumes):
+            skills_score, experience_score, project_score = similarities[i * 3:i * 3 + 3]
+            phrase_vectors = embeddings[[positions[phrase] for phrase in phrases[i]]]
+            skill_gap = analyze_skill_gap(jd.required_skills, jd_vectors, resume.document, phrase_vectors, ontology)
+            results.append(RuleEngine._build_computation(
+                resume, jd, skills_score, experience_score, project_score, skill_gap
+            ))
+        return results
+
+    @staticmethod
+    def _batch_texts(pairs: List[Tuple[str, str]], phrases: List[List[str]], jd_skills: List[str],
+                     job: Optional[PreparedJob] = None, ontology: Optional[OntologySnapshot] = None) -> List[str]:
+        """
+        Everything one analysis encodes, as a single batch: the score pairs, the
+        resume phrases and any JD skills missing from the precomputed ontology matrix.
+        A registered job already carries its JD vectors, so only resume texts are added.
+        """
+        if job is None:
+            texts = [text for pair in pairs for text in pair]
+            texts.extend(ontology_embeddings.missing(jd_skills, ontology))
+        else:
+            texts = [source for source, _ in pairs]
+        for resume_phrase_list in phrases:
+            texts.extend(resume_phrase_list)
+        return texts
+
+    @staticmethod
+    def _prepare_job(jd: JobDescription) -> PreparedJob:
+        clean_jd_text, clean_jd_skills_text = RuleEngine.jd_texts(jd)
+        service = get_embedding_service()
+        ontology = ontology_embeddings.get()
+        missing = ontology_embeddings.missing(jd.required_skills, ontology)
+        positions, embeddings = service.embed_unique([clean_jd_text, clean_jd_skills_text, *missing])
+
+        def row(text: str) -> np.ndarray:
+            return embeddings[positions[text]] if text else np.zeros(service.dimension, dtype='float32')
+
+        vectors = np.vstack([
+            row(clean_jd_text),
+            row(clean_jd_skills_text),
+            skill_vectors(jd.required_skills, positions, embeddings, ontology).reshape(-1, service.dimension)
+        ])
+        return PreparedJob(jd_id_for(jd.raw_text), jd, clean_jd_text, clean_jd_skills_text,
+                           service.cache.model_name, vectors)
+
+    @staticmethod
+    async def register_job(text: str) -> PreparedJob:
+        """
+        Parses, cleans and embeds a JD once and stores it under its jd_id.
+        """
+        jd = RuleEngine.parse_jd(text)
+        job = await executors.run_encode(RuleEngine._prepare_job, jd)
+        await job_store.aput(job)
+        return job
+
+    @staticmethod
+    async def load_job(jd_id: str) -> PreparedJob:
+        """
+        A registered job by id. Raises JobNotFoundError for unknown ids.
+        Vectors from a different embedding model or backend are recomputed once.
+        """
+        job = await job_store.aget(jd_id)
+        if job.model != get_embedding_service().cache.model_name:
+            job = await executors.run_encode(RuleEngine._prepare_job, job.jd)
+            await job_store.aput(job)
+        return job
+
+    @staticmethod
+    def candidate_id(resume: ResumeContent) -> str:
+        """
+        Stable id for a resume, derived from its text, so re-uploads upsert.
+        """
+        return hashlib.sha256(resume.raw_text.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _section_vectors(resumes: List[ResumeContent]) -> np.ndarray:
+        """
+        (n, 3, d) normalized section embeddings; empty sections are zero vectors.
+        """
+        texts = []
+        for resume in resumes:
+            texts.extend(RuleEngine.section_texts(resume))
+        vectors = get_embedding_service().embed_batch(texts, normalize=True)
+        for i, text in enumerate(texts):
+            if not text:
+                vectors[i] = 0.0
+        return vectors.reshape(len(resumes), 3, -1)
+
+    @staticmethod
+    def _index_candidates(resumes: List[ResumeContent], metadata: List[dict]) -> List[str]:
+        vectors = RuleEngine._section_vectors(resumes)
+        candidate_index = get_candidate_index()
+        candidate_ids = []
+        for resume, section_vectors, meta in zip(resumes, vectors, metadata):
+            candidate_id = RuleEngine.candidate_id(resume)
+            candidate_index.upsert(candidate_id, section_vectors, dict(meta, skills=resume.skills))
+            candidate_ids.append(candidate_id)
+        return candidate_ids
+
+    @staticmethod
+    async def index_candidates(resumes: List[ResumeContent], metadata: Optional[List[dict]] = None) -> List[str]:
+        """
+        Stores the section embeddings of analyzed resumes in the candidate index.
+        Vectors come from the embedding cache when the resumes were just scored.
+        """
+        if not resumes:
+            return []
+        metadata = metadata or [{} for _ in resumes]
+        return await executors.run_encode(RuleEngine._index_candidates, resumes, metadata)
+
+    @staticmethod
+    def _search_candidates(jd: JobDescription, top_k: int, job: Optional[PreparedJob] = None) -> List[Tuple[str, float, dict]]:
+        if job is not None:
+            jd_text_vector, jd_skills_vector = job.text_vector, job.skills_vector
+        else:
+            clean_jd_text, clean_jd_skills_text = RuleEngine.jd_texts(jd)
+            jd_text_vector, jd_skills_vector = get_embedding_service().embed_batch(
+                [clean_jd_text, clean_jd_skills_text], normalize=True
+            )
+        query = CandidateIndex.query_vector(jd_text_vector, jd_skills_vector)
+        return get_candidate_index().search(query, top_k)
+
+    @staticmethod
+    async def search_candidates(jd: JobDescription, top_k: int = 10,
+                                job: Optional[PreparedJob] = None) -> List[Tuple[str, float, dict]]:
+        """
+        Top-k stored candidates for a JD, ranked by the same weighted score as analyze().
+        """
+        return await executors.run_encode(RuleEngine._search_candidates, jd, top_k, job)
+
+    @staticmethod
+    def jd_texts(jd: JobDescription) -> Tuple[str, str]:
+        """
+        The two JD texts resumes are compared against: (cleaned JD text, JD skills text).
+        """
+        clean_jd_text = jd.document.text
+        clean_jd_skills_text = " ".join(jd.required_skills) if jd.required_skills else clean_jd_text
+        return clean_jd_text, clean_jd_skills_text
+
+    @staticmethod
+    def section_texts(resume: ResumeContent) -> Tuple[str, str, str]:
+        """
+        The (skills, experience, projects) texts behind the three component scores.
+        Empty sections fall back to the whole resume text.
+        """
+        clean_resume_text = resume.document.text
+        clean_resume_skills_text = " ".join(resume.skills)
         clean_experience_text = " ".join(resume.experience)
-        experience_score = embedding_service.compute_similarity_score(
-            clean_experience_text if clean_experience_text else clean_resume_text,
-            clean_jd_text
-        )
-        
-        # C. Projects Score (20%)
         clean_projects_text = " ".join(resume.projects)
-        project_score = embedding_service.compute_similarity_score(
+
+        return (
+            clean_resume_skills_text if clean_resume_skills_text else clean_resume_text,
+            clean_experience_text if clean_experience_text else clean_resume_text,
             clean_projects_text if clean_projects_text else clean_resume_text,
-            clean_jd_text
         )
-        
+
+    @staticmethod
+    def _score_pairs(resume: ResumeContent, clean_jd_text: str, clean_jd_skills_text: str) -> List[Tuple[str, str]]:
+        """
+        The (resume section, JD) text pairs behind the three component scores.
+        """
+        skills_text, experience_text, projects_text = RuleEngine.section_texts(resume)
+
+        return [
+            # A. Skills Score (45%)
+            (skills_text, clean_jd_skills_text),
+            # B. Experience Score (35%)
+            (experience_text, clean_jd_text),
+            # C. Projects Score (20%)
+            (projects_text, clean_jd_text),
+        ]
+
+    @staticmethod
+    def _build_computation(resume: ResumeContent, jd: JobDescription, skills_score: float,
+                           experience_score: float, project_score: float,
+                           skill_gap: SkillAnalysis) -> AnalysisComputations:
         # 4. Weighted Total
         total = (skills_score * 0.45) + (experience_score * 0.35) + (project_score * 0.20)
         
@@ -148,9 +331,6 @@ class RuleEngine:
             project_score=round(project_score * 100, 2)
         )
         
-        # 5. Gap Analysis
-        skill_gap = RuleEngine._analyze_skill_gap(resume.raw_text, jd.required_skills)
-
         return AnalysisComputations(
             scores=scores,
             skill_gap=skill_gap,
@@ -158,23 +338,49 @@ class RuleEngine:
             jd_data=jd
         )
 
-    @staticmethod
-    def _analyze_skill_gap(resume_text: str, jd_skills: List[str]) -> SkillAnalysis:
-        strong = []
-        weak = []
-        missing = []
-        
-        resume_lower = resume_text.lower()
-        
-        for skill in jd_skills:
-            skill_lower = skill.lower()
-            if skill_lower in resume_lower:
-                strong.append(skill)
-            else:
-                missing.append(skill)
-        
-        return SkillAnalysis(
-            strong_matches=strong,
-            weak_matches=weak,
-            missing_skills=missing
-        )
+
+class CandidateIndexQueue:
+    """
+    Background writer for the candidate index. Analyses submit their resumes and
+    return at once; a single task drains the queue, indexing whatever accumulated
+    in one call, so index writes and saves stay off the request path.
+    """
+
+    def __init__(self, max_pending: int = 10000, max_batch: int = 256):
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self._pending: Deque[Tuple[ResumeContent, dict]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def submit(self, resumes: List[ResumeContent], metadata: List[dict]):
+        if len(self._pending) + len(resumes) > self.max_pending:
+            # The index is best effort: shed writes rather than grow without bound
+            self.dropped += len(resumes)
+            print(f"Warning: Candidate index queue full, {len(resumes)} resume(s) not indexed.")
+            return
+        self._pending.extend(zip(resumes, metadata))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+            try:
+                await RuleEngine.index_candidates([resume for resume, _ in batch], [meta for _, meta in batch])
+            except Exception as e:
+                print(f"Warning: Could not index candidates: {e}")
+
+    async def join(self):
+        """
+        Waits until everything submitted so far is indexed (shutdown and tests).
+        """
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+# Global instance
+candidate_index_queue = CandidateIndexQueue()
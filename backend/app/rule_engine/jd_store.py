@@ -0,0 +1,203 @@
+# backend/app/rule_engine/jd_store.py
+# Purpose: Store of pre-registered job descriptions (POST /jobs).
+# A JD is parsed, cleaned and embedded once; scoring paths reference it by jd_id.
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.schemas.analysis_models import JobDescription
+
+
+class JobNotFoundError(LookupError):
+    """Raised when a jd_id is not (or no longer) registered."""
+
+
+def jd_id_for(text: str) -> str:
+    """
+    Public id of a registered JD: the SHA-256 of its text, so re-registering is idempotent.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PreparedJob:
+    """
+    A parsed JD with its cleaned texts and normalized embeddings.
+    vectors rows: [JD text, JD skills text, *required skills].
+    `model` is the embedding cache namespace the vectors were computed with.
+    """
+
+    def __init__(self, jd_id: str, jd: JobDescription, clean_text: str, skills_text: str,
+                 model: str, vectors: np.ndarray):
+        self.jd_id = jd_id
+        self.jd = jd
+        self.clean_text = clean_text
+        self.skills_text = skills_text
+        self.model = model
+        self.vectors = vectors
+
+    @property
+    def text_vector(self) -> np.ndarray:
+        return self.vectors[0]
+
+    @property
+    def skills_vector(self) -> np.ndarray:
+        return self.vectors[1]
+
+    @property
+    def skill_vectors(self) -> np.ndarray:
+        return self.vectors[2:]
+
+    def with_jd_rows(self, positions: dict, embeddings: np.ndarray):
+        """
+        Adds the JD text rows to an embed_unique() result, so score pairs that
+        reference the JD texts resolve to the precomputed vectors.
+        """
+        positions = dict(positions)
+        rows = []
+        for text, vector in ((self.clean_text, self.text_vector), (self.skills_text, self.skills_vector)):
+            if text and text not in positions:
+                positions[text] = len(embeddings) + len(rows)
+                rows.append(vector)
+        return positions, (np.vstack([embeddings, *rows]) if rows else embeddings)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "jd_id": self.jd_id,
+            "jd": self.jd.model_dump(),
+            "clean_text": self.clean_text,
+            "skills_text": self.skills_text,
+            "model": self.model,
+            "shape": list(self.vectors.shape),
+            "vectors": base64.b64encode(np.ascontiguousarray(self.vectors, dtype='float32').tobytes()).decode("ascii"),
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "PreparedJob":
+        data = json.loads(raw)
+        vectors = np.frombuffer(base64.b64decode(data["vectors"]), dtype='float32').reshape(data["shape"])
+        return cls(
+            data["jd_id"],
+            JobDescription.model_validate(data["jd"]),
+            data["clean_text"],
+            data["skills_text"],
+            data["model"],
+            vectors
+        )
+
+
+class JobStore:
+    """
+    Bounded LRU of PreparedJob keyed by jd_id, with an optional on-disk tier of
+    one JSON file per job (bounded by disk_max_files, oldest pruned first).
+    The directory is created on the first write, not when the app is imported.
+    """
+
+    def __init__(self, max_entries: int = 500, directory: Optional[str] = None, disk_max_files: int = 10000):
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self.disk_max_files = disk_max_files
+        self._memory: "OrderedDict[str, PreparedJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_files = 0
+        self._directory_ready = False
+
+    def _prepare_directory(self):
+        # Called under the lock
+        if not self._directory_ready:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_files = sum(1 for _ in self.directory.glob("*.json"))
+            self._directory_ready = True
+
+    def _path(self, jd_id: str) -> Path:
+        return self.directory / f"{jd_id}.json"
+
+    def get(self, jd_id: str) -> PreparedJob:
+        with self._lock:
+            job = self._memory.get(jd_id)
+            if job is not None:
+                self._memory.move_to_end(jd_id)
+                return job
+
+            # jd_id is used as a file name, so only accept what jd_id_for() produces
+            if self.directory is not None and len(jd_id) == 64 and all(c in "0123456789abcdef" for c in jd_id):
+                try:
+                    job = PreparedJob.from_json(self._path(jd_id).read_text(encoding="utf-8"))
+                except FileNotFoundError:
+                    job = None
+                except Exception as e:
+                    print(f"Warning: Corrupt job store entry {jd_id}: {e}")
+                    job = None
+                if job is not None:
+                    self._remember(job)
+                    return job
+
+        raise JobNotFoundError(f"Unknown jd_id: {jd_id}. Register the job description first.")
+
+    def put(self, job: PreparedJob):
+        with self._lock:
+            self._remember(job)
+            if self.directory is not None:
+                self._prepare_directory()
+                self._write(job)
+
+    async def aget(self, jd_id: str) -> PreparedJob:
+        """
+        get() for async callers; with a disk tier the lookup runs in the thread pool.
+        """
+        if self.directory is None or jd_id in self._memory:
+            return self.get(jd_id)
+        return await run_in_threadpool(self.get, jd_id)
+
+    async def aput(self, job: PreparedJob):
+        """
+        put() for async callers; with a disk tier the write runs in the thread pool.
+        """
+        if self.directory is None:
+            self.put(job)
+        else:
+            await run_in_threadpool(self.put, job)
+
+    def _remember(self, job: PreparedJob):
+        self._memory[job.jd_id] = job
+        self._memory.move_to_end(job.jd_id)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _write(self, job: PreparedJob):
+        path = self._path(job.jd_id)
+        existed = path.exists()
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(job.to_json(), encoding="utf-8")
+        os.replace(tmp_path, path)
+        if existed:
+            return
+        self._disk_files += 1
+
+        if self._disk_files > self.disk_max_files:
+            # Drop the oldest tenth in one sweep so the directory scan is rare
+            files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+            for old in files[:max(1, len(files) // 10)]:
+                old.unlink(missing_ok=True)
+            self._disk_files = sum(1 for _ in self.directory.glob("*.json"))
+
+    def __len__(self) -> int:
+        if self.directory is not None and not self._directory_ready and self.directory.exists():
+            with self._lock:
+                self._prepare_directory()
+        return max(len(self._memory), self._disk_files)
+
+
+# Global instance
+job_store = JobStore(
+    max_entries=settings.JOB_STORE_SIZE,
+    directory=settings.JOB_STORE_DIR,
+    disk_max_files=settings.JOB_STORE_DISK_MAX_FILES
+)
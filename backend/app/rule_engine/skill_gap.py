@@ -0,0 +1,124 @@
+# backend/app/rule_engine/skill_gap.py
+# Purpose: Semantic skill-gap analysis against precomputed ontology embeddings.
+# Every JD skill is compared with every resume skill/phrase in one similarity
+# matrix; thresholds on the best match split JD skills into strong, weak and missing.
+
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from app.core.config import settings
+from app.embeddings.embedder import get_embedding_service
+from app.rule_engine.skill_ontology import SkillMatcher, normalize_for_matching, skill_ontology
+from app.schemas.analysis_models import SkillAnalysis
+from app.utils.text_cleaning import NormalizedDocument
+
+# Skills sections are lists ("Python, Docker | AWS"); experience lines are prose.
+# Splitting both on list punctuation leaves short phrases that look like skills.
+_PHRASE_SPLIT = re.compile(r"[,;|/•·()\[\]:\n]|\s-\s|\band\b")
+MAX_PHRASE_WORDS = 4
+MAX_PHRASES = 200
+
+
+def resume_phrases(skills: List[str], experience: List[str]) -> List[str]:
+    """
+    Short candidate skill phrases from the skills and experience sections, deduplicated.
+    """
+    phrases: Dict[str, None] = {}
+    for line in skills + experience:
+        for part in _PHRASE_SPLIT.split(line.lower()):
+            words = part.split()
+            if 0 < len(words) <= MAX_PHRASE_WORDS:
+                phrases.setdefault(" ".join(words), None)
+                if len(phrases) >= MAX_PHRASES:
+                    return list(phrases)
+    return list(phrases)
+
+
+class OntologySnapshot(NamedTuple):
+    """
+    One consistent build of the ontology matrix. An analysis takes one snapshot
+    and passes it along, so a skills.json reload mid-analysis cannot mix states.
+    """
+    skills: Optional[List[str]]
+    rows: Dict[str, int]  # normalized skill -> matrix row
+    matrix: np.ndarray
+    matcher: SkillMatcher
+
+
+class OntologyEmbeddings:
+    """
+    Normalized embedding matrix of the ontology skills.
+    Built once (at warmup) and rebuilt only when skills.json is reloaded.
+    get() may encode the whole ontology: call it off the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = OntologySnapshot(None, {}, np.empty((0, 0), dtype='float32'), SkillMatcher({}))
+
+    def get(self) -> OntologySnapshot:
+        skills, matcher = skill_ontology.compiled()
+        if skills is not self._state.skills:
+            with self._lock:
+                if skills is not self._state.skills:
+                    matrix = get_embedding_service().embed_batch(skills, normalize=True)
+                    rows = {normalize_for_matching(skill): i for i, skill in enumerate(skills)}
+                    self._state = OntologySnapshot(skills, rows, matrix, matcher)
+                    print(f"Ontology embeddings built: {len(skills)} skills.")
+        return self._state
+
+    def missing(self, skills: List[str], ontology: Optional[OntologySnapshot] = None) -> List[str]:
+        """
+        The skills that have no precomputed row and must be encoded per request.
+        """
+        rows = (ontology or self.get()).rows
+        return [skill for skill in skills if normalize_for_matching(skill) not in rows]
+
+
+def skill_vectors(skills: List[str], positions: Dict[str, int], embeddings: np.ndarray,
+                  ontology: Optional[OntologySnapshot] = None) -> np.ndarray:
+    """
+    (k, d) normalized vectors for the given skills: ontology rows where available,
+    otherwise rows of an embed_unique() result that included the skill.
+    Pass the snapshot that missing() was computed from.
+    """
+    _, rows, matrix, _ = ontology or ontology_embeddings.get()
+    vectors = np.empty((len(skills), get_embedding_service().dimension), dtype='float32')
+    for i, skill in enumerate(skills):
+        row = rows.get(normalize_for_matching(skill))
+        vectors[i] = matrix[row] if row is not None else embeddings[positions[skill]]
+    return vectors
+
+
+def analyze_skill_gap(jd_skills: List[str], jd_vectors: np.ndarray, resume: NormalizedDocument,
+                      phrase_vectors: np.ndarray, ontology: Optional[OntologySnapshot] = None) -> SkillAnalysis:
+    """
+    Classifies each JD skill by its best cosine similarity against the resume:
+    ontology skills found verbatim in the resume (token-bounded, synonyms included)
+    plus the resume phrases. Verbatim hits are always strong.
+    """
+    if not jd_skills:
+        return SkillAnalysis()
+
+    _, rows, matrix, matcher = ontology or ontology_embeddings.get()
+    found = {normalize_for_matching(skill) for skill in matcher.find(resume.text)}
+    found_rows = [rows[skill] for skill in found if skill in rows]
+
+    columns = np.concatenate([matrix[found_rows], phrase_vectors]) if len(phrase_vectors) else matrix[found_rows]
+    best = (jd_vectors @ columns.T).max(axis=1) if len(columns) else np.zeros(len(jd_skills), dtype='float32')
+    exact = np.array([normalize_for_matching(skill) in found for skill in jd_skills])
+    best = np.where(exact, 1.0, best)
+
+    skills = np.array(jd_skills, dtype=object)
+    strong = best >= settings.SKILL_MATCH_STRONG_THRESHOLD
+    weak = ~strong & (best >= settings.SKILL_MATCH_WEAK_THRESHOLD)
+    return SkillAnalysis(
+        strong_matches=skills[strong].tolist(),
+        weak_matches=skills[weak].tolist(),
+        missing_skills=skills[~(strong | weak)].tolist()
+    )
+
+
+# Global instance
+ontology_embeddings = OntologyEmbeddings()
@@ -0,0 +1,200 @@
+# backend/app/rule_engine/skill_ontology.py
+# Purpose: Load the skill/role ontology once and compile it into a single-pass matcher.
+# Matching cost scales with the text length, not with the size of the ontology.
+
+import json
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ONTOLOGY_DIR = Path(__file__).resolve().parent / "ontology"
+
+# Characters that continue a token. A match must not be glued to one of these
+# on either side, so "java" does not fire inside "javascript" but "python,"
+# and "(docker)" still match.
+_TOKEN_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789_+#")
+
+
+def _is_token_char(ch: str) -> bool:
+    return ch in _TOKEN_CHARS or (ch.isalnum() and not ch.isascii())
+
+
+def normalize_for_matching(text: str) -> str:
+    """
+    Lowercases and collapses whitespace so multi-word skills match across line breaks.
+    """
+    return " ".join(text.lower().split())
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over the ontology patterns with token-boundary checks.
+    Each pattern maps to a canonical skill name (synonyms share one canonical).
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        # patterns: normalized surface form -> canonical skill
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]  # (pattern length, canonical)
+
+        for surface, canonical in patterns.items():
+            if surface:
+                self._add(surface, canonical)
+        self._build_failure_links()
+
+    def _add(self, surface: str, canonical: str):
+        state = 0
+        for ch in surface:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(surface), canonical))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit matches that end at the same position
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, normalized_text: str) -> List[str]:
+        """
+        Returns canonical skills found in already-normalized text, in order of first appearance.
+        """
+        found: Dict[str, None] = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        text_len = len(normalized_text)
+        state = 0
+
+        for i, ch in enumerate(normalized_text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+
+            after_ok = i + 1 >= text_len or not _is_token_char(normalized_text[i + 1])
+            if not after_ok:
+                continue
+            for length, canonical in out[state]:
+                start = i - length + 1
+                if start == 0 or not _is_token_char(normalized_text[start - 1]):
+                    found.setdefault(canonical, None)
+
+        return list(found)
+
+
+class SkillOntology:
+    """
+    Cached view of skills.json / roles.json.
+    Files are parsed and compiled once and re-read only when their mtime changes.
+
+    skills.json may be a list of skills, or a mapping of skill -> list of synonyms.
+    """
+
+    def __init__(self, directory: Path = ONTOLOGY_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._mtimes: Dict[str, float] = {}
+        self._skills: List[str] = []
+        self._roles: Dict[str, List[str]] = {}
+        self._matcher = SkillMatcher({})
+
+    def _load_json(self, filename: str, default):
+        path = self.directory / filename
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load ontology from {path}: {e}")
+            return default
+
+    def _is_stale(self, filename: str) -> bool:
+        try:
+            mtime = (self.directory / filename).stat().st_mtime
+        except OSError:
+            mtime = -1.0
+        return self._mtimes.get(filename) != mtime
+
+    def _mark_loaded(self, filename: str):
+        try:
+            self._mtimes[filename] = (self.directory / filename).stat().st_mtime
+        except OSError:
+            self._mtimes[filename] = -1.0
+
+    def _refresh(self):
+        with self._lock:
+            if self._is_stale("skills.json"):
+                raw = self._load_json("skills.json", [])
+                if isinstance(raw, dict):
+                    synonyms = {skill: list(aliases or []) for skill, aliases in raw.items()}
+                else:
+                    synonyms = {skill: [] for skill in raw}
+
+                patterns: Dict[str, str] = {}
+                for skill, aliases in synonyms.items():
+                    for surface in [skill] + aliases:
+                        patterns.setdefault(normalize_for_matching(surface), skill)
+
+                self._skills = list(synonyms)
+                self._matcher = SkillMatcher(patterns)
+                self._mark_loaded("skills.json")
+                print(f"Ontology compiled: {len(self._skills)} skills, {len(patterns)} patterns.")
+
+            if self._is_stale("roles.json"):
+                self._roles = self._load_json("roles.json", {})
+                self._mark_loaded("roles.json")
+
+    @property
+    def skills(self) -> List[str]:
+        self._refresh()
+        return self._skills
+
+    def compiled(self) -> Tuple[List[str], SkillMatcher]:
+        """
+        The skills list and the matcher compiled from the same skills.json load.
+        """
+        self._refresh()
+        with self._lock:
+            return self._skills, self._matcher
+
+    @property
+    def roles(self) -> Dict[str, List[str]]:
+        self._refresh()
+        return self._roles
+
+    def extract_skills(self, text: str) -> List[str]:
+        """
+        Single pass over the text; returns canonical skills in order of appearance.
+        """
+        if not text:
+            return []
+        return self.match(normalize_for_matching(text))
+
+    def match(self, normalized_text: str) -> List[str]:
+        """
+        Like extract_skills, for text that is already lowercase with single spaces
+        (e.g. NormalizedDocument.text), so it is not normalized a second time.
+        """
+        if not normalized_text:
+            return []
+        self._refresh()
+        return self._matcher.find(normalized_text)
+
+
+# Global instance
+skill_ontology = SkillOntology()
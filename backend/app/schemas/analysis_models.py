@@ -2,19 +2,41 @@
 # Purpose: Define the strict data structures for the application using Pydantic.
 # These schemas ensure type safety and clear data contracts between modules.
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Dict, Optional
+from app.utils.text_cleaning import NormalizedDocument
 
 # --- Input Models ---
 
+class ExtractionInfo(BaseModel):
+    """
+    Which extractor produced a resume's text, and how long it took.
+    """
+    extractor: str
+    seconds: float
+    pages: int
+
 class ResumeContent(BaseModel):
     """
     Structured content extracted from a resume.
     """
     raw_text: str
+    resume_id: Optional[str] = Field(default=None, description="Hash of the uploaded file; pass it back instead of re-uploading")
     skills: List[str] = Field(default_factory=list)
     experience: List[str] = Field(default_factory=list, description="List of experience descriptions")
     projects: List[str] = Field(default_factory=list, description="List of project descriptions")
+    # Diagnostics only: excluded from responses and from the AI payload
+    extraction: Optional[ExtractionInfo] = Field(default=None, exclude=True)
+    _document: Optional[NormalizedDocument] = PrivateAttr(default=None)
+
+    @property
+    def document(self) -> NormalizedDocument:
+        """
+        Normalized view of raw_text, built on first use and reused afterwards.
+        """
+        if self._document is None:
+            self._document = NormalizedDocument(self.raw_text)
+        return self._document
 
 class JobDescription(BaseModel):
     """
@@ -22,6 +44,16 @@ class JobDescription(BaseModel):
     """
     raw_text: str
     required_skills: List[str] = Field(default_factory=list)
+    _document: Optional[NormalizedDocument] = PrivateAttr(default=None)
+
+    @property
+    def document(self) -> NormalizedDocument:
+        """
+        Normalized view of raw_text, built on first use and reused afterwards.
+        """
+        if self._document is None:
+            self._document = NormalizedDocument(self.raw_text)
+        return self._document
 
 # --- Rule Engine Output Models ---
 
@@ -61,6 +93,45 @@ class AIInsights(BaseModel):
     ats_suggestions: List[str]
     rewritten_bullets: List[str]
 
+# --- Candidate Search Models ---
+
+class CandidateSearchRequest(BaseModel):
+    """
+    Request body for retrieving the best stored candidates for a JD.
+    Pass either jd_text or the jd_id of a registered job.
+    """
+    jd_text: Optional[str] = None
+    jd_id: Optional[str] = None
+    top_k: int = Field(default=10, ge=1, le=1000)
+
+class JobRegistrationRequest(BaseModel):
+    """
+    Request body for registering a job description once for repeated scoring.
+    """
+    jd_text: str
+
+class JobRegistrationResponse(BaseModel):
+    """
+    A registered job: pass jd_id instead of jd_text to the scoring endpoints.
+    """
+    jd_id: str
+    required_skills: List[str]
+
+class CandidateMatch(BaseModel):
+    """
+    One stored candidate and its weighted match score (0-100).
+    """
+    candidate_id: str
+    score: float
+    metadata: Dict = Field(default_factory=dict)
+
+class CandidateSearchResponse(BaseModel):
+    """
+    Ranked candidates, best first.
+    """
+    total_candidates: int
+    results: List[CandidateMatch]
+
 # --- Final API Response ---
 
 class FullAnalysisResponse(BaseModel):
@@ -70,3 +141,13 @@ class FullAnalysisResponse(BaseModel):
     """
     computation: AnalysisComputations
     ai_insights: AIInsights
+
+class CompactAnalysisResponse(BaseModel):
+    """
+    Response of /analyze?view=compact (with insights) or view=scores (without):
+    no echoed resume or JD text.
+    """
+    resume_id: Optional[str] = None
+    scores: ScoringResult
+    skill_gap: SkillAnalysis
+    ai_insights: Optional[AIInsights] = None
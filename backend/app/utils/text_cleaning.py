@@ -3,6 +3,13 @@
 # This ensures consistency between Resume and JD text for better matching.
 
 import re
+from typing import List, Optional, Set
+
+# Runs of whitespace and/or non-ascii characters collapse to a single space
+_SPACE_RE = re.compile(r'(?:\s|[^\x00-\x7F])+')
+# Tokens keep the characters skills are spelled with: c++, c#, node.js, scikit-learn
+_TOKEN_RE = re.compile(r'[a-z0-9_+#]+(?:[.\-][a-z0-9_+#]+)*')
+_SENTENCE_RE = re.compile(r'[.!?\n]\s+')
 
 def clean_text(text: str) -> str:
     """
@@ -13,24 +20,60 @@ def clean_text(text: str) -> str:
     """
     if not text:
         return ""
-    
-    # Replace newlines and tabs with space
-    text = text.replace('\n', ' ').replace('\t', ' ')
-    
-    # Remove non-ascii characters (optional, but good for cleanliness)
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
-    
-    # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip().lower()
-
-def extract_sentences(text: str) -> list[str]:
+
+    # Newlines, tabs, repeated spaces and non-ascii characters in one pass
+    return _SPACE_RE.sub(' ', text).strip().lower()
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokens of already-cleaned (lowercase) text.
+    """
+    return _TOKEN_RE.findall(text)
+
+class NormalizedDocument:
     """
-    Splits text into basic sentences/bullets.
-    Useful for extracting experience/project lines.
+    One input text, normalized once and shared by every rule-engine step.
+    - raw: the original text
+    - text: clean_text(raw), lowercase with single spaces
+    - tokens / token_set: word tokens of `text`
+    - sentences: sentence/bullet split of the raw text (built on first use)
     """
-    # Simple split by period or newline, can be enhanced with SpaCy later
-    # For now, regex split is efficient enough for Foundation
-    sentences = re.split(r'[.!?\n]\s+', text)
-    return [s.strip() for s in sentences if s.strip()]
+
+    __slots__ = ("raw", "text", "tokens", "token_set", "_joined", "_sentences")
+
+    def __init__(self, raw: str):
+        self.raw = raw or ""
+        self.text = clean_text(self.raw)
+        self.tokens = tokenize(self.text)
+        self.token_set: Set[str] = set(self.tokens)
+        self._joined: Optional[str] = None
+        self._sentences: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def sentences(self) -> List[str]:
+        """
+        Splits the raw text into basic sentences/bullets.
+        Useful for extracting experience/project lines.
+        """
+        if self._sentences is None:
+            self._sentences = [s.strip() for s in _SENTENCE_RE.split(self.raw) if s.strip()]
+        return self._sentences
+
+    def contains(self, phrase: str) -> bool:
+        """
+        Token-boundary phrase test: "ai" matches "ai engineer" but not "maintain".
+        """
+        phrase_tokens = tokenize(clean_text(phrase))
+        if not phrase_tokens:
+            return False
+        if len(phrase_tokens) == 1:
+            return phrase_tokens[0] in self.token_set
+        if self._joined is None:
+            self._joined = f" {' '.join(self.tokens)} "
+        return f" {' '.join(phrase_tokens)} " in self._joined
+
+    def contains_any(self, phrases: List[str]) -> bool:
+        return any(self.contains(phrase) for phrase in phrases)
@@ -0,0 +1,81 @@
+# backend/benchmarks/corpus.py
+# Purpose: Deterministic synthetic resumes and job descriptions for benchmarks.
+# The same seed always produces byte-identical text, so runs are comparable.
+
+import io
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+ONTOLOGY_DIR = Path(__file__).resolve().parent.parent / "app" / "rule_engine" / "ontology"
+
+# Resume/JD sizes: number of bullet lines per section
+SIZES: Dict[str, int] = {"small": 5, "medium": 25, "large": 120}
+
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Shipped", "Maintained", "Scaled", "Refactored"]
+OBJECTS = ["a payments API", "the search service", "an internal dashboard", "data pipelines", "the CI/CD system",
+           "a recommendation engine", "customer onboarding", "the billing platform", "a mobile backend", "ETL jobs"]
+RESULTS = ["cutting latency by {n}%", "serving {n}k daily users", "reducing costs by {n}%",
+           "improving uptime to 99.{n}%", "for {n} enterprise clients", "saving {n} engineer-hours a month"]
+JD_LINES = ["You will own services end to end", "We value clear communication", "Experience with {skill} is required",
+            "Nice to have: {skill}", "You will mentor junior engineers", "Hands-on {skill} in production"]
+
+def _skills() -> List[str]:
+    raw = json.loads((ONTOLOGY_DIR / "skills.json").read_text(encoding="utf-8"))
+    return list(raw) if isinstance(raw, dict) else raw
+
+def _bullet(rng: random.Random, skills: List[str]) -> str:
+    result = rng.choice(RESULTS).format(n=rng.randint(10, 95))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)} and {rng.choice(skills)}, {result}."
+
+def resume_lines(size: str, seed: int = 0) -> List[str]:
+    rng = random.Random(f"resume-{size}-{seed}")
+    skills = _skills()
+    count = SIZES[size]
+    lines = [f"Candidate {seed}", "Software Engineer", "Technical Skills", ", ".join(rng.sample(skills, min(12, len(skills))))]
+    lines.append("Experience")
+    lines.extend(_bullet(rng, skills) for _ in range(count))
+    lines.append("Projects")
+    lines.extend(_bullet(rng, skills) for _ in range(max(2, count // 3)))
+    return lines
+
+def resume_text(size: str, seed: int = 0) -> str:
+    return "\n".join(resume_lines(size, seed))
+
+def jd_text(size: str, seed: int = 0) -> str:
+    rng = random.Random(f"jd-{size}-{seed}")
+    skills = _skills()
+    lines = ["Senior Software Engineer", "About the role"]
+    lines.extend(rng.choice(JD_LINES).format(skill=rng.choice(skills)) + "." for _ in range(SIZES[size]))
+    return "\n".join(lines)
+
+def resume_docx(size: str, seed: int = 0) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in resume_lines(size, seed):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def resume_pdf(size: str, seed: int = 0) -> bytes:
+    import fitz
+
+    document = fitz.open()
+    lines = resume_lines(size, seed)
+    per_page = 45
+    for start in range(0, len(lines), per_page):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), "\n".join(lines[start:start + per_page]), fontsize=9)
+    data = document.tobytes()
+    document.close()
+    return data
+
+def resume_file(size: str, fmt: str, seed: int = 0) -> bytes:
+    if fmt == "pdf":
+        return resume_pdf(size, seed)
+    if fmt == "docx":
+        return resume_docx(size, seed)
+    raise ValueError(f"Unknown format: {fmt}")
@@ -0,0 +1,71 @@
+# backend/benchmarks/embedding_parity.py
+# Purpose: Check that an alternative encoder backend scores like the torch reference.
+# Run from the backend directory:
+#   python -m benchmarks.embedding_parity --candidate onnx-int8 [--tolerance 0.03]
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Settings() needs a key; this check never talks to Groq
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+
+import numpy as np
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "parity_pairs.json"
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values), dtype='float64')
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+def score_pairs(backend_name: str, pairs) -> dict:
+    from app.embeddings.backends import create_backend
+    from app.embeddings.embedder import EmbeddingService
+
+    service = EmbeddingService(create_backend(backend_name))
+    texts = sorted({text for pair in pairs for text in pair if text})
+
+    # Throughput on the raw backend, bypassing the cache
+    started = time.perf_counter()
+    service.backend.encode(texts)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "scores": np.array(service.compute_similarity_scores([tuple(pair) for pair in pairs])),
+        "texts_per_second": round(len(texts) / elapsed, 1) if elapsed else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend accuracy-parity check.")
+    parser.add_argument("--reference", default="torch")
+    parser.add_argument("--candidate", default="onnx")
+    parser.add_argument("--fixtures", default=str(FIXTURES))
+    parser.add_argument("--tolerance", type=float, default=0.03, help="Max allowed absolute score difference.")
+    args = parser.parse_args()
+
+    pairs = json.loads(Path(args.fixtures).read_text(encoding="utf-8"))
+    reference = score_pairs(args.reference, pairs)
+    candidate = score_pairs(args.candidate, pairs)
+
+    diff = np.abs(reference["scores"] - candidate["scores"])
+    rank_corr = float(np.corrcoef(_ranks(reference["scores"]), _ranks(candidate["scores"]))[0, 1])
+    report = {
+        "reference": args.reference,
+        "candidate": args.candidate,
+        "pairs": len(pairs),
+        "max_abs_diff": round(float(diff.max()), 5),
+        "mean_abs_diff": round(float(diff.mean()), 5),
+        "spearman": round(rank_corr, 5),
+        "reference_texts_per_second": reference["texts_per_second"],
+        "candidate_texts_per_second": candidate["texts_per_second"],
+        "passed": bool(diff.max() <= args.tolerance),
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# backend/benchmarks/groq_server.py
+# Purpose: Local HTTP stand-in for Groq's chat-completions API, for load tests.
+# Unlike groq_stub (which replaces the client object), this exercises the real
+# AsyncGroq client: connection pool, timeouts, retries and SSE parsing.
+#
+# Standalone, from the backend directory:
+#   python -m benchmarks.groq_server --port 8765 --latency 0.8 --error-rate 0.02
+#   GROQ_BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from benchmarks.groq_stub import CANNED_INSIGHTS
+
+class GroqStubServer:
+    """
+    Serves POST .../chat/completions (plain and stream=true) on a background thread.
+    Each call sleeps `latency` plus up to `jitter` seconds; a `slow_rate` fraction
+    sleeps `slow_latency` instead (to trip client timeouts), and an `error_rate`
+    fraction answers `error_status`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5, jitter: float = 0.2,
+                 error_rate: float = 0.0, error_status: int = 503, slow_rate: float = 0.0,
+                 slow_latency: float = 15.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "streamed": 0, "errors": 0, "slow": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GroqStubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="groq-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _plan(self, stream: bool):
+        """
+        (delay, error) for one call, drawn under the lock so runs are reproducible with a seed.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["streamed"] += int(stream)
+            if self._rng.random() < self.slow_rate:
+                self._stats["slow"] += 1
+                return self.slow_latency, False
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            error = self._rng.random() < self.error_rate
+            self._stats["errors"] += int(error)
+            return delay, error
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # one line per request would swamp the load-test output
+
+            def _send_json(self, status: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    request = {}
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+                    return
+
+                stream = bool(request.get("stream"))
+                delay, error = server._plan(stream)
+                time.sleep(delay)
+                if error:
+                    self._send_json(server.error_status, {
+                        "error": {"message": "Injected failure", "type": "server_error"}
+                    })
+                    return
+
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+                model = request.get("model", "stub")
+                content = json.dumps(CANNED_INSIGHTS)
+                if stream:
+                    self._stream(completion_id, model, content)
+                    return
+                self._send_json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": length // 4, "completion_tokens": len(content) // 4,
+                              "total_tokens": (length + len(content)) // 4},
+                })
+
+            def _stream(self, completion_id: str, model: str, content: str):
+                # Close-delimited SSE body, as chunked encoding adds nothing for a stub
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                def event(delta: dict, finish_reason: Optional[str] = None):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+                event({"role": "assistant", "content": ""})
+                for start in range(0, len(content), 16):
+                    event({"content": content[start:start + 16]})
+                event({}, "stop")
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Groq's chat-completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Base response latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Extra uniform latency, 0..jitter seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with --error-status.")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of calls delayed by --slow-latency.")
+    parser.add_argument("--slow-latency", type=float, default=15.0)
+    args = parser.parse_args()
+
+    server = GroqStubServer(
+        args.host, args.port, args.latency, args.jitter, args.error_rate,
+        args.error_status, args.slow_rate, args.slow_latency
+    )
+    server.start()
+    print(f"Groq stub listening on {server.url} (set GROQ_BASE_URL to this).")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# backend/benchmarks/groq_stub.py
+# Purpose: In-process stand-in for the AsyncGroq client, so benchmarks never hit the network.
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+CANNED_INSIGHTS = {
+    "summary_explanation": "The system detected strong backend skills with a few gaps.",
+    "ats_suggestions": ["Add 'Docker' to your Skills section.", "Mention 'AWS' in your experience."],
+    "rewritten_bullets": ["Old: Worked on APIs -> New: Built FastAPI services handling 5k RPS."],
+}
+
+class _Completions:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def create(self, stream: bool = False, **kwargs):
+        await asyncio.sleep(self.latency)
+        content = json.dumps(CANNED_INSIGHTS)
+        if stream:
+            return self._stream(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _stream(self, content: str):
+        for start in range(0, len(content), 16):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[start:start + 16]))])
+
+class StubAsyncGroq:
+    """
+    Mimics the parts of AsyncGroq the AI Brain uses: chat.completions.create(...).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=_Completions(latency))
+
+def install(latency: float = 0.0):
+    """
+    Points the AI Brain singleton at the stub.
+    """
+    from app.ai_brain.groq_client import get_ai_brain
+
+    get_ai_brain().client = StubAsyncGroq(latency)
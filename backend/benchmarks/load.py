@@ -0,0 +1,302 @@
+# backend/benchmarks/load.py
+# Purpose: Concurrency load test for /api/v1/analyze.
+# Run from the backend directory:
+#   python -m benchmarks.load --concurrency 1,4,16,64 --duration 20 --output load.json
+#   python -m benchmarks.load --url http://127.0.0.1:8000 --groq-port 8765
+#
+# Without --url the app is served in-process by uvicorn on a free port, with
+# AsyncGroq pointed at a local Groq stand-in (benchmarks/groq_server.py). With
+# --url the stub still starts; run the target with GROQ_BASE_URL set to it.
+# Each concurrency step reports RPS, latency percentiles, status counts, and the
+# app's event-loop lag and RSS (both scraped from /metrics).
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import re
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Same defaults as benchmarks.run: real work on every request, no writes
+os.environ.setdefault("GROQ_API_KEY", "load-test-key")
+os.environ.setdefault("CANDIDATE_INDEX_ENABLED", "false")
+os.environ.setdefault("TRACE_LOG_LEVEL", "WARNING")
+
+from benchmarks import corpus
+from benchmarks.groq_server import GroqStubServer
+
+FORMATS = ["pdf", "docx"]
+LAG_METRIC = "resume_event_loop_lag_seconds"
+RSS_METRIC = "resume_process_resident_memory_bytes"
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][\w:]*)(\{[^}]*\})?\s+(\S+)$')
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """
+    Prometheus text exposition -> {"name{labels}": value}.
+    """
+    samples = {}
+    for line in text.splitlines():
+        match = SAMPLE_RE.match(line.strip())
+        if match:
+            samples[match.group(1) + (match.group(2) or "")] = float(match.group(3))
+    return samples
+
+def histogram_delta(before: Dict[str, float], after: Dict[str, float], name: str) -> Dict[str, float]:
+    """
+    Mean, p99 (upper bucket bound) and max bucket of a histogram's samples between two scrapes.
+    """
+    buckets = []
+    for key, value in after.items():
+        if key.startswith(f"{name}_bucket{{") and 'le="+Inf"' not in key:
+            bound = float(re.search(r'le="([^"]+)"', key).group(1))
+            buckets.append((bound, value - before.get(key, 0.0)))
+    buckets.sort()
+    count = after.get(f"{name}_count", 0.0) - before.get(f"{name}_count", 0.0)
+    total = after.get(f"{name}_sum", 0.0) - before.get(f"{name}_sum", 0.0)
+    if count <= 0:
+        return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_bucket_ms": 0.0}
+
+    def bound_for(rank: float) -> float:
+        for bound, cumulative in buckets:
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    return {
+        "samples": int(count),
+        "mean_ms": round(total / count * 1000, 3),
+        "p99_ms": round(bound_for(0.99 * count) * 1000, 3),
+        "max_bucket_ms": round(bound_for(count) * 1000, 3),
+    }
+
+def build_fixtures(count: int, sizes: List[str]) -> List[Tuple[str, bytes, str]]:
+    """
+    Distinct (filename, file bytes, jd_text) requests, cycling through sizes and formats.
+    """
+    combos = list(itertools.product(sizes, FORMATS))
+    fixtures = []
+    for seed in range(count):
+        size, fmt = combos[seed % len(combos)]
+        fixtures.append((f"resume-{seed}.{fmt}", corpus.resume_file(size, fmt, seed), corpus.jd_text(size, seed % 8)))
+    return fixtures
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class InProcessApp:
+    """
+    Runs app.main:app under uvicorn on a background thread with its own event loop,
+    so the app's loop lag is not mixed up with the load generator's.
+    """
+
+    def __init__(self, port: int):
+        import uvicorn
+        import app.main as main
+
+        self.url = f"http://127.0.0.1:{port}"
+        self.server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="uvicorn", daemon=True)
+
+    def start(self, timeout: float = 60.0) -> "InProcessApp":
+        self.thread.start()
+        started = time.perf_counter()
+        while not self.server.started:
+            if not self.thread.is_alive() or time.perf_counter() - started > timeout:
+                raise RuntimeError("In-process app did not start.")
+            time.sleep(0.05)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+async def wait_ready(client, timeout: float):
+    started = time.perf_counter()
+    while True:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError("Target did not become ready in time.")
+        await asyncio.sleep(0.2)
+
+async def run_step(client, fixtures, concurrency: int, duration: float, view: str, timeout: float) -> dict:
+    """
+    `concurrency` closed-loop workers post fixtures back to back for `duration` seconds.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    degraded = 0
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal degraded
+        while time.perf_counter() < deadline:
+            name, content, jd = fixtures[next(counter) % len(fixtures)]
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/v1/analyze",
+                    params={"view": view},
+                    files={"resume_file": (name, content)},
+                    data={"jd_text": jd},
+                    timeout=timeout
+                )
+                status = str(response.status_code)
+                # Answered with fallback insights by the admission layer
+                degraded += response.headers.get("x-degraded") == "true"
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    before = parse_metrics((await client.get("/metrics")).text)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = parse_metrics((await client.get("/metrics")).text)
+
+    ok = statuses.get("200", 0)
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - ok / len(latencies), 4) if latencies else 0.0,
+        "statuses": statuses,
+        "degraded_rate": round(degraded / ok, 4) if ok else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 1),
+        "event_loop_lag": histogram_delta(before, after, LAG_METRIC),
+        "rss_mb": round(after.get(RSS_METRIC, 0.0) / 2**20, 1),
+    }
+
+async def run_load(url: str, fixtures, levels: List[int], args, stub: Optional[GroqStubServer]) -> List[dict]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(levels) + 4, max_keepalive_connections=max(levels) + 4)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        await wait_ready(client, args.ready_timeout)
+        # Warm code paths and pools before the first measured step
+        await run_step(client, fixtures, min(levels), args.warmup, args.view, args.timeout)
+
+        steps = []
+        for concurrency in levels:
+            groq_before = stub.stats() if stub else None
+            step = await run_step(client, fixtures, concurrency, args.duration, args.view, args.timeout)
+            if stub:
+                groq_after = stub.stats()
+                step["groq_stub"] = {k: groq_after[k] - groq_before[k] for k in groq_after}
+            steps.append(step)
+            lag = step["event_loop_lag"]
+            print(f"c={concurrency:<4} rps {step['rps']:>8.2f}  p50 {step['p50_ms']:>8.1f}  p95 {step['p95_ms']:>8.1f}  "
+                  f"p99 {step['p99_ms']:>8.1f} ms  errors {step['error_rate'] * 100:5.1f}%  "
+                  f"lag p99 {lag['p99_ms']:>7.1f} ms  rss {step['rss_mb']:>7.1f} MB", file=sys.stderr)
+        return steps
+
+def main():
+    parser = argparse.ArgumentParser(description="Stepped-concurrency load test for /api/v1/analyze.")
+    parser.add_argument("--url", help="Target base URL. Omit to serve the app in-process.")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency steps.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per step.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the first step.")
+    parser.add_argument("--view", default="full", choices=["full", "compact", "scores"])
+    parser.add_argument("--fixtures", type=int, default=32, help="Distinct resumes in the corpus.")
+    parser.add_argument("--sizes", default="small,medium", help="Comma-separated corpus sizes.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request.")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--cache", action="store_true", help="Keep the app's resume/embedding/insights caches on.")
+    parser.add_argument("--no-groq-stub", action="store_true", help="Do not start the Groq stand-in.")
+    parser.add_argument("--groq-port", type=int, default=0, help="Stub port (0 picks a free one).")
+    parser.add_argument("--groq-latency", type=float, default=0.5)
+    parser.add_argument("--groq-jitter", type=float, default=0.2)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-error-status", type=int, default=503)
+    parser.add_argument("--groq-slow-rate", type=float, default=0.0, help="Fraction of Groq calls that stall.")
+    parser.add_argument("--groq-slow-latency", type=float, default=15.0)
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    sizes = [s for s in args.sizes.split(",") if s]
+
+    stub = None
+    if not args.no_groq_stub:
+        stub = GroqStubServer(
+            port=args.groq_port, latency=args.groq_latency, jitter=args.groq_jitter,
+            error_rate=args.groq_error_rate, error_status=args.groq_error_status,
+            slow_rate=args.groq_slow_rate, slow_latency=args.groq_slow_latency, seed=0
+        ).start()
+        print(f"Groq stub at {stub.url}", file=sys.stderr)
+
+    app = None
+    if args.url:
+        url = args.url.rstrip("/")
+        if stub:
+            print(f"Start the target with GROQ_BASE_URL={stub.url} to use the stub.", file=sys.stderr)
+    else:
+        if stub:
+            os.environ["GROQ_BASE_URL"] = stub.url
+        if not args.cache:
+            for name in ("RESUME_CACHE_SIZE", "EMBEDDING_CACHE_SIZE"):
+                os.environ.setdefault(name, "0")
+            os.environ.setdefault("INSIGHTS_CACHE_BACKEND", "none")
+        app = InProcessApp(_free_port()).start()
+        url = app.url
+
+    fixtures = build_fixtures(args.fixtures, sizes)
+    try:
+        steps = asyncio.run(run_load(url, fixtures, levels, args, stub))
+    finally:
+        if app:
+            app.stop()
+        if stub:
+            stub.stop()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": args.url or "in-process",
+            "view": args.view,
+            "duration_s": args.duration,
+            "fixtures": len(fixtures),
+            "sizes": sizes,
+            "groq_stub": None if stub is None else {
+                "latency": args.groq_latency, "jitter": args.groq_jitter,
+                "error_rate": args.groq_error_rate, "error_status": args.groq_error_status,
+                "slow_rate": args.groq_slow_rate, "slow_latency": args.groq_slow_latency,
+            },
+        },
+        "steps": steps,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
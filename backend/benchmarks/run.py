@@ -0,0 +1,228 @@
+# backend/benchmarks/run.py
+# Purpose: Per-stage microbenchmarks on a deterministic synthetic corpus.
+# Run from the backend directory:
+#   python -m benchmarks.run --output bench.json
+#   python -m benchmarks.run --compare bench.json --threshold 0.15
+#
+# Every stage is timed on its own; the end-to-end case drives /api/v1/analyze
+# in-process with the Groq client replaced by a stub.
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Benchmarks must measure real work: no caches, no index writes, no network
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+os.environ.setdefault("EMBEDDING_CACHE_SIZE", "0")
+os.environ.setdefault("RESUME_CACHE_SIZE", "0")
+os.environ.setdefault("INSIGHTS_CACHE_BACKEND", "none")
+os.environ.setdefault("CANDIDATE_INDEX_ENABLED", "false")
+os.environ.setdefault("WARMUP_ON_STARTUP", "false")
+
+from benchmarks import corpus
+
+FORMATS = ["pdf", "docx"]
+CONCURRENCY = 50
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Runs fn warmup + repeat times; returns timing statistics in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+def run_stages(sizes: List[str], repeat: int, only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    from app.resume_parser.parser import ResumeParser
+    from app.rule_engine.engine import RuleEngine
+    from app.rule_engine.skill_gap import analyze_skill_gap, resume_phrases, skill_vectors
+    from app.embeddings.embedder import get_embedding_service
+    from app.utils.text_cleaning import NormalizedDocument
+    from app.core.responses import render_json
+    from app.schemas.analysis_models import AIInsights, CompactAnalysisResponse, FullAnalysisResponse
+    from fastapi.encoders import jsonable_encoder
+    from benchmarks import groq_stub
+
+    service = get_embedding_service()
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(name: str, fn: Callable[[], object], times: int = repeat):
+        if only and only not in name:
+            return
+        results[name] = measure(fn, times)
+        print(f"{name:<40} median {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    for size in sizes:
+        text = corpus.resume_text(size)
+        jd = corpus.jd_text(size)
+        resume = ResumeParser._structure_text(text)
+        jd_content = RuleEngine.parse_jd(jd)
+        pairs = RuleEngine._score_pairs(resume, *RuleEngine.jd_texts(jd_content))
+        texts = [t for pair in pairs for t in pair]
+        phrases = resume_phrases(resume.skills, resume.experience)
+        positions, embeddings = service.embed_unique(RuleEngine._batch_texts(pairs, [phrases], jd_content.required_skills))
+        jd_vectors = skill_vectors(jd_content.required_skills, positions, embeddings)
+        phrase_vectors = embeddings[[positions[p] for p in phrases]]
+
+        for fmt in FORMATS:
+            content = corpus.resume_file(size, fmt)
+            record(f"extract.{fmt}.{size}", lambda c=content, f=fmt: ResumeParser.extract(c, f"resume.{f}"))
+
+        record(f"structure_text.{size}", lambda: ResumeParser._structure_text(text))
+        record(f"normalize.{size}", lambda: NormalizedDocument(text))
+        record(f"parse_jd.{size}", lambda: RuleEngine.parse_jd(jd))
+        record(f"extract_skills.{size}", lambda: RuleEngine.extract_skills_from_text(NormalizedDocument(text)))
+        # Raw backend call: bypasses the embedding cache entirely
+        record(f"embed.{size}", lambda: service.backend.encode(texts))
+        record(f"score.{size}", lambda: service.compute_similarity_scores(pairs))
+        # Gap analysis proper: vectors precomputed, as after the shared encode pass
+        record(f"skill_gap.{size}", lambda: analyze_skill_gap(
+            jd_content.required_skills, jd_vectors, resume.document, phrase_vectors
+        ))
+        record(f"rule_engine.analyze.{size}", lambda: asyncio.run(RuleEngine.analyze(resume, jd_content)))
+
+        # Distinct resumes, so the batcher cannot simply deduplicate them
+        variants = [ResumeParser._structure_text(f"{text}\nReference {i}") for i in range(CONCURRENCY)]
+
+        async def concurrent_analyses():
+            await asyncio.gather(*(RuleEngine.analyze(variant, jd_content) for variant in variants))
+
+        # Concurrent analyses exercise the embedding micro-batcher
+        record(f"rule_engine.analyze_x{CONCURRENCY}.{size}", lambda: asyncio.run(concurrent_analyses()), max(repeat // 4, 1))
+
+        # Response serialization: FastAPI's default path (jsonable_encoder + json) versus
+        # render_json, for the full and compact views. Egress sizes are recorded too.
+        computation = asyncio.run(RuleEngine.analyze(resume, jd_content))
+        insights = AIInsights(**groq_stub.CANNED_INSIGHTS)
+        responses = {
+            "full": FullAnalysisResponse(computation=computation, ai_insights=insights),
+            "compact": CompactAnalysisResponse(
+                scores=computation.scores, skill_gap=computation.skill_gap, ai_insights=insights
+            ),
+        }
+        record(f"serialize.full_jsonable.{size}", lambda: json.dumps(jsonable_encoder(responses["full"])))
+        for view, response in responses.items():
+            name = f"serialize.{view}.{size}"
+            record(name, lambda r=response: render_json(r))
+            if name in results:
+                body = render_json(response)
+                results[name]["bytes"] = len(body)
+                results[name]["gzip_bytes"] = len(gzip.compress(body, compresslevel=6))
+
+    return results
+
+def run_end_to_end(sizes: List[str], repeat: int, groq_latency: float, only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    from fastapi.testclient import TestClient
+    from benchmarks import groq_stub
+    import app.main as main
+
+    results: Dict[str, Dict[str, float]] = {}
+    with TestClient(main.app) as client:
+        groq_stub.install(groq_latency)
+        for size in sizes:
+            for fmt, view in [(fmt, view) for fmt in FORMATS for view in ("full", "compact")]:
+                name = f"analyze_resume.{fmt}.{size}" + ("" if view == "full" else f".{view}")
+                if only and only not in name:
+                    continue
+                files = {"resume_file": (f"resume.{fmt}", corpus.resume_file(size, fmt))}
+                data = {"jd_text": corpus.jd_text(size)}
+
+                def call():
+                    response = client.post("/api/v1/analyze", params={"view": view}, files=files, data=data)
+                    response.raise_for_status()
+                    return response
+
+                results[name] = measure(call, repeat)
+                results[name]["bytes"] = int(call().headers.get("content-length", 0))
+                print(f"{name:<40} median {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Stages whose median got slower than the baseline by more than `threshold` (a fraction).
+    """
+    regressions = []
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["median_ms"]:
+            continue
+        change = (stats["median_ms"] - base["median_ms"]) / base["median_ms"]
+        if change > threshold:
+            regressions.append({
+                "stage": name,
+                "baseline_ms": base["median_ms"],
+                "current_ms": stats["median_ms"],
+                "change": round(change, 3),
+            })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmarks.")
+    parser.add_argument("--sizes", default=",".join(corpus.SIZES), help="Comma-separated corpus sizes.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--e2e-repeat", type=int, default=5)
+    parser.add_argument("--groq-latency", type=float, default=0.0, help="Stubbed Groq latency in seconds.")
+    parser.add_argument("--only", help="Run only stages whose name contains this string.")
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed median slowdown (0.15 = 15%%).")
+    args = parser.parse_args()
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    from app.core.config import settings
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "embedding_backend": settings.EMBEDDING_BACKEND,
+            "sizes": sizes,
+        },
+        "results": run_stages(sizes, args.repeat, args.only),
+    }
+    if not args.skip_e2e:
+        report["results"].update(run_end_to_end(sizes, args.e2e_repeat, args.groq_latency, args.only))
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.threshold)
+        for item in report["regressions"]:
+            print(f"REGRESSION {item['stage']}: {item['baseline_ms']} -> {item['current_ms']} ms "
+                  f"(+{item['change'] * 100:.1f}%)", file=sys.stderr)
+        exit_code = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# backend/benchmarks/skill_match_calibration.py
+# Purpose: Measure the skill-gap thresholds against the real encoder on a labelled
+# set of (JD skill, resume phrase, label) pairs, label being strong/weak/missing.
+# Run from the backend directory:
+#   python -m benchmarks.skill_match_calibration [--target-precision 0.95]
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Settings() needs a key; this check never talks to Groq
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+
+import numpy as np
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "skill_pairs.json"
+
+def _precision(predicted: np.ndarray, relevant: np.ndarray):
+    return round(float(relevant[predicted].mean()), 4) if predicted.any() else None
+
+def _recall(predicted: np.ndarray, relevant: np.ndarray):
+    return round(float(predicted[relevant].mean()), 4) if relevant.any() else None
+
+def _lowest_threshold(similarity: np.ndarray, relevant: np.ndarray, target: float):
+    """
+    Lowest observed similarity that still keeps precision >= target (None if none does).
+    """
+    for threshold in np.unique(similarity):
+        if (_precision(similarity >= threshold, relevant) or 0.0) >= target:
+            return round(float(threshold), 4)
+    return None
+
+def main():
+    from app.core.config import settings
+    from app.embeddings.embedder import get_embedding_service
+
+    parser = argparse.ArgumentParser(description="Skill-gap threshold calibration.")
+    parser.add_argument("--fixtures", default=str(FIXTURES))
+    parser.add_argument("--strong", type=float, default=settings.SKILL_MATCH_STRONG_THRESHOLD)
+    parser.add_argument("--weak", type=float, default=settings.SKILL_MATCH_WEAK_THRESHOLD)
+    parser.add_argument("--target-precision", type=float, default=0.95)
+    args = parser.parse_args()
+
+    pairs = json.loads(Path(args.fixtures).read_text(encoding="utf-8"))
+    service = get_embedding_service()
+    left = service.embed_batch([jd_skill for jd_skill, _, _ in pairs], normalize=True)
+    right = service.embed_batch([phrase for _, phrase, _ in pairs], normalize=True)
+    similarity = (left * right).sum(axis=1)
+    labels = np.array([label for _, _, label in pairs])
+
+    is_strong = labels == "strong"
+    is_match = labels != "missing"
+    report = {
+        "model": service.cache.model_name,
+        "pairs": len(pairs),
+        "strong_threshold": args.strong,
+        "weak_threshold": args.weak,
+        "strong_precision": _precision(similarity >= args.strong, is_strong),
+        "strong_recall": _recall(similarity >= args.strong, is_strong),
+        "match_precision": _precision(similarity >= args.weak, is_match),
+        "match_recall": _recall(similarity >= args.weak, is_match),
+        "suggested_strong_threshold": _lowest_threshold(similarity, is_strong, args.target_precision),
+        "suggested_weak_threshold": _lowest_threshold(similarity, is_match, args.target_precision),
+        "similarity_by_label": {
+            label: [round(float(similarity[labels == label].min()), 4), round(float(similarity[labels == label].max()), 4)]
+            for label in ("strong", "weak", "missing") if (labels == label).any()
+        },
+    }
+    report["passed"] = all(
+        report[key] is not None and report[key] >= args.target_precision
+        for key in ("strong_precision", "match_precision")
+    )
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+if __name__ == "__main__":
+    main()
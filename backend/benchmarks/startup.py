@@ -0,0 +1,105 @@
+# backend/benchmarks/startup.py
+# Purpose: Measure application import time and first-request latency.
+# Run from the backend directory:
+#   python -m benchmarks.startup [--no-warmup] [--runs 3] [--output startup.json]
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Settings() needs a key; the benchmark never talks to Groq
+os.environ.setdefault("GROQ_API_KEY", "benchmark-key")
+
+SAMPLE_RESUME = [
+    "Jane Doe",
+    "Skills",
+    "Python, FastAPI, Docker, PostgreSQL, Redis, AWS",
+    "Experience",
+    "Backend Engineer at Acme - built REST APIs with FastAPI and PostgreSQL.",
+    "Projects",
+    "Resume analyser - semantic matching with sentence-transformers and FAISS.",
+]
+SAMPLE_JD = "We are hiring a Python backend developer with FastAPI, Docker, PostgreSQL and AWS experience."
+
+def measure_import_time(runs: int) -> dict:
+    """
+    Imports app.main in fresh interpreters so module caches do not hide the cost.
+    """
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return {"runs": runs, "min_s": round(min(samples), 4), "median_s": round(statistics.median(samples), 4)}
+
+def _sample_docx() -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in SAMPLE_RESUME:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def measure_first_request(warmup: bool, ready_timeout: float) -> dict:
+    os.environ["WARMUP_ON_STARTUP"] = "true" if warmup else "false"
+
+    from fastapi.testclient import TestClient
+    from app.ai_brain.groq_client import AIProcessor
+
+    async def no_insights(self, analysis):
+        return None
+
+    # Keep the network out of the measurement; the endpoint falls back deterministically
+    AIProcessor.generate_insights = no_insights
+
+    result = {"warmup": warmup}
+    start = time.perf_counter()
+    import app.main as main
+    result["import_s"] = round(time.perf_counter() - start, 4)
+
+    with TestClient(main.app) as client:
+        started = time.perf_counter()
+        while client.get("/ready").status_code != 200:
+            if time.perf_counter() - started > ready_timeout:
+                raise TimeoutError("App did not become ready in time.")
+            time.sleep(0.05)
+        result["ready_s"] = round(time.perf_counter() - started, 4)
+
+        files = {"resume_file": ("resume.docx", _sample_docx(),
+                                 "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+        for label in ("first_request_s", "second_request_s"):
+            started = time.perf_counter()
+            response = client.post("/api/v1/analyze", files=files, data={"jd_text": SAMPLE_JD})
+            response.raise_for_status()
+            result[label] = round(time.perf_counter() - started, 4)
+
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark for the API.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter import runs.")
+    parser.add_argument("--no-warmup", action="store_true", help="Disable the startup warmup.")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    report = {
+        "import_time": measure_import_time(args.runs),
+        "first_request": measure_first_request(not args.no_warmup, args.ready_timeout),
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# backend/tests/conftest.py
+# Purpose: Test setup. Settings require a Groq key (tests never call Groq), and
+# encoder-dependent tests use a deterministic stand-in for the embedding model.
+
+import hashlib
+import os
+from typing import List
+import numpy as np
+import pytest
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from app.embeddings.backends import EncoderBackend  # noqa: E402 (needs the env above)
+
+
+class HashBackend(EncoderBackend):
+    """
+    Deterministic stand-in encoder: a pseudo-random vector per distinct text.
+    """
+
+    name = "hash"
+    dimension = 32
+
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self.calls.append(list(texts))
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            rows.append(np.random.default_rng(seed).standard_normal(self.dimension))
+        return np.array(rows, dtype="float32").reshape(len(texts), self.dimension)
+
+
+@pytest.fixture
+def embedding_service(monkeypatch):
+    """
+    The global EmbeddingService, backed by HashBackend instead of a real model.
+    """
+    from app.embeddings import embedder
+    service = embedder.EmbeddingService(backend=HashBackend())
+    monkeypatch.setattr(embedder, "_embedding_service", service)
+    return service
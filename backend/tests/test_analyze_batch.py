@@ -0,0 +1,130 @@
+# backend/tests/test_analyze_batch.py
+# Purpose: POST /analyze/batch: per-chunk scoring failures, archive limits,
+# the bulk admission slot and the deferred top-N AI step.
+
+import io
+import json
+import zipfile
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes.v1 import analyze
+from app.core.admission import AdmissionController
+from app.core.config import settings
+from app.resume_parser.parser import ResumeParser
+
+JD = "Backend engineer. Required: Python, Docker."
+
+
+@pytest.fixture
+def client(monkeypatch, embedding_service):
+    async def parse_bytes(content: bytes, filename: str):
+        return ResumeParser._structure_text(content.decode("utf-8"))
+
+    monkeypatch.setattr(analyze.ResumeParser, "parse_bytes", parse_bytes)
+    monkeypatch.setattr(settings, "CANDIDATE_INDEX_ENABLED", False)
+    app = FastAPI()
+    app.include_router(analyze.router)
+    return TestClient(app)
+
+
+def make_controller() -> AdmissionController:
+    return AdmissionController(
+        enabled=True, max_in_flight=4, bulk_max_in_flight=1, max_queue=4, bulk_max_queue=2,
+        queue_timeout=1.0, degrade_queue_depth=100, degrade_p95_seconds=60.0,
+        degrade_hold_seconds=30.0, latency_window_seconds=60.0
+    )
+
+
+def make_zip(members) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def post_batch(client, files):
+    response = client.post("/analyze/batch", data={"jd_text": JD}, files=files)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return response, lines
+
+
+def test_failed_chunk_yields_error_lines_and_summary(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_ENCODE_SIZE", 2)
+    real_analyze_many = analyze.RuleEngine.analyze_many
+    calls = 0
+
+    async def flaky_analyze_many(resumes, jd, job=None):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("encoder crashed")
+        return await real_analyze_many(resumes, jd, job)
+
+    monkeypatch.setattr(analyze.RuleEngine, "analyze_many", flaky_analyze_many)
+    files = [("resume_files", (f"r{i}.pdf", f"Skills\nPython\nExperience\nProject {i}".encode())) for i in range(4)]
+    response, lines = post_batch(client, files)
+
+    assert response.status_code == 200
+    statuses = [line["status"] for line in lines[:-1]]
+    assert statuses.count("error") == 2 and statuses.count("ok") == 2
+    assert lines[-1] == {"status": "summary", "total": 4, "scored": 2, "failed": 2}
+
+
+def test_zip_member_is_bounded_by_bytes_read_not_declared_size(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_FILE_BYTES", 1000)
+    archive = make_zip([("big.pdf", b"x" * 5000)])
+    response = client.post("/analyze/batch", data={"jd_text": JD}, files=[("resume_files", ("cvs.zip", archive))])
+    assert response.status_code == 400
+    assert "per-file size limit" in response.json()["detail"]
+
+
+def test_zip_total_decompressed_budget(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_ARCHIVE_BYTES", 2500)
+    archive = make_zip([(f"r{i}.pdf", b"Skills\nPython\n" + b" " * 1000) for i in range(3)])
+    response = client.post("/analyze/batch", data={"jd_text": JD}, files=[("resume_files", ("cvs.zip", archive))])
+    assert response.status_code == 400
+    assert "total size limit" in response.json()["detail"]
+
+
+def test_read_member_ignores_a_lying_header():
+    archive_bytes = make_zip([("cv.pdf", b"y" * 4000)])
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        info = archive.infolist()[0]
+        info.file_size = 10  # declared size understates the real content
+        with pytest.raises((ValueError, zipfile.BadZipFile)):
+            analyze._read_member(archive, info, "cvs.zip/cv.pdf", budget=100)
+
+
+def test_rejected_upload_gives_back_the_bulk_slot(client, monkeypatch):
+    controller = make_controller()
+    monkeypatch.setattr(analyze, "admission", controller)
+    monkeypatch.setattr(settings, "BATCH_MAX_FILE_BYTES", 10)
+    response = client.post("/analyze/batch", data={"jd_text": JD}, files=[("resume_files", ("r.pdf", b"x" * 100))])
+    assert response.status_code == 400
+    assert controller.in_flight["bulk"] == 0
+
+
+def test_top_n_insights_go_to_the_best_scores(client, monkeypatch):
+    generated = []
+
+    class Brain:
+        async def generate_insights(self, computation):
+            generated.append(computation.resume_data.resume_id)
+            return None
+
+    monkeypatch.setattr(analyze, "get_ai_brain", lambda: Brain())
+    monkeypatch.setattr(analyze, "admission", make_controller())
+    texts = ["Skills\nCooking", "Skills\nPython, Docker\nExperience\nBuilt Python services in Docker",
+             "Skills\nPython\nExperience\nPython scripts"]
+    files = [("resume_files", (f"r{i}.pdf", text.encode())) for i, text in enumerate(texts)]
+    response = client.post("/analyze/batch", data={"jd_text": JD, "ai_mode": "top_n", "ai_top_n": "2"}, files=files)
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    scores = {line["index"]: line["scores"]["overall_score"] for line in lines if line["status"] == "ok"}
+    ranked = [line for line in lines if line["status"] == "insights"]
+    assert [line["index"] for line in ranked] == sorted(scores, key=lambda i: (-scores[i], i))[:2]
+    assert [line["rank"] for line in ranked] == [1, 2]
+    assert len(generated) == 2
+    assert lines[-1] == {"status": "summary", "total": 3, "scored": 3, "failed": 0}
@@ -0,0 +1,35 @@
+# backend/tests/test_batch_checkpoint.py
+# Purpose: Offline batch scoring: checkpoint bookkeeping across runs, --jd-id lookups.
+
+import pytest
+from app.rule_engine import batch
+from app.rule_engine.batch import Checkpoint, load_jobs
+from app.rule_engine.jd_store import JobStore
+
+
+def test_retried_success_leaves_the_failed_set(tmp_path):
+    path = tmp_path / "run.checkpoint"
+    first = Checkpoint(path, "fingerprint")
+    first.record(["a.pdf"], {"b.pdf": "parse error", "c.pdf": "parse error"}, None)
+    assert set(first.failed) == {"b.pdf", "c.pdf"}
+
+    # --retry-failed run: b.pdf now parses, c.pdf still fails
+    retry = Checkpoint(path, "fingerprint")
+    retry.record(["b.pdf"], {"c.pdf": "parse error"}, None)
+    assert set(retry.failed) == {"c.pdf"}
+
+    reloaded = Checkpoint(path, "fingerprint")
+    assert reloaded.done == {"a.pdf", "b.pdf"}
+    assert set(reloaded.failed) == {"c.pdf"}
+
+
+def test_jd_ids_need_the_disk_job_store(monkeypatch):
+    monkeypatch.setattr(batch, "job_store", JobStore())
+    with pytest.raises(SystemExit, match="JOB_STORE_DIR"):
+        load_jobs([], ["a" * 64])
+
+
+def test_unknown_jd_id_names_the_job(monkeypatch, tmp_path, embedding_service):
+    monkeypatch.setattr(batch, "job_store", JobStore(directory=str(tmp_path)))
+    with pytest.raises(SystemExit, match="b" * 64):
+        load_jobs([], ["b" * 64])
@@ -0,0 +1,123 @@
+# backend/tests/test_batcher.py
+# Purpose: Embedding micro-batcher: coalescing, deduplication, size flushes,
+# batching while the encoder is busy, and error propagation.
+
+import asyncio
+import threading
+import time
+from typing import List
+import numpy as np
+import pytest
+from app.embeddings.batcher import MicroBatcher
+
+
+class RecordingEncoder:
+    """
+    Encodes each text as [len(text), first char code]; records every batch.
+    """
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.batches: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        with self._lock:
+            self.batches.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("encoder failed")
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype="float32")
+
+
+def expected(texts: List[str]) -> np.ndarray:
+    return np.array([[len(t), ord(t[0])] for t in texts], dtype="float32")
+
+
+def test_concurrent_requests_share_one_deduplicated_batch():
+    encoder = RecordingEncoder()
+
+    async def scenario():
+        batcher = MicroBatcher(encoder, max_batch_size=64, max_delay=0.02)
+        requests = [["alpha", "beta"], ["beta", "gamma"], ["alpha"]]
+        results = await asyncio.gather(*(batcher.encode(texts) for texts in requests))
+        return requests, results, batcher.stats()
+
+    requests, results, stats = asyncio.run(scenario())
+    for texts, vectors in zip(requests, results):
+        assert np.array_equal(vectors, expected(texts))
+    assert encoder.batches == [["alpha", "beta", "gamma"]]
+    assert stats["batches"] == 1 and stats["requests"] == 3
+
+
+def test_full_batch_flushes_without_waiting_for_the_delay():
+    encoder = RecordingEncoder()
+
+    async def scenario():
+        batcher = MicroBatcher(encoder, max_batch_size=2, max_delay=10.0)
+        return await asyncio.wait_for(batcher.encode(["one", "two"]), timeout=2.0)
+
+    assert np.array_equal(asyncio.run(scenario()), expected(["one", "two"]))
+
+
+def test_requests_accumulate_while_the_encoder_is_busy():
+    encoder = RecordingEncoder(delay=0.1)
+
+    async def scenario():
+        batcher = MicroBatcher(encoder, max_batch_size=64, max_delay=0.001, max_in_flight=1)
+        first = asyncio.create_task(batcher.encode(["first"]))
+        await asyncio.sleep(0.03)  # the first batch is now running
+        rest = [asyncio.create_task(batcher.encode([f"next{i}"])) for i in range(5)]
+        await asyncio.gather(first, *rest)
+
+    asyncio.run(scenario())
+    assert encoder.batches == [["first"], [f"next{i}" for i in range(5)]]
+
+
+def test_encoder_errors_reach_every_caller_and_the_batcher_recovers():
+    encoder = RecordingEncoder(fail=True)
+
+    async def scenario():
+        batcher = MicroBatcher(encoder, max_delay=0.005)
+        outcomes = await asyncio.gather(batcher.encode(["a"]), batcher.encode(["b"]), return_exceptions=True)
+        encoder.fail = False
+        return outcomes, await batcher.encode(["c"])
+
+    outcomes, recovered = asyncio.run(scenario())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert np.array_equal(recovered, expected(["c"]))
+
+
+def test_cancelled_caller_does_not_break_the_batch():
+    encoder = RecordingEncoder(delay=0.05)
+
+    async def scenario():
+        batcher = MicroBatcher(encoder, max_delay=0.005)
+        cancelled = asyncio.create_task(batcher.encode(["gone"]))
+        kept = asyncio.create_task(batcher.encode(["kept"]))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept
+
+    assert np.array_equal(asyncio.run(scenario()), expected(["kept"]))
+
+
+def test_cancelled_batch_cancels_its_callers():
+    encoder = RecordingEncoder(delay=0.05)
+
+    async def scenario():
+        batcher = MicroBatcher(encoder, max_delay=0.001)
+        caller = asyncio.create_task(batcher.encode(["a"]))
+        await asyncio.sleep(0.01)  # the batch is now running
+        assert len(batcher._tasks) == 1
+        for task in list(batcher._tasks):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, timeout=1.0)
+        await asyncio.sleep(0)
+        return batcher._tasks
+
+    assert asyncio.run(scenario()) == set()
@@ -0,0 +1,124 @@
+# backend/tests/test_embedding_disk_cache.py
+# Purpose: The memory-mapped disk tier of the embedding cache, including
+# several writer processes sharing one directory.
+
+import hashlib
+import json
+import multiprocessing
+import numpy as np
+from app.embeddings.embedder import _DiskTier
+
+DIMENSION = 8
+
+
+def vector_for(key: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).random(DIMENSION, dtype=np.float32)
+
+
+def write_keys(directory: str, prefix: str, count: int):
+    tier = _DiskTier(directory, DIMENSION)
+    for i in range(count):
+        key = f"{prefix}-{i:04d}"
+        tier.put(key, vector_for(key))
+    tier.flush()
+
+
+def test_put_flush_and_reopen(tmp_path):
+    tier = _DiskTier(str(tmp_path), DIMENSION)
+    tier.put("a", vector_for("a"))
+    tier.put("b", vector_for("b"))
+    assert np.array_equal(tier.get("b"), vector_for("b"))
+    tier.flush()
+
+    reader = _DiskTier(str(tmp_path), DIMENSION, read_only=True)
+    assert np.array_equal(reader.get("a"), vector_for("a"))
+    assert reader.get("missing") is None
+
+
+def test_read_only_instance_sees_later_writes(tmp_path):
+    writer = _DiskTier(str(tmp_path), DIMENSION)
+    reader = _DiskTier(str(tmp_path), DIMENSION, read_only=True)
+    assert reader.get("late") is None
+    writer.put("late", vector_for("late"))
+    writer.flush()
+    assert np.array_equal(reader.get("late"), vector_for("late"))
+
+
+def test_partial_trailing_row_is_truncated(tmp_path):
+    writer = _DiskTier(str(tmp_path), DIMENSION)
+    writer.put("a", vector_for("a"))
+    writer.flush()
+    # A writer crashed halfway through appending a row
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\x00" * 10)
+
+    reopened = _DiskTier(str(tmp_path), DIMENSION)
+    assert (tmp_path / "vectors.f32").stat().st_size == DIMENSION * 4
+    reopened.put("b", vector_for("b"))
+    assert np.array_equal(reopened.get("a"), vector_for("a"))
+    assert np.array_equal(reopened.get("b"), vector_for("b"))
+
+
+def test_dimension_mismatch_resets_directory(tmp_path):
+    old = _DiskTier(str(tmp_path), DIMENSION * 2)
+    old.put("a", np.ones(DIMENSION * 2, dtype=np.float32))
+    old.flush()
+
+    tier = _DiskTier(str(tmp_path), DIMENSION)
+    assert tier.get("a") is None
+    tier.put("b", vector_for("b"))
+    tier.flush()
+    assert tier.offsets == {"b": 0}
+    header = (tmp_path / "index.log").read_text().splitlines()[0]
+    assert json.loads(header)["dimension"] == DIMENSION
+
+
+def test_flush_appends_only_new_records(tmp_path):
+    writer = _DiskTier(str(tmp_path), DIMENSION)
+    reader = _DiskTier(str(tmp_path), DIMENSION, read_only=True)
+    writer.put("a", vector_for("a"))
+    writer.flush()
+    log = (tmp_path / "index.log").read_bytes()
+
+    writer.put("b", vector_for("b"))
+    writer.flush()
+    assert (tmp_path / "index.log").read_bytes() == log + b"b\t1\n"
+    assert np.array_equal(reader.get("a"), vector_for("a"))
+    assert np.array_equal(reader.get("b"), vector_for("b"))
+    assert reader._log_offset == len(log) + len(b"b\t1\n")
+
+
+def test_partial_index_line_is_ignored_then_truncated(tmp_path):
+    writer = _DiskTier(str(tmp_path), DIMENSION)
+    writer.put("a", vector_for("a"))
+    writer.flush()
+    with open(tmp_path / "index.log", "ab") as f:
+        f.write(b"half-writ")
+
+    reader = _DiskTier(str(tmp_path), DIMENSION, read_only=True)
+    assert reader.offsets == {"a": 0}
+    reopened = _DiskTier(str(tmp_path), DIMENSION)
+    assert (tmp_path / "index.log").read_bytes().endswith(b"a\t0\n")
+    assert reopened.offsets == {"a": 0}
+
+
+def test_concurrent_writer_processes_keep_rows_and_index_consistent(tmp_path):
+    context = multiprocessing.get_context("fork")
+    writers = [
+        context.Process(target=write_keys, args=(str(tmp_path), f"w{n}", 150))
+        for n in range(4)
+    ]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    reader = _DiskTier(str(tmp_path), DIMENSION, read_only=True)
+    assert len(reader.offsets) == 4 * 150
+    assert (tmp_path / "vectors.f32").stat().st_size == 4 * 150 * DIMENSION * 4
+    for n in range(4):
+        for i in range(150):
+            key = f"w{n}-{i:04d}"
+            assert np.array_equal(reader.get(key), vector_for(key)), key
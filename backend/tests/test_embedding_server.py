@@ -0,0 +1,100 @@
+# backend/tests/test_embedding_server.py
+# Purpose: Shared embedding server: socket permissions, message size limits,
+# no parse pool, and the remote backend's cache namespace.
+
+import asyncio
+import os
+import socket
+import stat
+import numpy as np
+from app.core.config import settings
+from app.core.executors import ExecutionPools
+from app.embeddings import server
+from app.embeddings.backends import RemoteBackend
+from app.embeddings.embedder import EmbeddingService
+from app.embeddings.ipc import _LENGTH, recv_message
+from conftest import HashBackend
+
+
+async def start_server(monkeypatch, socket_path: str) -> asyncio.Task:
+    monkeypatch.setattr(server, "create_backend", lambda name: HashBackend())
+    monkeypatch.setattr(server, "executors", ExecutionPools())
+    task = asyncio.create_task(server.serve(socket_path))
+    while not os.path.exists(socket_path):
+        await asyncio.sleep(0.01)
+    return task
+
+
+async def stop_server(task: asyncio.Task):
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def test_socket_is_private_from_creation_and_no_parse_pool(monkeypatch, tmp_path):
+    socket_path = str(tmp_path / "run" / "embeddings.sock")
+
+    async def scenario():
+        task = await start_server(monkeypatch, socket_path)
+        try:
+            return (stat.S_IMODE(os.stat(socket_path).st_mode), stat.S_IMODE(os.stat(tmp_path / "run").st_mode),
+                    server.executors._parse_pool)
+        finally:
+            await stop_server(task)
+
+    socket_mode, directory_mode, parse_pool = asyncio.run(scenario())
+    assert socket_mode == 0o660
+    assert directory_mode == 0o770
+    assert parse_pool is None
+
+
+def test_oversized_request_is_refused(monkeypatch, tmp_path):
+    socket_path = str(tmp_path / "embeddings.sock")
+    monkeypatch.setattr(settings, "EMBEDDING_SERVER_MAX_MESSAGE_BYTES", 1024)
+
+    def send_oversized():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            # Only the length prefix is sent: the server must not wait for (or allocate) 1 GiB
+            sock.sendall(_LENGTH.pack(1 << 30))
+            response, _ = recv_message(sock)
+            closed = sock.recv(1) == b""
+        return response, closed
+
+    async def scenario():
+        task = await start_server(monkeypatch, socket_path)
+        try:
+            return await asyncio.to_thread(send_oversized)
+        finally:
+            await stop_server(task)
+
+    response, closed = asyncio.run(scenario())
+    assert "exceeds" in response["error"]
+    assert closed
+
+
+def test_remote_backend_uses_the_server_model_for_the_cache(monkeypatch, tmp_path):
+    socket_path = str(tmp_path / "embeddings.sock")
+
+    def connect_and_encode():
+        backend = RemoteBackend(socket_path, connect_timeout=5.0)
+        return backend, backend.encode(["alpha", "beta"])
+
+    async def scenario():
+        monkeypatch.setattr(settings, "EMBEDDING_MODEL", "server-model")
+        task = await start_server(monkeypatch, socket_path)
+        try:
+            backend, vectors = await asyncio.to_thread(connect_and_encode)
+        finally:
+            await stop_server(task)
+        return backend, vectors
+
+    backend, vectors = asyncio.run(scenario())
+    assert np.array_equal(vectors, HashBackend().encode(["alpha", "beta"]))
+
+    # The worker is configured for another model; the cache follows the server
+    monkeypatch.setattr(settings, "EMBEDDING_MODEL", "worker-model")
+    service = EmbeddingService(backend=backend)
+    assert service.cache.model_name == "server-model@hash"
@@ -0,0 +1,37 @@
+# backend/tests/test_executors.py
+# Purpose: CPU pools: one pool per kind under concurrent first use, and encoder thread sizing.
+
+import threading
+from app.core.config import settings
+from app.core.executors import ExecutionPools
+
+
+def test_concurrent_start_creates_the_pools_once(monkeypatch):
+    monkeypatch.setattr(settings, "PARSE_PROCESS_WORKERS", 0)
+    pools = ExecutionPools()
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def start():
+        barrier.wait()
+        pools.start()
+        seen.append(pools._encode_pool)
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len({id(pool) for pool in seen}) == 1
+        assert pools._parse_pool is pools._encode_pool
+    finally:
+        pools.shutdown()
+
+
+def test_encoder_threads_share_the_cores(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    monkeypatch.setattr(settings, "ENCODE_THREAD_WORKERS", 2)
+    assert ExecutionPools.encoder_threads() == 4
+    monkeypatch.setattr(settings, "ENCODE_THREAD_WORKERS", 16)
+    assert ExecutionPools.encoder_threads() == 1
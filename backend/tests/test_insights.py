@@ -0,0 +1,104 @@
+# backend/tests/test_insights.py
+# Purpose: AI Brain insights: cache keys computed before the prompt is built,
+# and streamed requests sharing one Groq call with identical requests.
+
+import asyncio
+import json
+from types import SimpleNamespace
+from app.ai_brain.groq_client import AIProcessor
+from app.ai_brain.insights_cache import LocalInsightsCache, SingleFlight
+from app.ai_brain.prompt_builder import PromptBuilder, TokenCounter
+from app.ai_brain.resilience import ResilientCaller
+from app.resume_parser.parser import ResumeParser
+from app.rule_engine.engine import RuleEngine
+
+JD = "Backend engineer. Required: Python, Docker, Kubernetes. Build and run APIs."
+ANSWER = {"summary_explanation": "Good fit.", "ats_suggestions": ["Add Kubernetes"], "rewritten_bullets": []}
+
+
+class FakeGroq:
+    """
+    Just the chat.completions.create surface; a streamed answer waits for `release`.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = json.dumps(ANSWER)
+        if not kwargs.get("stream"):
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        async def chunks():
+            await self.release.wait()
+            for piece in (content[:10], content[10:]):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+        return chunks()
+
+
+def make_processor(client: FakeGroq) -> AIProcessor:
+    # AIProcessor() imports the Groq SDK; these tests only need the client surface
+    processor = object.__new__(AIProcessor)
+    processor.client = client
+    processor.model = "test-model"
+    processor.prompts = {"full_system": "system prompt"}
+    processor.insights_cache = LocalInsightsCache(100, 60.0)
+    processor._single_flight = SingleFlight()
+    processor.resilience = ResilientCaller()
+    processor.prompt_builder = PromptBuilder(token_budget=1500, max_bullets=2, jd_max_tokens=200,
+                                             bullet_max_tokens=40, counter=TokenCounter("unavailable-encoding"))
+    processor.system_prompt_tokens = 0
+    return processor
+
+
+def make_analysis():
+    bullets = [f"Delivered project number {i} for a client" for i in range(6)]
+    resume = ResumeParser._structure_text("Skills\nPython, Docker\nExperience\n" + "\n".join(bullets))
+    return asyncio.run(RuleEngine.analyze(resume, RuleEngine.parse_jd(JD)))
+
+
+def test_cache_hit_skips_the_prompt_build(embedding_service):
+    analysis = make_analysis()
+
+    async def scenario():
+        client = FakeGroq()
+        processor = make_processor(client)
+        first = await processor.generate_insights(analysis)
+        embedding_service.backend.calls.clear()
+        second = await processor.generate_insights(analysis.model_copy(deep=True))
+        return client.calls, first, second
+
+    calls, first, second = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert first == second
+    # The key needs no bullet ranking, so a hit encodes nothing
+    assert embedding_service.backend.calls == []
+
+
+def test_identical_request_joins_a_running_stream(embedding_service):
+    analysis = make_analysis()
+
+    async def scenario():
+        client = FakeGroq()
+        processor = make_processor(client)
+
+        async def consume_stream():
+            return [event async for event in processor.stream_insights(analysis)]
+
+        streamed = asyncio.create_task(consume_stream())
+        while not client.calls:
+            await asyncio.sleep(0.001)
+        joined = asyncio.create_task(processor.generate_insights(analysis))
+        await asyncio.sleep(0.01)
+        client.release.set()
+        return client.calls, await streamed, await joined
+
+    calls, events, joined = asyncio.run(scenario())
+    assert len(calls) == 1 and calls[0]["stream"]
+    assert events[-1][0] == "insights" and events[-1][1].model_dump() == ANSWER
+    assert [kind for kind, _ in events[:-1]] == ["token", "token"]
+    assert joined.model_dump() == ANSWER
@@ -0,0 +1,44 @@
+# backend/tests/test_job_store.py
+# Purpose: Registered-JD store: lazy disk tier and async lookups.
+
+import asyncio
+import numpy as np
+import pytest
+from app.rule_engine.jd_store import JobNotFoundError, JobStore, PreparedJob, jd_id_for
+from app.schemas.analysis_models import JobDescription
+
+JD_TEXT = "Backend engineer. Required: Python, Docker."
+
+
+def make_job() -> PreparedJob:
+    jd = JobDescription(raw_text=JD_TEXT, required_skills=["Python", "Docker"])
+    return PreparedJob(jd_id_for(JD_TEXT), jd, "backend engineer", "python docker", "hash",
+                       np.ones((4, 8), dtype="float32"))
+
+
+def test_directory_is_created_on_first_write_only(tmp_path):
+    directory = tmp_path / "jobs"
+    store = JobStore(directory=str(directory))
+    assert not directory.exists()
+    assert len(store) == 0
+    assert not directory.exists()
+
+    store.put(make_job())
+    assert (directory / f"{jd_id_for(JD_TEXT)}.json").exists()
+    assert len(JobStore(directory=str(directory))) == 1
+
+
+def test_aget_reads_the_disk_tier_off_the_loop(tmp_path):
+    async def scenario():
+        await JobStore(directory=str(tmp_path)).aput(make_job())
+        return await JobStore(directory=str(tmp_path)).aget(jd_id_for(JD_TEXT))
+
+    job = asyncio.run(scenario())
+    assert job.jd.required_skills == ["Python", "Docker"]
+    assert np.array_equal(job.vectors, make_job().vectors)
+
+
+@pytest.mark.parametrize("bad_id", ["../secrets", "A" * 64, "abc"])
+def test_unknown_or_malformed_ids_are_not_found(tmp_path, bad_id):
+    with pytest.raises(JobNotFoundError):
+        asyncio.run(JobStore(directory=str(tmp_path)).aget(bad_id))
@@ -0,0 +1,63 @@
+# backend/tests/test_prompt_builder.py
+# Purpose: Token-budgeted Groq payload: bullet selection and encoder use.
+
+import asyncio
+import json
+from pathlib import Path
+from app.ai_brain.prompt_builder import PromptBuilder, TokenCounter
+from app.resume_parser.parser import ResumeParser
+from app.rule_engine.engine import RuleEngine
+
+PROMPTS_DIR = Path(__file__).resolve().parents[1] / "app" / "ai_brain" / "prompts"
+JD = "Backend engineer. Required: Python, Docker, Kubernetes. Build and run APIs."
+
+
+def analysis_with(bullets):
+    text = "Skills\nPython, Docker\nExperience\n" + "\n".join(bullets)
+    resume = ResumeParser._structure_text(text)
+    return asyncio.run(RuleEngine.analyze(resume, RuleEngine.parse_jd(JD)))
+
+
+def make_builder(**overrides) -> PromptBuilder:
+    options = dict(token_budget=1500, max_bullets=4, jd_max_tokens=200, bullet_max_tokens=40,
+                   counter=TokenCounter("unavailable-encoding"))
+    options.update(overrides)
+    return PromptBuilder(**options)
+
+
+def test_bullets_that_all_fit_are_not_encoded(embedding_service):
+    analysis = analysis_with(["Built Python APIs", "Ran Docker in production"])
+    embedding_service.backend.calls.clear()
+
+    payload = json.loads(asyncio.run(make_builder().build(analysis)))
+    assert len(payload["relevant_resume_bullets"]) == len(set(analysis.resume_data.experience))
+    assert embedding_service.backend.calls == []
+
+
+def test_overflowing_bullets_are_ranked_and_capped(embedding_service):
+    bullets = [f"Delivered project number {i} for a client" for i in range(10)]
+    analysis = analysis_with(bullets)
+    builder = make_builder(max_bullets=3)
+
+    first = json.loads(asyncio.run(builder.build(analysis)))
+    assert len(first["relevant_resume_bullets"]) == 3
+    assert set(first["relevant_resume_bullets"]) <= set(analysis.resume_data.experience)
+
+    # Bullet vectors are cached: the second build does not encode anything
+    embedding_service.backend.calls.clear()
+    second = json.loads(asyncio.run(builder.build(analysis)))
+    assert second == first
+    assert embedding_service.backend.calls == []
+
+
+def test_budget_limits_the_bullets(embedding_service):
+    analysis = analysis_with([f"Delivered project number {i} for a client" for i in range(10)])
+    payload = json.loads(asyncio.run(make_builder(token_budget=200, max_bullets=10).build(analysis)))
+    assert len(payload["relevant_resume_bullets"]) < 10
+
+
+def test_prompts_describe_the_payload_sent():
+    rewrite = (PROMPTS_DIR / "rewrite.txt").read_text(encoding="utf-8")
+    assert "relevant_resume_bullets" in rewrite
+    analysis = (PROMPTS_DIR / "analysis.txt").read_text(encoding="utf-8")
+    assert "Relevant Resume Bullets" in analysis and "Resume Content (Summarized)" not in analysis
@@ -0,0 +1,187 @@
+# backend/tests/test_resilience.py
+# Purpose: Circuit breaker and ResilientCaller behaviour, including cancellation.
+
+import asyncio
+import pytest
+from app.ai_brain.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+from app.core.config import settings
+
+
+class RetryableError(Exception):
+    status_code = 503
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+def open_breaker(caller: ResilientCaller):
+    for _ in range(caller.breaker.failure_threshold):
+        caller.record_failure()
+    assert caller.breaker.state == "open"
+    caller.breaker.reset_seconds = 0.0
+
+
+def test_breaker_opens_then_half_open_probe_closes_it():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60.0)
+    breaker.record_failure()
+    assert not breaker.allow()
+    breaker.reset_seconds = 0.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_cancelled_probe_is_released():
+    async def scenario():
+        caller = ResilientCaller()
+        open_breaker(caller)
+
+        async def hang():
+            await asyncio.sleep(60)
+
+        probe = asyncio.create_task(caller.call(hang))
+        await asyncio.sleep(0.01)
+        assert caller.breaker.state == "half_open"
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        # The next call is let through as the new probe and closes the breaker
+        async def ok():
+            return "ok"
+
+        assert await caller.call(ok) == "ok"
+        assert caller.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_stream_slot_releases_probe():
+    async def scenario():
+        caller = ResilientCaller()
+        open_breaker(caller)
+
+        async def stream():
+            async with caller.slot():
+                yield "token"
+                yield "token"
+
+        tokens = stream()
+        await tokens.__anext__()
+        await tokens.aclose()  # client disconnected mid-stream
+
+        assert caller.breaker.state == "half_open"
+        assert caller.breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_unrecorded_error_in_slot_counts_as_failure():
+    async def scenario():
+        caller = ResilientCaller()
+        open_breaker(caller)
+        with pytest.raises(RetryableError):
+            async with caller.slot():
+                raise RetryableError("upstream 503")
+        assert caller.breaker.state == "open"
+
+    asyncio.run(scenario())
+
+
+def test_open_breaker_short_circuits():
+    async def scenario():
+        caller = ResilientCaller()
+        open_breaker(caller)
+        caller.breaker.reset_seconds = 60.0
+
+        async def ok():
+            return "ok"
+
+        with pytest.raises(CircuitOpenError):
+            await caller.call(ok)
+        assert caller.counters["short_circuited"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_retries_stop_at_overall_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_CALL_DEADLINE_SECONDS", 0.3)
+
+    async def scenario():
+        caller = ResilientCaller()
+        caller.max_retries = 100
+        attempts = 0
+
+        async def flaky():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0.05)
+            raise RetryableError("upstream 503")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        # Either the last attempt fails or the deadline cuts it short
+        with pytest.raises((RetryableError, asyncio.TimeoutError)):
+            await caller.call(flaky)
+        assert loop.time() - started < 0.6
+        assert 1 <= attempts < 100
+
+    asyncio.run(scenario())
+
+
+def test_transient_failure_is_retried():
+    async def scenario():
+        caller = ResilientCaller()
+        attempts = 0
+
+        async def flaky():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise RetryableError("upstream 503")
+            return "ok"
+
+        assert await caller.call(flaky) == "ok"
+        assert caller.counters["retries"] == 1
+        assert caller.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    async def scenario():
+        caller = ResilientCaller()
+
+        async def bad_request():
+            raise BadRequestError("payload too large")
+
+        for _ in range(caller.breaker.failure_threshold + 1):
+            with pytest.raises(BadRequestError):
+                await caller.call(bad_request)
+        assert caller.breaker.state == "closed"
+        assert caller.counters["client_errors"] == caller.breaker.failure_threshold + 1
+
+        # A half-open probe answered with a 4xx is handed back, not failed
+        open_breaker(caller)
+        with pytest.raises(BadRequestError):
+            await caller.call(bad_request)
+        assert caller.breaker.state == "half_open"
+        assert caller.breaker.allow()
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+# backend/tests/test_resume_cache.py
+# Purpose: Parsed-resume cache: id validation, copy isolation, the disk tier and its sweeps.
+
+import asyncio
+import pytest
+from app.resume_parser.cache import ResumeCache, ResumeNotFoundError, resume_id_for
+from app.resume_parser.parser import ResumeParser
+from app.schemas.analysis_models import ResumeContent
+
+RESUME_ID = resume_id_for(b"resume bytes")
+
+
+def make_resume() -> ResumeContent:
+    return ResumeParser._structure_text("Skills\nPython, Docker\nExperience\nBuilt an API")
+
+
+@pytest.mark.parametrize("bad_id", ["", "../../etc/passwd", RESUME_ID.upper(), RESUME_ID[:-1], RESUME_ID + "0"])
+def test_malformed_ids_never_reach_the_disk(tmp_path, bad_id):
+    (tmp_path / "outside.json").write_text("{}")
+    cache = ResumeCache("1", directory=str(tmp_path / "cache"))
+    assert cache.get(bad_id) is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_returned_resume_is_a_deep_copy():
+    cache = ResumeCache("1")
+    resume = make_resume()
+    cache.put(RESUME_ID, resume)
+    resume.skills.append("Mutated after put")
+
+    first = cache.get(RESUME_ID)
+    first.skills.append("Mutated after get")
+    assert cache.get(RESUME_ID).skills == first.skills[:-1]
+    assert "Mutated after put" not in first.skills
+
+
+def test_disk_tier_round_trip_off_the_loop(tmp_path):
+    async def scenario():
+        writer = ResumeCache("1", directory=str(tmp_path))
+        await writer.aput(RESUME_ID, make_resume())
+        reader = ResumeCache("1", directory=str(tmp_path))
+        return await reader.aget(RESUME_ID), reader.stats()
+
+    resume, stats = asyncio.run(scenario())
+    assert resume.skills == make_resume().skills
+    assert stats["disk_hits"] == 1
+
+
+def test_from_id_reports_malformed_id_as_not_found():
+    with pytest.raises(ResumeNotFoundError):
+        asyncio.run(ResumeParser.from_id("not-a-resume-id"))
+
+
+def test_disk_sweep_runs_in_the_background_and_is_rate_limited(tmp_path):
+    cache = ResumeCache("1", max_entries=1, directory=str(tmp_path), disk_max_files=10)
+    for i in range(11):
+        cache.put(resume_id_for(f"resume {i}".encode()), make_resume())
+    first = cache._sweeper
+    assert first is not None
+    first.join(timeout=5)
+    assert len(list(tmp_path.glob("*.json"))) == 10
+    assert cache.stats()["disk_entries"] == 10
+
+    # Over the limit again, but within SWEEP_INTERVAL of the last sweep
+    cache.put(resume_id_for(b"one more"), make_resume())
+    assert cache._sweeper is first
+    assert cache.stats()["disk_entries"] == 11
@@ -0,0 +1,87 @@
+# backend/tests/test_skill_gap.py
+# Purpose: Semantic skill-gap analysis: ontology snapshots across a skills.json
+# reload, the work staying off the event loop, and threshold calibration.
+
+import asyncio
+import json
+import os
+import threading
+import pytest
+from app.core.config import settings
+from app.rule_engine import engine, skill_gap
+from app.rule_engine.skill_gap import OntologyEmbeddings, analyze_skill_gap, skill_vectors
+from app.rule_engine.skill_ontology import SkillOntology
+from app.utils.text_cleaning import NormalizedDocument
+
+
+def write_skills(directory, skills, mtime):
+    path = directory / "skills.json"
+    path.write_text(json.dumps(skills))
+    os.utime(path, (mtime, mtime))
+
+
+def test_snapshot_stays_consistent_across_reload(tmp_path, monkeypatch, embedding_service):
+    ontology = SkillOntology(tmp_path)
+    write_skills(tmp_path, ["Python", "Docker"], 1_000_000)
+    monkeypatch.setattr(skill_gap, "skill_ontology", ontology)
+    embeddings = OntologyEmbeddings()
+    monkeypatch.setattr(skill_gap, "ontology_embeddings", embeddings)
+
+    jd_skills = ["Python", "Kubernetes"]
+    snapshot = embeddings.get()
+    missing = embeddings.missing(jd_skills, snapshot)
+    assert missing == ["Kubernetes"]
+    positions, vectors = embedding_service.embed_unique(missing)
+
+    # skills.json is reloaded between computing `missing` and reading the vectors
+    write_skills(tmp_path, ["Kubernetes"], 2_000_000)
+    assert embeddings.get() is not snapshot
+
+    jd_vectors = skill_vectors(jd_skills, positions, vectors, snapshot)
+    assert jd_vectors.shape == (2, embedding_service.dimension)
+    resume = NormalizedDocument("Built services in Python.")
+    gap = analyze_skill_gap(jd_skills, jd_vectors, resume, vectors[:0], snapshot)
+    assert "Python" in gap.strong_matches
+
+
+def test_analyze_many_runs_gap_analysis_off_the_loop(monkeypatch, embedding_service):
+    from app.resume_parser.parser import ResumeParser
+
+    threads = []
+    real_analyze = skill_gap.analyze_skill_gap
+
+    def recording_analyze(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return real_analyze(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "analyze_skill_gap", recording_analyze)
+    resumes = [
+        ResumeParser._structure_text(f"Skills\nPython, Docker, SQL\nExperience\nBuilt API number {i}")
+        for i in range(3)
+    ]
+    jd = engine.RuleEngine.parse_jd("Backend engineer. Required: Python, Docker, Kubernetes.")
+
+    async def scenario():
+        return await engine.RuleEngine.analyze_many(resumes, jd), threading.current_thread()
+
+    results, loop_thread = asyncio.run(scenario())
+    assert len(results) == 3
+    assert threads and all(thread is not loop_thread for thread in threads)
+
+
+NEAR_MISSES = [("java", "javascript"), ("react", "react native"), ("c", "c++"), ("sql", "nosql")]
+
+
+def test_near_miss_skills_stay_below_weak_threshold():
+    """
+    Calibration against the real model: distinct skills with overlapping names
+    must not count as (weak) matches for each other.
+    """
+    pytest.importorskip("sentence_transformers")
+    from app.embeddings.embedder import get_embedding_service
+
+    service = get_embedding_service()
+    for left, right in NEAR_MISSES:
+        vectors = service.embed_batch([left, right], normalize=True)
+        similarity = float(vectors[0] @ vectors[1])
+        assert similarity < settings.SKILL_MATCH_WEAK_THRESHOLD, (left, right, similarity)
@@ -0,0 +1,71 @@
+# backend/tests/test_skill_matcher.py
+# Purpose: Aho-Corasick skill matcher: token boundaries, synonyms, overlaps, reloads.
+
+import json
+import os
+import random
+import re
+from app.rule_engine.skill_ontology import SkillMatcher, SkillOntology, normalize_for_matching
+
+PATTERNS = {
+    "java": "Java", "javascript": "JavaScript", "js": "JavaScript", "c": "C", "c++": "C++",
+    "c#": "C#", "go": "Go", "node.js": "Node.js", "react": "React", "react native": "React Native",
+    "machine learning": "Machine Learning", "ml": "Machine Learning", "sql": "SQL", "nosql": "NoSQL",
+}
+
+
+def naive_find(text: str):
+    """
+    Reference: every pattern at every position, with the same boundary rule.
+    """
+    hits = []
+    for surface, canonical in PATTERNS.items():
+        for match in re.finditer(re.escape(surface), text):
+            start, end = match.span()
+            before_ok = start == 0 or not re.match(r"[a-z0-9_+#]", text[start - 1])
+            after_ok = end == len(text) or not re.match(r"[a-z0-9_+#]", text[end])
+            if before_ok and after_ok:
+                hits.append((end, start, canonical))
+    found = {}
+    # By end position; the longer pattern first where several end together
+    for _, _, canonical in sorted(hits, key=lambda hit: (hit[0], hit[1])):
+        found.setdefault(canonical, None)
+    return list(found)
+
+
+def test_token_boundaries():
+    matcher = SkillMatcher(PATTERNS)
+    assert matcher.find("javascript developer") == ["JavaScript"]
+    assert matcher.find("java, c++ and c#") == ["Java", "C++", "C#"]
+    assert matcher.find("go-to person for (sql)") == ["Go", "SQL"]
+    assert matcher.find("nosql stores") == ["NoSQL"]
+    assert matcher.find("mongo google cargo") == []
+
+
+def test_synonyms_overlaps_and_order():
+    matcher = SkillMatcher(PATTERNS)
+    text = normalize_for_matching("React Native apps in\nnode.js, ML and machine   learning")
+    # "js" also fires inside "node.js": "." is not a token character
+    assert matcher.find(text) == ["React", "React Native", "Node.js", "JavaScript", "Machine Learning"]
+
+
+def test_matches_naive_reference_on_random_text():
+    rng = random.Random(7)
+    vocabulary = list(PATTERNS) + ["and", "with", "javascripts", "cc", "react-native", "(go)", "node", "x"]
+    matcher = SkillMatcher(PATTERNS)
+    for _ in range(300):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12)))
+        assert matcher.find(text) == naive_find(text), text
+
+
+def test_ontology_recompiles_when_skills_json_changes(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"python": ["py"]}))
+    os.utime(path, (1_000_000, 1_000_000))
+    ontology = SkillOntology(tmp_path)
+    assert ontology.extract_skills("Py and Docker") == ["python"]
+
+    path.write_text(json.dumps(["python", "docker"]))
+    os.utime(path, (2_000_000, 2_000_000))
+    assert ontology.extract_skills("Py and Docker") == ["docker"]
+    assert ontology.skills == ["python", "docker"]
@@ -0,0 +1,102 @@
+# backend/tests/test_vector_index.py
+# Purpose: Candidate index: upsert/delete/search, background IVF migration,
+# retraining as the corpus grows, saves, and the queued writer used by /analyze.
+
+import asyncio
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+from app.embeddings import vector_index  # noqa: E402
+from app.embeddings.vector_index import CandidateIndex  # noqa: E402
+from app.resume_parser.parser import ResumeParser  # noqa: E402
+from app.rule_engine.engine import CandidateIndexQueue, RuleEngine  # noqa: E402
+
+DIMENSION = 8
+
+
+def sections(seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((3, DIMENSION)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def query_for(seed: int) -> np.ndarray:
+    return CandidateIndex.candidate_vector(sections(seed))
+
+
+def test_upsert_delete_search():
+    index = CandidateIndex(DIMENSION)
+    for i in range(10):
+        index.upsert(f"c{i}", sections(i), {"filename": f"c{i}.pdf"})
+    assert index.search(query_for(3), 1)[0][0] == "c3"
+
+    index.upsert("c3", sections(99))
+    assert len(index) == 10
+    assert index.search(query_for(99), 1)[0][0] == "c3"
+    assert index.delete("c3")
+    assert "c3" not in [cid for cid, _, _ in index.search(query_for(99), 10)]
+
+
+def test_ivf_migration_replays_writes_made_while_training():
+    index = CandidateIndex(DIMENSION, ann_threshold=200)
+    for i in range(200):
+        index.upsert(f"c{i}", sections(i))
+    # Training runs in the background; the flat index keeps taking writes
+    for i in range(200, 220):
+        index.upsert(f"c{i}", sections(i))
+    index.delete("c0")
+    assert index.wait_for_migration()
+
+    assert index.is_ann
+    assert index.index.ntotal == 219
+    index.index.nprobe = index.index.nlist  # exhaustive, so the check is exact
+    assert index.search(query_for(210), 1)[0][0] == "c210"
+    assert "c0" not in [cid for cid, _, _ in index.search(query_for(0), 5)]
+
+
+def test_background_and_explicit_saves_round_trip(tmp_path):
+    index = CandidateIndex(DIMENSION, directory=str(tmp_path), save_every=10)
+    for i in range(25):
+        index.upsert(f"c{i}", sections(i), {"filename": f"c{i}.pdf"})
+    index.save()
+
+    reloaded = CandidateIndex(DIMENSION, directory=str(tmp_path))
+    assert len(reloaded) == 25
+    result = reloaded.search(query_for(7), 1)[0]
+    assert result[0] == "c7" and result[2]["filename"] == "c7.pdf"
+
+
+def test_ivf_is_retrained_when_the_corpus_grows():
+    index = CandidateIndex(DIMENSION, ann_threshold=100, retrain_factor=1.5)
+    for i in range(100):
+        index.upsert(f"c{i}", sections(i))
+    assert index.wait_for_migration()
+    first_nlist = index.index.nlist
+
+    for i in range(100, 150):
+        index.upsert(f"c{i}", sections(i))
+    assert index.wait_for_migration()
+    assert index._trained_size == 150
+    assert index.index.nlist > first_nlist
+    assert index.index.ntotal == 150
+    index.index.nprobe = index.index.nlist
+    assert index.search(query_for(42), 1)[0][0] == "c42"
+    assert index.search(query_for(149), 1)[0][0] == "c149"
+
+
+def test_queued_writer_indexes_in_the_background(monkeypatch, embedding_service):
+    index = CandidateIndex(embedding_service.dimension)
+    monkeypatch.setattr(vector_index, "_candidate_index", index)
+    resumes = [ResumeParser._structure_text(f"Skills\nPython\nExperience\nProject {i}") for i in range(5)]
+
+    async def scenario():
+        queue = CandidateIndexQueue(max_pending=4, max_batch=2)
+        queue.submit(resumes[:3], [{"filename": f"r{i}.pdf"} for i in range(3)])
+        assert len(index) == 0  # submit returns before anything is written
+        queue.submit(resumes[3:], [{}, {}])  # over max_pending: dropped
+        await queue.join()
+        return queue.dropped
+
+    assert asyncio.run(scenario()) == 2
+    assert len(index) == 3
+    assert {RuleEngine.candidate_id(resume) for resume in resumes[:3]} == set(index._labels)
@@ -1,5 +1,6 @@
 export interface ResumeContent {
   raw_text: string;
+  resume_id?: string | null;
   skills: string[];
   experience: string[];
   projects: string[];